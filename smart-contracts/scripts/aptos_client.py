@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+In-process Aptos REST client for the OneClick Copy Trading scripts
+Reads Aptos CLI profiles straight from .aptos/config.yaml and serves account, balance, faucet
+and ledger queries over pooled keep-alive connections instead of spawning the CLI
+"""
+
+import argparse
+import http.client
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+APT_COIN = '0x1::aptos_coin::AptosCoin'
+OCTAS_PER_APT = 100_000_000
+DEFAULT_FAUCET_AMOUNT = OCTAS_PER_APT
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT = 30.0
+
+DEFAULT_REST_URLS = {
+    'testnet': 'https://fullnode.testnet.aptoslabs.com/v1',
+    'mainnet': 'https://fullnode.mainnet.aptoslabs.com/v1',
+    'devnet': 'https://fullnode.devnet.aptoslabs.com/v1',
+}
+DEFAULT_FAUCET_URLS = {
+    'testnet': 'https://faucet.testnet.aptoslabs.com',
+    'devnet': 'https://faucet.devnet.aptoslabs.com',
+}
+
+
+class AptosApiError(Exception):
+    """Non-2xx response from a node or faucet"""
+
+    def __init__(self, status, message, error_code=None):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.error_code = error_code
+
+
+def _parse_simple_yaml(text):
+    """Parse the nested `key: value` mappings the Aptos CLI writes to config.yaml"""
+    root = {}
+    stack = [(-1, root)]
+    for raw in text.splitlines():
+        line = raw.split(' #', 1)[0].rstrip()
+        if not line.strip() or line.strip() in ('---', '...') or line.lstrip().startswith('#'):
+            continue
+        indent = len(line) - len(line.lstrip())
+        key, _, value = line.strip().partition(':')
+        while indent <= stack[-1][0]:
+            stack.pop()
+        parent = stack[-1][1]
+        key = key.strip().strip('"\'')
+        value = value.strip()
+        if value:
+            parent[key] = value.strip('"\'')
+        else:
+            parent[key] = {}
+            stack.append((indent, parent[key]))
+    return root
+
+
+def find_config(start=None):
+    """The config.yaml the CLI would use: nearest .aptos/ upwards from start, then ~/.aptos/"""
+    explicit = os.environ.get('APTOS_CONFIG')
+    if explicit:
+        return Path(explicit)
+    directory = Path(start or Path.cwd()).resolve()
+    for candidate in [directory, *directory.parents, Path.home()]:
+        config = candidate / '.aptos' / 'config.yaml'
+        if config.exists():
+            return config
+    return None
+
+
+class Profile:
+    """One Aptos CLI profile"""
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.network = (fields.get('network') or '').lower() or None
+        account = fields.get('account')
+        self.account = (account if account.startswith('0x') else f"0x{account}") if account else None
+        self.public_key = fields.get('public_key')
+        self.private_key = fields.get('private_key')
+        self.rest_url = fields.get('rest_url')
+        self.faucet_url = fields.get('faucet_url')
+
+    def __repr__(self):
+        # Never include the private key
+        return f"Profile({self.name}, {self.account}, {self.network})"
+
+
+_profiles = {}
+_profiles_lock = threading.Lock()
+
+
+def load_profiles(config_path=None):
+    """All profiles in a config file, parsed once per run and memoized"""
+    path = Path(config_path) if config_path else find_config()
+    if path is None:
+        return {}
+    key = str(path.resolve())
+    with _profiles_lock:
+        if key not in _profiles:
+            try:
+                text = path.read_text()
+            except OSError:
+                return {}
+            try:
+                import yaml
+                data = yaml.safe_load(text) or {}
+            except ImportError:
+                data = _parse_simple_yaml(text)
+            profiles = data.get('profiles') or {}
+            _profiles[key] = {name: Profile(name, fields or {}) for name, fields in profiles.items()}
+        return _profiles[key]
+
+
+def reload_profiles():
+    """Forget memoized profiles, e.g. after `aptos init` wrote a new one"""
+    with _profiles_lock:
+        _profiles.clear()
+
+
+def get_profile(name, config_path=None):
+    """A configured profile with an account, or None"""
+    profile = load_profiles(config_path).get(name)
+    return profile if profile and profile.account else None
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections to one host, reused across threads"""
+
+    def __init__(self, scheme, netloc, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        self.scheme = scheme
+        self.netloc = netloc
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        self.opened += 1
+        cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        return cls(self.netloc, timeout=self.timeout)
+
+    def request(self, method, path, body=None, headers=None):
+        """Send a request, retrying once on a fresh connection if a pooled one went stale"""
+        for attempt in range(2):
+            try:
+                conn = self._idle.get_nowait()
+                reused = True
+            except queue.Empty:
+                conn = self._connect()
+                reused = False
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                    ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                try:
+                    self._idle.put_nowait(conn)
+                except queue.Full:
+                    conn.close()
+            return response.status, data
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_for(url):
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(parts.scheme, parts.netloc)
+        return _pools[key]
+
+
+def pool_stats():
+    """Connections opened per host, for the end-of-run report"""
+    return {f"{scheme}://{netloc}": pool.opened for (scheme, netloc), pool in _pools.items()}
+
+
+class AptosClient:
+    """Node REST API and faucet access over shared connection pools"""
+
+    def __init__(self, rest_url, faucet_url=None, api_key=None):
+        self.rest_url = rest_url.rstrip('/')
+        if not urlsplit(self.rest_url).path.rstrip('/').endswith('/v1'):
+            self.rest_url += '/v1'
+        self.faucet_url = faucet_url.rstrip('/') if faucet_url else None
+        self.api_key = api_key
+        self.requests = 0
+
+    @classmethod
+    def for_profile(cls, profile, network=None, rest_url=None):
+        """Client for a profile, letting an explicitly chosen REST URL win over the profile's own"""
+        network = network or (profile.network if profile else None) or 'testnet'
+        return cls(
+            rest_url or (profile.rest_url if profile else None) or DEFAULT_REST_URLS.get(network, DEFAULT_REST_URLS['testnet']),
+            faucet_url=(profile.faucet_url if profile else None) or DEFAULT_FAUCET_URLS.get(network),
+            api_key=os.environ.get('APTOS_API_KEY') or None,
+        )
+
+    def _call(self, base_url, method, path, payload=None, auth=True):
+        parts = urlsplit(base_url)
+        headers = {'Accept': 'application/json', 'Connection': 'keep-alive'}
+        body = None
+        if payload is not None:
+            body = json.dumps(payload).encode()
+            headers['Content-Type'] = 'application/json'
+        elif method == 'POST':
+            body = b''
+        if auth and self.api_key and 'aptoslabs.com' in parts.netloc:
+            headers['Authorization'] = f'Bearer {self.api_key}'
+
+        self.requests += 1
+        status, data = _pool_for(base_url).request(method, parts.path.rstrip('/') + path, body, headers)
+        try:
+            decoded = json.loads(data) if data else None
+        except ValueError:
+            decoded = data.decode(errors='replace')
+        if not 200 <= status < 300:
+            message = decoded.get('message') if isinstance(decoded, dict) else decoded
+            error_code = decoded.get('error_code') if isinstance(decoded, dict) else None
+            raise AptosApiError(status, message, error_code)
+        return decoded
+
+    def get(self, path):
+        return self._call(self.rest_url, 'GET', path)
+
+    def post(self, path, payload=None):
+        return self._call(self.rest_url, 'POST', path, payload)
+
+    def ledger_info(self):
+        return self.get('')
+
+    def account(self, address):
+        """Account sequence number and auth key, or None if it does not exist on chain"""
+        try:
+            return self.get(f"/accounts/{address}")
+        except AptosApiError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def view(self, function, arguments=(), type_arguments=()):
+        """Return values of a #[view] function, as JSON (u64 and wider arrive as strings)"""
+        return self.post('/view', {
+            'function': function,
+            'type_arguments': list(type_arguments),
+            'arguments': list(arguments),
+        })
+
+    def balance(self, address, coin_type=APT_COIN):
+        """Balance in octas via the 0x1::coin::balance view function"""
+        return int(self.view('0x1::coin::balance', [address], [coin_type])[0])
+
+    def transaction(self, tx_hash):
+        return self.get(f"/transactions/by_hash/{tx_hash}")
+
+    def wait_for_transaction(self, tx_hash, timeout=60):
+        """Poll until a transaction is committed; raises on VM failure or timeout"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                tx = self.get(f"/transactions/wait_by_hash/{tx_hash}")
+                if tx.get('type') != 'pending_transaction':
+                    if not tx.get('success', False):
+                        raise AptosApiError(200, f"Transaction {tx_hash} failed: {tx.get('vm_status')}")
+                    return tx
+            except AptosApiError as e:
+                if e.status != 404:
+                    raise
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Transaction {tx_hash} not committed after {timeout}s")
+            time.sleep(0.5)
+
+    def fund(self, address, amount=DEFAULT_FAUCET_AMOUNT, wait=True):
+        """Mint from the faucet and wait for the funding transactions; returns their hashes"""
+        if not self.faucet_url:
+            raise AptosApiError(0, "No faucet available for this network")
+        query = urlencode({'amount': amount, 'address': address})
+        hashes = self._call(self.faucet_url, 'POST', f"/mint?{query}", auth=False)
+        if wait:
+            for tx_hash in hashes:
+                self.wait_for_transaction(tx_hash)
+        return hashes
+
+
+def format_apt(octas):
+    return f"{octas / OCTAS_PER_APT:,.8f} APT"
+
+
+def self_check():
+    """Check every query and the connection pool against local stand-in nodes"""
+    from mock_node import MockNode
+
+    failures = []
+
+    def check(name, ok):
+        print(f"   {'✅' if ok else '❌'} {name}")
+        if not ok:
+            failures.append(name)
+
+    with MockNode(chain_id=4) as node, MockNode(fail_rate=1.0) as broken:
+        client = AptosClient(node.url, faucet_url=node.faucet_url)
+        address = '0x' + 'ab' * 32
+        started = time.perf_counter()
+        check("ledger info reports the node's chain id", client.ledger_info()['chain_id'] == 4)
+        check("a missing account is None, not an error", client.account(address) is None)
+        hashes = client.fund(address, 5 * OCTAS_PER_APT)
+        check("faucet funding waits for its transactions", len(hashes) > 0
+              and all(client.transaction(h)['success'] for h in hashes))
+        check("the funded account exists", client.account(address) is not None)
+        check("balance comes from the coin::balance view", client.balance(address) == 5 * OCTAS_PER_APT)
+
+        for _ in range(50):
+            client.ledger_info()
+        elapsed = time.perf_counter() - started
+        opened = pool_stats()[node.faucet_url]
+        print(f"⏱️  {client.requests} requests over {opened} connection(s) in {elapsed * 1000:.0f} ms")
+        check("sequential requests reuse one pooled connection", opened == 1)
+
+        try:
+            AptosClient(broken.url).ledger_info()
+            check("a 503 raises AptosApiError", False)
+        except AptosApiError as e:
+            check("a 503 raises AptosApiError", e.status == 503)
+
+    print(f"🔍 {len(failures)} failed checks")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query Aptos accounts without spawning the CLI")
+    parser.add_argument('--profile', default='default')
+    parser.add_argument('--fund', type=int, metavar='OCTAS', help="request OCTAS from the faucet first")
+    parser.add_argument('--self-check', action='store_true', help="check every query against a local stand-in node")
+    args = parser.parse_args()
+
+    if args.self_check:
+        sys.exit(0 if self_check() else 1)
+
+    profile = get_profile(args.profile)
+    if profile is None:
+        print(f"❌ Profile {args.profile} not found. Run: aptos init --profile {args.profile}")
+        sys.exit(1)
+
+    client = AptosClient.for_profile(profile)
+    print(f"👤 {profile.name}: {profile.account} on {client.rest_url}")
+    if args.fund:
+        client.fund(profile.account, args.fund)
+        print(f"✅ Funded {format_apt(args.fund)}")
+    print(f"💳 Balance: {format_apt(client.balance(profile.account))}")
+
+
+if __name__ == "__main__":
+    main()
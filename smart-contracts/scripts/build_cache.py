@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Content-addressed build cache for OneClick Copy Trading smart contracts
+Skips compile/publish when the Move sources, Move.toml and dependency revs are unchanged
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).parent.parent
+DEFAULT_CACHE_DIR = PACKAGE_DIR / '.build-cache'
+DEFAULT_MAX_SIZE_MB = 256
+INDEX_FILE = 'index.json'
+
+
+def read_dependency_revs(move_toml_path):
+    """Return sorted (name, git, rev, subdir) tuples for the git dependencies in Move.toml"""
+    deps = []
+    current = None
+    with open(move_toml_path, 'r') as f:
+        for raw in f:
+            line = raw.strip()
+            if not line or line.startswith('#'):
+                continue
+            header = re.match(r'^\[dependencies\.([^\]]+)\]$', line)
+            if header:
+                current = {'name': header.group(1), 'git': '', 'rev': '', 'subdir': ''}
+                deps.append(current)
+                continue
+            if line.startswith('['):
+                current = None
+                continue
+            if current is not None and '=' in line:
+                key, value = line.split('=', 1)
+                key = key.strip()
+                if key in current:
+                    current[key] = value.strip().strip('"')
+    return sorted((d['name'], d['git'], d['rev'], d['subdir']) for d in deps)
+
+
+def compute_source_hash(package_dir=PACKAGE_DIR, extra=None):
+    """Hash sources/*.move, Move.toml and dependency revs into a cache key"""
+    package_dir = Path(package_dir)
+    digest = hashlib.sha256()
+
+    move_toml = package_dir / 'Move.toml'
+    digest.update(b'Move.toml\0')
+    digest.update(move_toml.read_bytes())
+
+    for dep in read_dependency_revs(move_toml):
+        digest.update(('dep\0' + '\0'.join(dep)).encode())
+
+    for source in sorted((package_dir / 'sources').glob('*.move')):
+        digest.update(f'source\0{source.name}\0'.encode())
+        digest.update(source.read_bytes())
+
+    # Anything else that changes the produced bytecode (e.g. the CLI version)
+    for item in extra or []:
+        digest.update(f'extra\0{item}'.encode())
+
+    return digest.hexdigest()
+
+
+def _dir_size(path):
+    """Total size in bytes of all files under path"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class BuildCache:
+    """Stores compiled artifacts and publish results keyed by source hash"""
+
+    def __init__(self, cache_dir=None, max_size_mb=None):
+        self.cache_dir = Path(cache_dir or os.environ.get('DEPLOY_CACHE_DIR') or DEFAULT_CACHE_DIR)
+        self.max_size_bytes = int(float(
+            max_size_mb if max_size_mb is not None
+            else os.environ.get('DEPLOY_CACHE_MAX_MB', DEFAULT_MAX_SIZE_MB)
+        ) * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.time_saved = 0.0
+        self.events = []
+        self.index = self._load_index()
+
+    # Index persistence
+
+    def _index_path(self):
+        return self.cache_dir / INDEX_FILE
+
+    def _load_index(self):
+        """Load the cache index, starting fresh if it is missing or corrupt"""
+        try:
+            with open(self._index_path(), 'r') as f:
+                index = json.load(f)
+            if isinstance(index, dict) and isinstance(index.get('entries'), dict):
+                return index
+        except (OSError, ValueError):
+            pass
+        return {'entries': {}}
+
+    def _save_index(self):
+        """Atomically write the cache index"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._index_path().with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self._index_path())
+
+    def _entry(self, key, create=False):
+        entries = self.index['entries']
+        if key not in entries and create:
+            entries[key] = {'created_at': time.time(), 'last_used': time.time(), 'size': 0, 'published': {}}
+        return entries.get(key)
+
+    def _record(self, kind, hit, saved=0.0):
+        if hit:
+            self.hits += 1
+            self.time_saved += saved
+        else:
+            self.misses += 1
+        self.events.append((kind, hit, saved))
+
+    # Compiled artifacts
+
+    def artifact_dir(self, key):
+        return self.cache_dir / 'artifacts' / key
+
+    def restore_build(self, key, build_dir):
+        """Restore cached build output into build_dir; returns True on a cache hit"""
+        entry = self._entry(key)
+        artifacts = self.artifact_dir(key)
+        if not entry or not entry.get('compiled') or not artifacts.is_dir():
+            self._record('compile', False)
+            return False
+
+        build_dir = Path(build_dir)
+        if build_dir.exists():
+            shutil.rmtree(build_dir)
+        shutil.copytree(artifacts, build_dir)
+
+        entry['last_used'] = time.time()
+        self._save_index()
+        self._record('compile', True, entry.get('compile_seconds', 0.0))
+        return True
+
+    def store_build(self, key, build_dir, compile_seconds):
+        """Copy a fresh build into the cache and evict old entries over the size limit"""
+        build_dir = Path(build_dir)
+        if not build_dir.is_dir():
+            return
+
+        artifacts = self.artifact_dir(key)
+        if artifacts.exists():
+            shutil.rmtree(artifacts)
+        artifacts.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copytree(build_dir, artifacts)
+
+        entry = self._entry(key, create=True)
+        entry['compiled'] = True
+        entry['compile_seconds'] = compile_seconds
+        entry['size'] = _dir_size(artifacts)
+        entry['last_used'] = time.time()
+        self.evict(keep=key)
+        self._save_index()
+
+    # Publish results
+
+    def lookup_publish(self, key, target):
+        """Return the cached {'tx_hash', 'address'} for target, or None
+
+        Only the latest publish to target counts: sources that were published earlier and then
+        superseded (A, B, back to A) are on chain no longer and must be published again.
+        """
+        entry = self._entry(key)
+        published = (entry or {}).get('published', {}).get(target)
+        if not published or self.index.get('targets', {}).get(target) != key:
+            self._record('publish', False)
+            return None
+
+        entry['last_used'] = time.time()
+        self._save_index()
+        self._record('publish', True, published.get('publish_seconds', 0.0))
+        return published
+
+    def store_publish(self, key, target, tx_hash, address, publish_seconds):
+        """Remember the publish result of key on target"""
+        entry = self._entry(key, create=True)
+        entry['published'][target] = {
+            'tx_hash': tx_hash,
+            'address': address,
+            'publish_seconds': publish_seconds,
+            'published_at': time.time(),
+        }
+        self.index.setdefault('targets', {})[target] = key
+        entry['last_used'] = time.time()
+        self._save_index()
+
+    # Eviction
+
+    def total_size(self):
+        return sum(e.get('size', 0) for e in self.index['entries'].values())
+
+    def evict(self, keep=None):
+        """Drop least recently used artifacts until the cache fits in max_size_bytes
+
+        Publish records take no space, so entries that hold them keep the records and
+        lose only their artifacts; entries without artifacts are never touched.
+        """
+        entries = self.index['entries']
+        evicted = []
+        for key in sorted(entries, key=lambda k: entries[k].get('last_used', 0)):
+            if self.total_size() <= self.max_size_bytes:
+                break
+            if key == keep or not entries[key].get('size', 0):
+                continue
+            shutil.rmtree(self.artifact_dir(key), ignore_errors=True)
+            if entries[key].get('published'):
+                entries[key].update(compiled=False, size=0)
+            else:
+                del entries[key]
+            evicted.append(key)
+        return evicted
+
+    def clear(self):
+        """Remove every cached artifact and publish record"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.index = {'entries': {}}
+
+    def print_report(self):
+        """Print cache hits, misses and the time saved"""
+        print("\n🗄️  Build cache report")
+        for kind, hit, saved in self.events:
+            status = f"hit (saved ~{saved:.1f}s)" if hit else "miss"
+            print(f"   {kind:<8} {status}")
+        print(f"   Hits: {self.hits}  Misses: {self.misses}  Time saved: ~{self.time_saved:.1f}s")
+        print(f"   Cache size: {self.total_size() / (1024 * 1024):.1f} MB / "
+              f"{self.max_size_bytes / (1024 * 1024):.0f} MB ({self.cache_dir})")
+
+
+def self_check():
+    """Check that publish records skip only a target's latest publish"""
+    import tempfile
+
+    failures = []
+
+    def check(name, ok):
+        print(f"   {'✅' if ok else '❌'} {name}")
+        if not ok:
+            failures.append(name)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = BuildCache(cache_dir=tmp, max_size_mb=1)
+        target, other = 'testnet:copy-trading-deploy', 'devnet:copy-trading-deploy'
+        check("an unpublished hash is a miss", cache.lookup_publish('A', target) is None)
+
+        cache.store_publish('A', target, '0xa', '0x1', 1.0)
+        check("republishing the same sources is skipped", (cache.lookup_publish('A', target) or {}).get('tx_hash') == '0xa')
+        check("publish records are per target", cache.lookup_publish('A', other) is None)
+
+        cache.store_publish('B', target, '0xb', '0x1', 1.0)
+        check("after A then B, reverting to A publishes again", cache.lookup_publish('A', target) is None)
+        check("B is the target's latest publish", (cache.lookup_publish('B', target) or {}).get('tx_hash') == '0xb')
+
+        cache.store_publish('A', target, '0xa2', '0x1', 1.0)
+        check("the A republish is now the latest", (cache.lookup_publish('A', target) or {}).get('tx_hash') == '0xa2'
+              and cache.lookup_publish('B', target) is None)
+        check("the latest publish survives a reload",
+              (BuildCache(cache_dir=tmp).lookup_publish('A', target) or {}).get('tx_hash') == '0xa2')
+
+    print(f"🔍 {len(failures)} failed checks")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the Move build cache")
+    parser.add_argument('--self-check', action='store_true',
+                        help="check publish-record bookkeeping in a scratch cache directory")
+    args = parser.parse_args()
+
+    if args.self_check:
+        sys.exit(0 if self_check() else 1)
+
+    BuildCache().print_report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Vectorized follower fan-out engine for OneClick Copy Trading
+Turns trader trade events (copy_trading::execute_copy_trade) into per-follower order amounts
+using every follower's CopySetting, held in NumPy arrays indexed by trader
+
+Order sizing follows the Move integer semantics that an on-chain fan-out would use:
+
+    let scaled = ((amount as u128) * (allocation_amount as u128) / (trader_equity as u128) as u64);
+    min(scaled, max_position_size, allocation_amount)
+
+A follower copies the trade in proportion to its allocation relative to the trader's equity.
+Unless set explicitly with set_trader_equity(), a trader's equity is its total_aum, kept exactly as
+TraderProfile.total_aum is: follow_trader adds the allocation, unfollow_trader subtracts it, and
+emergency_stop only deactivates settings, so their allocations stay in total_aum.
+
+Unlike copy_trading::follow_trader, which pushes a second CopySetting when a follower follows the
+same trader again, a follower holds at most one setting per trader here; repeat follows raise.
+"""
+
+import argparse
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ NumPy not found. Please install it first: pip install numpy")
+    sys.exit(1)
+
+U64_MAX = (1 << 64) - 1
+INITIAL_CAPACITY = 16
+CHUNK_SIZE = 32768
+
+
+class TraderFollowers:
+    """Struct-of-arrays view of every CopySetting that follows one trader"""
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self.count = 0
+        self.follower_ids = np.zeros(capacity, dtype=np.int64)
+        self.allocation = np.zeros(capacity, dtype=np.uint64)
+        self.max_position = np.zeros(capacity, dtype=np.uint64)
+        self.stop_loss = np.zeros(capacity, dtype=np.uint8)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.rows = {}  # follower id -> row
+        self.total_aum = 0
+        self.equity = None
+
+    def _reserve(self, needed):
+        capacity = len(self.allocation)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ('follower_ids', 'allocation', 'max_position', 'stop_loss', 'active'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, follower_id, allocation, max_position, stop_loss):
+        if follower_id in self.rows:
+            raise ValueError(f"Follower {follower_id} already follows this trader")
+        self._reserve(self.count + 1)
+        row = self.count
+        self.follower_ids[row] = follower_id
+        self.allocation[row] = allocation
+        self.max_position[row] = max_position
+        self.stop_loss[row] = stop_loss
+        self.active[row] = True
+        self.rows[follower_id] = row
+        self.count += 1
+        self.total_aum += int(allocation)
+
+    def extend(self, follower_ids, allocation, max_position, stop_loss):
+        """Bulk-append settings for many followers at once; nothing is changed if any already follows"""
+        ids = np.asarray(follower_ids).tolist()
+        n = len(ids)
+        seen = set()
+        for follower_id in ids:
+            if follower_id in self.rows or follower_id in seen:
+                raise ValueError(f"Follower {follower_id} already follows this trader")
+            seen.add(follower_id)
+        self._reserve(self.count + n)
+        rows = slice(self.count, self.count + n)
+        self.follower_ids[rows] = follower_ids
+        self.allocation[rows] = allocation
+        self.max_position[rows] = max_position
+        self.stop_loss[rows] = stop_loss
+        self.active[rows] = True
+        for offset, follower_id in enumerate(ids):
+            self.rows[follower_id] = self.count + offset
+        self.count += n
+        self.total_aum += int(np.asarray(allocation, dtype=np.uint64).sum(dtype=object))
+
+    def remove(self, follower_id):
+        """Swap-remove a follower, returning its allocation (0 if it was not following)
+
+        Like unfollow_trader, the allocation leaves total_aum whether or not the setting is active.
+        """
+        row = self.rows.pop(follower_id, None)
+        if row is None:
+            return 0
+        allocation = int(self.allocation[row])
+        self.total_aum -= allocation
+        last = self.count - 1
+        if row != last:
+            for name in ('follower_ids', 'allocation', 'max_position', 'stop_loss', 'active'):
+                column = getattr(self, name)
+                column[row] = column[last]
+            self.rows[int(self.follower_ids[row])] = row
+        self.count = last
+        return allocation
+
+    def deactivate(self, follower_id):
+        """Stop copying for a follower; emergency_stop leaves total_aum untouched"""
+        row = self.rows.get(follower_id)
+        if row is not None:
+            self.active[row] = False
+
+
+class FanoutEngine:
+    """Holds all followers' copy settings and sizes their copy orders per trader event"""
+
+    def __init__(self):
+        self.traders = {}
+        self.address_ids = {}
+        self.addresses = []
+        self.following = {}  # follower id -> set of trader addresses
+
+    def _follower_id(self, address):
+        follower_id = self.address_ids.get(address)
+        if follower_id is None:
+            follower_id = len(self.addresses)
+            self.address_ids[address] = follower_id
+            self.addresses.append(address)
+        return follower_id
+
+    def _book(self, trader_address):
+        book = self.traders.get(trader_address)
+        if book is None:
+            book = self.traders[trader_address] = TraderFollowers()
+        return book
+
+    def follow_trader(self, follower_address, trader_address, allocation_amount, max_position_size,
+                      stop_loss_percentage):
+        """Mirror of copy_trading::follow_trader"""
+        if allocation_amount <= 0:
+            raise ValueError("allocation_amount must be positive")
+        if not 0 < stop_loss_percentage <= 100:
+            raise ValueError("stop_loss_percentage must be in 1..100")
+        follower_id = self._follower_id(follower_address)
+        self._book(trader_address).add(follower_id, allocation_amount, max_position_size, stop_loss_percentage)
+        self.following.setdefault(follower_id, set()).add(trader_address)
+
+    def load_followers(self, trader_address, follower_addresses, allocation_amounts, max_position_sizes,
+                       stop_loss_percentages):
+        """Bulk-load many CopySettings for one trader (e.g. from an indexer snapshot)"""
+        follower_ids = np.fromiter((self._follower_id(a) for a in follower_addresses), dtype=np.int64,
+                                   count=len(follower_addresses))
+        self._book(trader_address).extend(follower_ids, allocation_amounts, max_position_sizes,
+                                          stop_loss_percentages)
+        for follower_id in follower_ids.tolist():
+            self.following.setdefault(follower_id, set()).add(trader_address)
+
+    def unfollow_trader(self, follower_address, trader_address):
+        """Mirror of copy_trading::unfollow_trader; returns the released allocation"""
+        follower_id = self.address_ids.get(follower_address)
+        book = self.traders.get(trader_address)
+        if follower_id is None or book is None:
+            return 0
+        self.following.get(follower_id, set()).discard(trader_address)
+        return book.remove(follower_id)
+
+    def emergency_stop(self, follower_address):
+        """Mirror of copy_trading::emergency_stop: deactivate every copy setting of a follower"""
+        follower_id = self.address_ids.get(follower_address)
+        if follower_id is None:
+            return
+        for trader_address in self.following.get(follower_id, ()):
+            self.traders[trader_address].deactivate(follower_id)
+
+    def set_trader_equity(self, trader_address, equity):
+        """Override the capital that a trader's trade amounts are relative to"""
+        self._book(trader_address).equity = equity
+
+    def fan_out(self, trader_address, amount):
+        """Size every active follower's copy of one trade
+
+        Returns (follower_ids, order_amounts, stop_loss_percentages) for followers with a
+        non-zero order; use follower_addresses() to map ids back to addresses.
+        """
+        book = self.traders.get(trader_address)
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.uint8))
+        if book is None or book.count == 0 or amount <= 0:
+            return empty
+        equity = book.equity if book.equity is not None else book.total_aum
+        if equity <= 0:
+            return empty
+
+        n = book.count
+        follower_ids, allocation = book.follower_ids[:n], book.allocation[:n]
+        max_position, stop_loss = book.max_position[:n], book.stop_loss[:n]
+        active = book.active[:n]
+        if not active.all():
+            # Inactive settings are skipped before sizing, like the scalar loop
+            follower_ids, allocation = follower_ids[active], allocation[active]
+            max_position, stop_loss = max_position[active], stop_loss[active]
+
+        scaled = scale_u64(amount, allocation, equity)
+        orders = np.minimum(np.minimum(scaled, max_position), allocation)
+        keep = orders > 0
+        return follower_ids[keep], orders[keep], stop_loss[keep]
+
+    def process_events(self, events):
+        """Fan out a stream of (trader_address, symbol, amount, is_buy) events
+
+        Yields (trader_address, symbol, is_buy, follower_ids, order_amounts, stop_losses).
+        """
+        for trader_address, symbol, amount, is_buy in events:
+            follower_ids, orders, stop_losses = self.fan_out(trader_address, amount)
+            yield trader_address, symbol, is_buy, follower_ids, orders, stop_losses
+
+    def follower_addresses(self, follower_ids):
+        return [self.addresses[i] for i in np.asarray(follower_ids).tolist()]
+
+
+_MASK32 = np.uint64(0xFFFFFFFF)
+_SHIFT32 = np.uint64(32)
+
+
+def mul_u64(x, y):
+    """Full 128-bit product of a uint64 array and a scalar, as (hi, lo) uint64 arrays"""
+    x0, x1 = x & _MASK32, x >> _SHIFT32
+    y0, y1 = np.uint64(y & 0xFFFFFFFF), np.uint64(y >> 32)
+    p00, p01, p10, p11 = x0 * y0, x0 * y1, x1 * y0, x1 * y1
+    mid = (p00 >> _SHIFT32) + (p01 & _MASK32) + (p10 & _MASK32)
+    lo = (p00 & _MASK32) | (mid << _SHIFT32)
+    hi = p11 + (p01 >> _SHIFT32) + (p10 >> _SHIFT32) + (mid >> _SHIFT32)
+    return hi, lo
+
+
+def _mulhi_into(x, y, out, scratch):
+    """out = high 64 bits of x * y, using preallocated scratch buffers (no temporaries)"""
+    x0, x1, a, b, c = scratch
+    y0, y1 = np.uint64(y & 0xFFFFFFFF), np.uint64(y >> 32)
+    np.bitwise_and(x, _MASK32, out=x0)
+    np.right_shift(x, _SHIFT32, out=x1)
+    np.multiply(x0, y0, out=a)
+    np.right_shift(a, _SHIFT32, out=a)
+    np.multiply(x0, y1, out=b)
+    np.bitwise_and(b, _MASK32, out=out)
+    np.add(a, out, out=a)
+    np.multiply(x1, y0, out=c)
+    np.bitwise_and(c, _MASK32, out=out)
+    np.add(a, out, out=a)
+    np.right_shift(a, _SHIFT32, out=a)
+    np.right_shift(b, _SHIFT32, out=b)
+    np.right_shift(c, _SHIFT32, out=c)
+    np.multiply(x1, y1, out=out)
+    np.add(out, b, out=out)
+    np.add(out, c, out=out)
+    np.add(out, a, out=out)
+
+
+def scale_u64(amount, multipliers, divisor, chunk=CHUNK_SIZE):
+    """floor(amount * multipliers / divisor) with a u128 intermediate, as u64
+
+    amount/divisor is split into q + r/divisor on the host; floor(r * m / divisor) is estimated
+    from a 64-bit fixed-point reciprocal and corrected exactly, so every row stays in uint64
+    arithmetic. Work is done in cache-sized chunks with reused buffers. Results that do not
+    fit in u64 would abort on-chain and raise OverflowError here.
+    """
+    multipliers = np.asarray(multipliers, dtype=np.uint64)
+    amount, divisor = int(amount), int(divisor)
+    if divisor <= 0:
+        raise ZeroDivisionError("divisor must be positive")
+    q, r = divmod(amount, divisor)
+    n = len(multipliers)
+    if q > U64_MAX and n and multipliers.max() > 0:
+        raise OverflowError("scaled order amount does not fit in u64")
+    if divisor >= (1 << 63):
+        return _scale_u64_wide(q, r, multipliers, divisor)
+
+    result = np.empty(n, dtype=np.uint64)
+    scratch = [np.empty(min(n, chunk), dtype=np.uint64) for _ in range(6)]
+    reciprocal = (r << 64) // divisor
+    q_limit = np.uint64(U64_MAX // q) if q else None
+    r64, d64, q64 = np.uint64(r), np.uint64(divisor), np.uint64(min(q, U64_MAX))
+
+    for start in range(0, n, chunk):
+        m = multipliers[start:start + chunk]
+        k = len(m)
+        out = result[start:start + k]
+        x0, x1, a, b, c, t = (buf[:k] for buf in scratch)
+
+        if r:
+            # t = floor(m * F / 2^64) is floor(r * m / divisor) or one less; the remainder
+            # r * m - t * divisor lies in [0, 2 * divisor) so wrapping u64 arithmetic is exact
+            _mulhi_into(m, reciprocal, out, (x0, x1, a, b, c))
+            np.multiply(m, r64, out=a)
+            np.multiply(out, d64, out=b)
+            np.subtract(a, b, out=a)
+            np.add(out, (a >= d64), out=out, casting='unsafe')
+        else:
+            out.fill(0)
+
+        if q:
+            if np.any(m > q_limit):
+                raise OverflowError("scaled order amount does not fit in u64")
+            np.multiply(m, q64, out=t)
+            np.add(out, t, out=out)
+            if np.any(out < t):
+                raise OverflowError("scaled order amount does not fit in u64")
+    return result
+
+
+def _scale_u64_wide(q, r, multipliers, divisor):
+    """scale_u64 for divisors of 2^63 and above, where the remainder needs 128 bits"""
+    if r == 0:
+        fraction = np.zeros(len(multipliers), dtype=np.uint64)
+    else:
+        t, _ = mul_u64(multipliers, (r << 64) // divisor)
+        num_hi, num_lo = mul_u64(multipliers, r)
+        up_hi, up_lo = mul_u64(t + np.uint64(1), divisor)
+        bump = (num_hi > up_hi) | ((num_hi == up_hi) & (num_lo >= up_lo))
+        fraction = t + bump.astype(np.uint64)
+    if q == 0:
+        return fraction
+    if np.any(multipliers > np.uint64(U64_MAX // q)):
+        raise OverflowError("scaled order amount does not fit in u64")
+    whole = multipliers * np.uint64(q)
+    result = whole + fraction
+    if np.any(result < whole):
+        raise OverflowError("scaled order amount does not fit in u64")
+    return result
+
+
+def fan_out_scalar(settings, amount, equity):
+    """Reference loop over (follower, allocation, max_position, stop_loss, is_active) tuples"""
+    orders = []
+    if amount <= 0 or equity <= 0:
+        return orders
+    for follower, allocation, max_position, stop_loss, is_active in settings:
+        if not is_active:
+            continue
+        scaled = (amount * allocation) // equity
+        if scaled > U64_MAX:
+            raise OverflowError("scaled order amount does not fit in u64")
+        order = min(scaled, max_position, allocation)
+        if order > 0:
+            orders.append((follower, order, stop_loss))
+    return orders
+
+
+def benchmark(followers, events, seed):
+    """Time fan_out() for one trader with many followers and check it against the scalar loop"""
+    rng = np.random.default_rng(seed)
+    engine = FanoutEngine()
+    trader = '0xtrader'
+
+    print(f"🧮 Loading {followers:,} followers...")
+    started = time.perf_counter()
+    allocation = rng.integers(1, 10**12, followers, dtype=np.uint64)
+    max_position = rng.integers(0, 10**12, followers, dtype=np.uint64)
+    stop_loss = rng.integers(1, 101, followers, dtype=np.uint8)
+    engine.load_followers(trader, [f'0x{i:x}' for i in range(followers)], allocation, max_position, stop_loss)
+    print(f"✅ Loaded in {time.perf_counter() - started:.2f}s")
+
+    amounts = rng.integers(1, 10**15, events, dtype=np.uint64).tolist()
+    timings = []
+    for amount in amounts:
+        started = time.perf_counter()
+        engine.fan_out(trader, amount)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    print(f"⚡ fan_out over {followers:,} followers: median {timings[len(timings) // 2] * 1000:.2f} ms, "
+          f"max {timings[-1] * 1000:.2f} ms ({events} events)")
+
+    # Differential check on a sample of followers
+    book = engine.traders[trader]
+    sample = min(followers, 20000)
+    sample_engine = FanoutEngine()
+    sample_engine.load_followers(trader, engine.addresses[:sample], allocation[:sample],
+                                 max_position[:sample], stop_loss[:sample])
+    sample_engine.set_trader_equity(trader, book.total_aum)
+    settings = list(zip(range(sample), allocation[:sample].tolist(), max_position[:sample].tolist(),
+                        stop_loss[:sample].tolist(), [True] * sample))
+    for amount in amounts[:5] + [U64_MAX]:
+        ids, orders, stops = sample_engine.fan_out(trader, amount)
+        expected = fan_out_scalar(settings, amount, book.total_aum)
+        if list(zip(ids.tolist(), orders.tolist(), stops.tolist())) != expected:
+            print("❌ Vectorized fan-out disagrees with the scalar reference")
+            return False
+    print("✅ Vectorized fan-out matches the scalar reference")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized copy-trade fan-out engine")
+    parser.add_argument('--followers', type=int, default=1_000_000)
+    parser.add_argument('--events', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    if not benchmark(args.followers, args.events, args.seed):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Static cost analyzer for the OneClick Copy Trading Move sources
+Finds loops and linear vector:: operations over collections stored in resources, estimates how
+each public and entry function's cost grows with them, and fails when a hot entry point gains an
+unbounded scan that is not in the accepted baseline
+
+A function's cost is a sum of terms, each the product of the stored collections it walks:
+
+    while/loop/for bounded by vector::length(&c) or indexing c       |c| per iteration of outer loops
+    vector::contains/index_of/remove/insert/reverse/... on c         |c|
+    returning or dereferencing a whole stored vector (a copy)        |c|
+    call to another package function                                 the callee's terms, with its
+                                                                     vector parameters replaced by
+                                                                     the caller's arguments
+
+Collections are resource fields of vector type (vector<u8> byte strings excluded). A resource
+borrowed at a fixed address (@copy_trading) is global and grows with the registry; any other
+grows per account. Nested walks over the same collection count once.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+SOURCES_DIR = Path('sources')
+BASELINE_FILE = Path('cost-baseline.json')
+
+# Entry and public functions (views included, other modules can call them on-chain) are hot
+# unless listed here
+COLD_FUNCTIONS = {'main::emergency_stop', 'user_vault::emergency_close_all'}
+
+LINEAR_OPS = {'contains', 'index_of', 'find', 'remove', 'remove_value', 'insert', 'reverse', 'append',
+              'rotate', 'trim', 'trim_reverse', 'for_each', 'for_each_ref', 'for_each_mut', 'map',
+              'map_ref', 'filter', 'fold', 'any', 'all'}
+INDEXED_OPS = ('borrow', 'borrow_mut', 'swap', 'remove', 'swap_remove')
+
+MODULE_RE = re.compile(r'\bmodule\s+(\w+)::(\w+)\s*\{')
+STRUCT_RE = re.compile(r'\bstruct\s+(\w+)(?:\s*<[^>{]*>)?\s*(?:has\s+([\w\s,]+))?\{')
+FUN_RE = re.compile(r'((?:#\[[^\]]*\]\s*)*)(public(?:\s*\(\s*\w+\s*\))?\s+)?(entry\s+)?'
+                    r'(?:inline\s+)?fun\s+(\w+)')
+BORROW_RE = re.compile(r'\blet\s+(?:mut\s+)?(\w+)\s*(?::[^=]+)?=\s*borrow_global(?:_mut)?\s*<\s*([\w:]+)\s*>\s*\(([^)]*)\)')
+ALIAS_RE = re.compile(r'\blet\s+(?:mut\s+)?(\w+)\s*(?::[^=]+)?=\s*&\s*(?:mut\s+)?([\w.]+)\s*;')
+LENGTH_LET_RE = re.compile(r'\blet\s+(?:mut\s+)?(\w+)\s*(?::[^=]+)?=\s*vector::length\s*\(\s*&?\s*(?:mut\s+)?([\w.*]+)\s*\)')
+LOOP_RE = re.compile(r'\b(while|loop|for)\b')
+VECTOR_OP_RE = re.compile(r'\bvector::(\w+)\s*\(\s*&?\s*(?:mut\s+)?([\w.*]+)')
+DEREF_RE = re.compile(r'\*\s*&?\s*(?:mut\s+)?(\w+\.\w+)')
+CALL_RE = re.compile(r'(?<![\w.:])(?:(\w+)::)?(\w+)\s*(?:<[^<>()]*>)?\s*\(')
+
+
+def strip_comments(text):
+    """Blank out comments and string literals, keeping offsets and line numbers"""
+    def blank(match):
+        return re.sub(r'[^\n]', ' ', match.group(0))
+
+    def literal(match):
+        quote = match.group(0)
+        return quote[0] + ' ' * (len(quote) - 2) + quote[-1] if len(quote) >= 2 else quote
+
+    text = re.sub(r'/\*.*?\*/', blank, text, flags=re.S)
+    text = re.sub(r'//[^\n]*', blank, text)
+    return re.sub(r'(?<=[bx])"(?:[^"\\]|\\.)*"', literal, text)
+
+
+def matching(text, start, open_char='{', close_char='}'):
+    """Index just past the bracket that closes the one at start"""
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == open_char:
+            depth += 1
+        elif text[i] == close_char:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    raise ValueError(f"Unbalanced {open_char} at offset {start}")
+
+
+def split_top_level(text):
+    parts, depth, current = [], 0, ''
+    for char in text:
+        if char in '(<{[':
+            depth += 1
+        elif char in ')>}]':
+            depth -= 1
+        if char == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+        else:
+            current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+class Function:
+    """A parsed function and the raw scans found in its body"""
+
+    def __init__(self, module, name, visibility, entry, attributes, params, body, body_start, path, text):
+        self.module = module
+        self.name = name
+        self.public = bool(visibility) and 'friend' not in visibility and 'package' not in visibility
+        self.entry = entry
+        self.view = '#[view]' in attributes.replace(' ', '')
+        self.params = params              # [(name, type)]
+        self.body = body
+        self.body_start = body_start
+        self.path = path
+        self.text = text
+
+    @property
+    def qualified(self):
+        return f"{self.module}::{self.name}"
+
+    def line(self, offset):
+        return self.text.count('\n', 0, self.body_start + offset) + 1
+
+
+class Package:
+    """Modules, stored collections and functions of every Move file in a directory"""
+
+    def __init__(self, sources_dir=SOURCES_DIR):
+        self.collections = {}   # 'module::Struct' -> {field: collection name}
+        self.global_structs = set()
+        self.functions = {}     # 'module::name' -> Function
+        for path in sorted(Path(sources_dir).glob('*.move')):
+            self._parse_file(path)
+
+    def _parse_file(self, path):
+        text = strip_comments(path.read_text())
+        for module_match in MODULE_RE.finditer(text):
+            module = module_match.group(2)
+            end = matching(text, module_match.end() - 1)
+            self._parse_module(module, text, module_match.end(), end - 1, path)
+
+    def _parse_module(self, module, text, start, end, path):
+        source = text[start:end]
+        for struct in STRUCT_RE.finditer(source):
+            abilities = struct.group(2) or ''
+            body = source[struct.end():matching(source, struct.end() - 1) - 1]
+            if 'key' not in abilities:
+                continue
+            fields = {}
+            for field in split_top_level(body):
+                name, _, field_type = field.partition(':')
+                field_type = field_type.replace(' ', '')
+                if field_type.startswith('vector<') and field_type != 'vector<u8>':
+                    fields[name.strip()] = f"{module}::{struct.group(1)}.{name.strip()}"
+            if fields:
+                self.collections[f"{module}::{struct.group(1)}"] = fields
+        for borrow in re.finditer(r'borrow_global(?:_mut)?\s*<\s*(\w+)\s*>\s*\(\s*@', source):
+            self.global_structs.add(f"{module}::{borrow.group(1)}")
+
+        for fun in FUN_RE.finditer(source):
+            attributes = fun.group(1) or ''
+            if '#[test' in attributes.replace(' ', ''):
+                continue
+            paren = source.index('(', fun.end())
+            params_end = matching(source, paren, '(', ')')
+            brace = source.find('{', params_end)
+            semicolon = source.find(';', params_end)
+            if brace < 0 or 0 <= semicolon < brace:
+                continue    # native function
+            body_end = matching(source, brace) - 1
+            params = []
+            for param in split_top_level(source[paren + 1:params_end - 1]):
+                name, _, param_type = param.partition(':')
+                params.append((name.strip(), param_type.strip()))
+            function = Function(module, fun.group(4), fun.group(2), bool(fun.group(3)), attributes,
+                                params, source[brace + 1:body_end], start + brace + 1, path, text)
+            self.functions[function.qualified] = function
+
+    def is_global(self, collection):
+        return collection.split('.')[0] in self.global_structs
+
+    def struct_name(self, module, name):
+        return name if '::' in name else f"{module}::{name}"
+
+
+class Analyzer:
+    """Cost terms per function, resolved transitively through calls"""
+
+    def __init__(self, package):
+        self.package = package
+        self._terms = {}
+
+    def _resolver(self, function):
+        """Map an expression in the function body to a stored collection, 'param:<name>' or None"""
+        bindings = {}
+        for name, param_type in function.params:
+            struct = param_type.lstrip('&').replace('mut ', '').strip()
+            bindings[name] = self.package.struct_name(function.module, struct)
+        for borrow in BORROW_RE.finditer(function.body):
+            bindings[borrow.group(1)] = self.package.struct_name(function.module, borrow.group(2))
+        vector_params = {name for name, param_type in function.params if 'vector<' in param_type
+                         and param_type.replace(' ', '').lstrip('&').replace('mut', '', 1) != 'vector<u8>'}
+        aliases = {}
+
+        def resolve(expression):
+            expression = expression.lstrip('*&').strip()
+            if '.' in expression:
+                var, field = expression.split('.', 1)
+                return self.package.collections.get(bindings.get(var), {}).get(field)
+            if expression in aliases:
+                return aliases[expression]
+            if expression in vector_params:
+                return f"param:{expression}"
+            return None
+
+        for alias in ALIAS_RE.finditer(function.body):
+            collection = resolve(alias.group(2))
+            if collection:
+                aliases[alias.group(1)] = collection
+        return resolve
+
+    def _loops(self, function, resolve):
+        """(start, end, collection or 'unbounded loop') for each loop in the body"""
+        body = function.body
+        lengths = {m.group(1): m.group(2) for m in LENGTH_LET_RE.finditer(body)}
+        loops = []
+        for match in LOOP_RE.finditer(body):
+            brace = body.find('{', match.end())
+            end = matching(body, brace)
+            condition, loop_body = body[match.end():brace], body[brace:end]
+            collection = None
+            for name in re.findall(r'\w+', condition):
+                if name in lengths:
+                    collection = resolve(lengths[name])
+            inline = re.search(r'vector::length\s*\(\s*&?\s*(?:mut\s+)?([\w.*]+)', condition)
+            if collection is None and inline:
+                collection = resolve(inline.group(1))
+            if collection is None:
+                for op in VECTOR_OP_RE.finditer(loop_body):
+                    if op.group(1) in INDEXED_OPS and resolve(op.group(2)):
+                        collection = resolve(op.group(2))
+                        break
+            loops.append((match.start(), end, collection or f"unbounded loop@{function.line(match.start())}",
+                          match.group(1)))
+        return loops
+
+    def terms(self, qualified, stack=()):
+        """[(collections, op, line, via)] for a function; collections is a sorted tuple"""
+        if qualified in self._terms:
+            return self._terms[qualified]
+        function = self.package.functions[qualified]
+        if qualified in stack:
+            return []       # recursion: counted once at the outermost call
+        resolve = self._resolver(function)
+        loops = self._loops(function, resolve)
+        body = function.body
+
+        def enclosing(offset):
+            return {collection for start, end, collection, _ in loops if start < offset < end}
+
+        found = []
+
+        def add(offset, collections, op, via=()):
+            collections = set(collections) | enclosing(offset)
+            if collections:
+                found.append((tuple(sorted(collections)), op, function.line(offset), via))
+
+        for start, _, collection, keyword in loops:
+            add(start, [collection], keyword)
+        for op in VECTOR_OP_RE.finditer(body):
+            collection = resolve(op.group(2))
+            if op.group(1) in LINEAR_OPS and collection:
+                add(op.start(), [collection], op.group(1))
+        for deref in DEREF_RE.finditer(body):
+            collection = resolve(deref.group(1))
+            if collection:
+                add(deref.start(), [collection], 'copy')
+        trailing = body.rstrip().rsplit(';', 1)[-1].rsplit('{', 1)[-1].strip()
+        if trailing and resolve(trailing) and not resolve(trailing).startswith('param:'):
+            add(body.rstrip().rfind(trailing), [resolve(trailing)], 'copy')
+
+        for call in CALL_RE.finditer(body):
+            module, name = call.group(1) or function.module, call.group(2)
+            callee = f"{module}::{name}"
+            if callee not in self.package.functions or callee == qualified:
+                continue
+            arguments = split_top_level(body[call.end():matching(body, call.end() - 1, '(', ')') - 1])
+            callee_params = [p for p, _ in self.package.functions[callee].params]
+            mapping = dict(zip(callee_params, arguments))
+            for collections, op, line, via in self.terms(callee, stack + (qualified,)):
+                mapped = []
+                for collection in collections:
+                    if collection.startswith('param:'):
+                        collection = resolve(mapping.get(collection[6:], ''))
+                        if collection is None:
+                            continue    # bounded by data local to this function
+                    mapped.append(collection)
+                if mapped:
+                    add(call.start(), mapped, op, (f"{callee}:{line}",) + via)
+
+        # Keep one term per (collections, op) with its first location
+        unique = {}
+        for term in found:
+            unique.setdefault(term[:2], term)
+        self._terms[qualified] = sorted(unique.values(), key=lambda t: t[2])
+        return self._terms[qualified]
+
+    def report(self):
+        """Every public or entry function with its stored-collection terms"""
+        report = {}
+        for qualified, function in sorted(self.package.functions.items()):
+            if not (function.public or function.entry):
+                continue
+            terms = [t for t in self.terms(qualified) if not any(c.startswith('param:') for c in t[0])]
+            report[qualified] = {
+                'entry': function.entry,
+                'view': function.view,
+                'hot': qualified not in COLD_FUNCTIONS,
+                'file': function.path.name,
+                'complexity': complexity([t[0] for t in terms]),
+                'scans': [{'collections': list(collections), 'op': op, 'line': line, 'via': list(via)}
+                          for collections, op, line, via in terms],
+            }
+        return report
+
+
+def complexity(products):
+    if not products:
+        return 'O(1)'
+    # Drop terms dominated by a larger product that contains them
+    kept = {p for p in products if not any(set(p) < set(q) for q in products)}
+    return 'O(' + ' + '.join('·'.join(f"|{c}|" for c in p) for p in sorted(kept)) + ')'
+
+
+def finding_key(function, scan):
+    return f"{function} {scan['op']} {'*'.join(scan['collections'])}"
+
+
+def hot_findings(report):
+    return {finding_key(name, scan): (name, scan)
+            for name, entry in report.items() if entry['hot'] for scan in entry['scans']}
+
+
+def load_baseline(path=BASELINE_FILE):
+    try:
+        with open(path, 'r') as f:
+            return set(json.load(f)['accepted'])
+    except FileNotFoundError:
+        return set()
+
+
+def save_baseline(report, path=BASELINE_FILE):
+    with open(path, 'w') as f:
+        json.dump({'accepted': sorted(hot_findings(report))}, f, indent=2)
+        f.write('\n')
+
+
+def analyze(sources_dir=SOURCES_DIR, baseline_path=BASELINE_FILE):
+    """(report, new hot findings, accepted findings that no longer occur)"""
+    report = Analyzer(Package(sources_dir)).report()
+    findings = hot_findings(report)
+    baseline = load_baseline(baseline_path)
+    new = {key: value for key, value in findings.items() if key not in baseline}
+    stale = sorted(baseline - set(findings))
+    return report, new, stale
+
+
+def print_report(report, package=None):
+    print(f"\n{'function':<42} {'cost growth'}")
+    for name, entry in report.items():
+        if entry['complexity'] == 'O(1)' and not entry['entry']:
+            continue
+        tag = 'entry' if entry['entry'] else 'view' if entry['view'] else 'public'
+        mark = '⚠️ ' if entry['scans'] and entry['hot'] else '  '
+        print(f"{mark}{name:<40} {entry['complexity']}  [{tag}]")
+        for scan in entry['scans']:
+            via = f" via {' → '.join(scan['via'])}" if scan['via'] else ''
+            print(f"      {entry['file']}:{scan['line']} {scan['op']} over "
+                  f"{' × '.join(scan['collections'])}{via}")
+    if package:
+        collections = sorted(c for fields in package.collections.values() for c in fields.values())
+        print("\n📦 Stored collections: " + ", ".join(
+            f"{c} ({'global' if package.is_global(c) else 'per account'})" for c in collections))
+
+
+def print_new_findings(new):
+    for key, (name, scan) in sorted(new.items()):
+        via = f" via {' → '.join(scan['via'])}" if scan['via'] else ''
+        print(f"   ❌ {name}: {scan['op']} over {' × '.join(scan['collections'])} "
+              f"(line {scan['line']}){via}")
+
+
+def check_deploy(sources_dir=SOURCES_DIR, baseline_path=BASELINE_FILE):
+    """Deploy gate: False when a hot entry point has a scan not in the accepted baseline"""
+    print("\n🔍 Analyzing Move sources for unbounded vector scans...")
+    report, new, stale = analyze(sources_dir, baseline_path)
+    scanning = sum(1 for entry in report.values() if entry['hot'] and entry['scans'])
+    if new:
+        print(f"❌ {len(new)} new unbounded scan(s) on hot entry points:")
+        print_new_findings(new)
+        print("   Bound or index the collection, or accept the cost with: "
+              "python scripts/cost_analyzer.py --update-baseline")
+        return False
+    print(f"✅ No new unbounded scans ({scanning} hot function(s) with accepted scans)")
+    if stale:
+        print(f"ℹ️  {len(stale)} accepted scan(s) no longer occur; refresh with --update-baseline")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find unbounded vector scans in the Move sources")
+    parser.add_argument('--sources', default=str(SOURCES_DIR))
+    parser.add_argument('--baseline', default=str(BASELINE_FILE))
+    parser.add_argument('--update-baseline', action='store_true', help="accept every current hot scan")
+    parser.add_argument('--json', metavar='OUT', help="write the full report as JSON")
+    args = parser.parse_args()
+
+    package = Package(args.sources)
+    if not package.functions:
+        print(f"❌ No Move functions found in {args.sources}")
+        sys.exit(1)
+    report = Analyzer(package).report()
+    print_report(report, package)
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {args.json}")
+
+    if args.update_baseline:
+        save_baseline(report, args.baseline)
+        print(f"\n✅ Accepted {len(hot_findings(report))} hot scan(s) in {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\n⚠️  No baseline at {args.baseline}; every hot scan counts as new")
+    sys.exit(0 if check_deploy(args.sources, args.baseline) else 1)
+
+
+if __name__ == "__main__":
+    main()
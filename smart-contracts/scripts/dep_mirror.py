@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Vendored Move dependency mirror for OneClick Copy Trading
+Keeps a content-addressed local copy of just the aptos-core subdirectories that Move.toml's git
+dependencies need, keyed by repository and rev, shared by every workspace on the machine
+
+The Move CLI resolves a git dependency to $MOVE_HOME/<sanitized url>_<rev>/<subdir> and only clones
+or fetches when that directory is missing or fetching is enabled. The commands these scripts run use
+a private MOVE_HOME beside the mirror whose slots point at trees materialized from the mirror, and
+pass --skip-fetch-latest-git-deps, so the dependencies resolve to local paths without editing
+Move.toml (which would change the build cache key). The user's own ~/.move is shared with plain
+`aptos move` runs that git-fetch into their slots, so it is only ever read, to seed a rev from a
+checkout the CLI already made; otherwise a rev is seeded once by a shallow sparse git fetch, and
+after that everything works offline.
+
+    objects/<aa>/<sha256>        file contents, shared across revs
+    revs/<slot>.json             manifest: git, rev, commit, subdirs, {path: sha256}
+    trees/<tree hash>/...        materialized checkout (hard links into objects/)
+    move-home/<slot>             private MOVE_HOME slots (links into trees/)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from build_cache import read_dependency_revs
+
+DEFAULT_MIRROR_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'oneclick-copy-trading' / 'move-deps'
+SKIP_FETCH_FLAG = ' --skip-fetch-latest-git-deps'
+LOCAL_DEP_RE = re.compile(r'local\s*=\s*"([^"]+)"')
+# fetch_flags() repoints MOVE_HOME for child commands; remember the user's own first
+_SHARED_MOVE_HOME = os.environ.get('MOVE_HOME')
+
+
+def mirror_dir():
+    return Path(os.environ.get('MOVE_DEP_MIRROR') or DEFAULT_MIRROR_DIR)
+
+
+def move_home():
+    """MOVE_HOME for the commands these scripts run"""
+    return Path(os.environ.get('MOVE_DEP_HOME') or mirror_dir() / 'move-home')
+
+
+def user_move_home():
+    """The CLI's own MOVE_HOME, shared by every workspace on the machine; never written to"""
+    configured = os.environ.get('MOVE_HOME')
+    if configured and Path(configured) != move_home():
+        return Path(configured)
+    return Path(_SHARED_MOVE_HOME or Path.home() / '.move')
+
+
+def offline():
+    return os.environ.get('MOVE_DEP_OFFLINE', 'false').lower() == 'true'
+
+
+def slot_name(git_url, rev):
+    """Directory name the Move package resolver uses for a git dependency"""
+    return f"{re.sub(r'[/:.@]', '_', git_url)}_{rev.replace('/', '__')}"
+
+
+def git_dependencies(package_dir='.'):
+    """{(git, rev): [subdir, ...]} for the git dependencies in Move.toml"""
+    repos = {}
+    for _, git, rev, subdir in read_dependency_revs(Path(package_dir) / 'Move.toml'):
+        if git and rev:
+            repos.setdefault((git, rev), []).append(subdir.strip('/'))
+    return repos
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def local_dependencies(checkout, subdirs):
+    """Subdirs reached through local = "../..." dependencies (framework packages use them)"""
+    found = set()
+    for subdir in subdirs:
+        toml = Path(checkout) / subdir / 'Move.toml'
+        if toml.exists():
+            for local in LOCAL_DEP_RE.findall(toml.read_text()):
+                found.add(os.path.normpath(os.path.join(subdir, local)).replace(os.sep, '/'))
+    return found
+
+
+def _git(*args, cwd=None):
+    result = subprocess.run(['git', *args], cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+class Mirror:
+    """Content-addressed store of Move dependency trees"""
+
+    def __init__(self, root=None):
+        self.root = Path(root or mirror_dir())
+        self.fetched = 0
+        self.imported = 0
+
+    def _manifest_path(self, git_url, rev):
+        return self.root / 'revs' / f"{slot_name(git_url, rev)}.json"
+
+    def manifest(self, git_url, rev):
+        try:
+            with open(self._manifest_path(git_url, rev), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _object_path(self, digest):
+        return self.root / 'objects' / digest[:2] / digest
+
+    def _store(self, path):
+        """Add a file to objects/ and return its hash"""
+        digest = _file_hash(path)
+        target = self._object_path(digest)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = target.with_name(f"{digest}.{uuid.uuid4().hex}.tmp")
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, target)
+        return digest
+
+    def ingest(self, checkout, git_url, rev, commit, subdirs):
+        """Record the subdirs of a checkout as the manifest for (git_url, rev)"""
+        files = {}
+        for subdir in subdirs:
+            base = Path(checkout) / subdir
+            if not base.is_dir():
+                raise FileNotFoundError(f"{subdir} not found in {git_url}@{rev}")
+            for root, dirs, names in os.walk(base):
+                dirs[:] = [d for d in dirs if d not in ('.git', 'build')]
+                for name in names:
+                    path = Path(root) / name
+                    files[path.relative_to(checkout).as_posix()] = self._store(path)
+        tree = hashlib.sha256(json.dumps(sorted(files.items())).encode()).hexdigest()
+        manifest = {'git': git_url, 'rev': rev, 'commit': commit, 'subdirs': sorted(subdirs),
+                    'files': files, 'tree': tree, 'seeded_at': time.time()}
+        path = self._manifest_path(git_url, rev)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+        return manifest
+
+    def fetch(self, git_url, rev, subdirs):
+        """Shallow, blob-filtered sparse fetch of just the needed subdirs (and their local deps)"""
+        work = self.root / 'tmp' / uuid.uuid4().hex
+        work.mkdir(parents=True)
+        try:
+            _git('init', '-q', cwd=work)
+            _git('remote', 'add', 'origin', git_url, cwd=work)
+            _git('sparse-checkout', 'set', '--no-cone', *[f"/{s}/" for s in subdirs], cwd=work)
+            _git('fetch', '-q', '--depth', '1', '--filter=blob:none', 'origin', rev, cwd=work)
+            _git('checkout', '-q', 'FETCH_HEAD', cwd=work)
+            wanted = set(subdirs)
+            pending = local_dependencies(work, subdirs) - wanted
+            while pending:
+                wanted.update(pending)
+                _git('sparse-checkout', 'add', *[f"/{s}/" for s in sorted(pending)], cwd=work)
+                pending = local_dependencies(work, pending) - wanted
+            commit = _git('rev-parse', 'FETCH_HEAD', cwd=work)
+            self.fetched += 1
+            extra = {s for s in wanted - set(subdirs) if (work / s).is_dir()}
+            return self.ingest(work, git_url, rev, commit, sorted(set(subdirs) | extra))
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+
+    def materialize(self, manifest, verify=False):
+        """Directory holding the manifest's files, built from objects/ once per distinct tree"""
+        tree = self.root / 'trees' / manifest['tree']
+        if (tree / '.complete').exists() and not (verify and not self.verify(manifest, tree)):
+            return tree
+        staging = tree.with_name(f"{manifest['tree']}.{uuid.uuid4().hex}.tmp")
+        for relative, digest in manifest['files'].items():
+            source = self._object_path(digest)
+            if not source.exists() or (verify and _file_hash(source) != digest):
+                shutil.rmtree(staging, ignore_errors=True)
+                raise FileNotFoundError(f"Mirror object for {relative} is missing or corrupt")
+            target = staging / relative
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copyfile(source, target)
+        (staging / '.complete').write_text(manifest['commit'] or '')
+        shutil.rmtree(tree, ignore_errors=True)
+        os.replace(staging, tree)
+        return tree
+
+    def verify(self, manifest, tree):
+        for relative, digest in manifest['files'].items():
+            path = tree / relative
+            if not path.is_file() or _file_hash(path) != digest:
+                return False
+        return True
+
+    def covers(self, manifest, subdirs):
+        return manifest is not None and set(subdirs) <= set(manifest['subdirs'])
+
+
+def _seed_checkout(git_url, rev, subdirs):
+    """An existing CLI checkout of (git_url, rev) holding every subdir, or None"""
+    for home in (move_home(), user_move_home()):
+        slot = home / slot_name(git_url, rev)
+        if slot.is_dir() and not slot.is_symlink() and all((slot / s).is_dir() for s in subdirs):
+            return slot
+    return None
+
+
+def _release_shared_slot(slot, mirror):
+    """Undo a link into the mirror left in the shared MOVE_HOME by earlier versions of this tool
+
+    Such a slot is not a git checkout, so plain `aptos move` runs that fetch git dependencies fail on it.
+    """
+    if slot.is_symlink() and Path(os.readlink(slot)).parent == mirror.root / 'trees':
+        slot.unlink()
+        print(f"🧹 Removed mirror link {slot}; the Move CLI will check it out again when it needs it")
+
+
+def _link_slot(slot, tree):
+    """Point a private MOVE_HOME slot at a mirrored tree, replacing only links this tool made"""
+    if slot.is_symlink():
+        if Path(os.readlink(slot)) == tree:
+            return
+        slot.unlink()
+    elif slot.exists():
+        return      # a real checkout made by the CLI; it resolves just as well
+    slot.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        slot.symlink_to(tree, target_is_directory=True)
+    except OSError:
+        shutil.copytree(tree, slot)
+
+
+def prepare(package_dir='.', verify=False, mirror=None):
+    """Make every git dependency resolvable locally; returns True when all of them are"""
+    mirror = mirror or Mirror()
+    started = time.perf_counter()
+    ready = True
+    for (git_url, rev), subdirs in sorted(git_dependencies(package_dir).items()):
+        slot = move_home() / slot_name(git_url, rev)
+        _release_shared_slot(user_move_home() / slot_name(git_url, rev), mirror)
+        manifest = mirror.manifest(git_url, rev)
+        if not mirror.covers(manifest, subdirs):
+            checkout = _seed_checkout(git_url, rev, subdirs)
+            if checkout is not None:
+                # Seed from a checkout the CLI already made, no network needed
+                commit = _git('rev-parse', 'HEAD', cwd=checkout) if (checkout / '.git').exists() else None
+                wanted, pending = set(subdirs), set(subdirs)
+                while pending:
+                    pending = {d for d in local_dependencies(checkout, pending) if (checkout / d).is_dir()} - wanted
+                    wanted.update(pending)
+                manifest = mirror.ingest(checkout, git_url, rev, commit, sorted(wanted))
+                mirror.imported += 1
+            elif offline():
+                print(f"❌ {git_url}@{rev} is not in the mirror at {mirror.root} and MOVE_DEP_OFFLINE=true")
+                ready = False
+                continue
+            else:
+                print(f"📥 Seeding {', '.join(subdirs)} from {git_url}@{rev}...")
+                try:
+                    manifest = mirror.fetch(git_url, rev, subdirs)
+                except (RuntimeError, FileNotFoundError, OSError) as e:
+                    print(f"❌ Could not seed {git_url}@{rev}: {e}")
+                    ready = False
+                    continue
+        try:
+            tree = mirror.materialize(manifest, verify=verify)
+        except FileNotFoundError as e:
+            print(f"❌ {e}; run again without MOVE_DEP_OFFLINE to re-seed")
+            ready = False
+            continue
+        _link_slot(slot, tree)
+        print(f"✅ {git_url}@{rev}: {len(manifest['files']):,} files from the mirror "
+              f"({(manifest.get('commit') or 'unknown commit')[:12]})")
+    if ready:
+        print(f"📦 Move dependencies ready in {time.perf_counter() - started:.2f}s "
+              f"({mirror.fetched} fetched, {mirror.imported} imported)")
+    return ready
+
+
+def fetch_flags(package_dir='.'):
+    """CLI flags for `aptos move ...`: skip git fetches once every dependency slot is present
+
+    Also points MOVE_HOME at the private home for the commands this process runs from now on.
+    """
+    os.environ['MOVE_HOME'] = str(move_home())
+    repos = git_dependencies(package_dir)
+    if repos and all((move_home() / slot_name(git, rev)).is_dir() for git, rev in repos):
+        return SKIP_FETCH_FLAG
+    return ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prepare Move git dependencies from a local mirror")
+    parser.add_argument('--package-dir', default='.')
+    parser.add_argument('--offline', action='store_true', help="never touch the network")
+    parser.add_argument('--verify', action='store_true', help="re-hash materialized files against the manifest")
+    parser.add_argument('--status', action='store_true', help="show what the mirror holds and exit")
+    args = parser.parse_args()
+
+    if args.offline:
+        os.environ['MOVE_DEP_OFFLINE'] = 'true'
+    mirror = Mirror()
+    if args.status:
+        print(f"📦 Mirror: {mirror.root}")
+        for (git_url, rev), subdirs in sorted(git_dependencies(args.package_dir).items()):
+            manifest = mirror.manifest(git_url, rev)
+            state = 'seeded' if mirror.covers(manifest, subdirs) else 'missing'
+            print(f"   {git_url}@{rev}: {state}, slot {move_home() / slot_name(git_url, rev)}")
+        print(f"   Shared MOVE_HOME {user_move_home()} is left to the Move CLI")
+        return
+    sys.exit(0 if prepare(args.package_dir, verify=args.verify, mirror=mirror) else 1)
+
+
+if __name__ == "__main__":
+    main()
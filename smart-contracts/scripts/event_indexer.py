@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""
+Incremental event indexer for OneClick Copy Trading contracts
+Pages through committed transactions with a persisted cursor, keeps the copy-trading events
+in a compact SQLite store with covering indexes and resumes exactly where it stopped
+
+A fresh store starts at --start-version (the contract's deploy version) or, failing that, at the
+node's oldest_ledger_version; public fullnodes prune history, and a page that has been pruned
+since (HTTP 410) moves the cursor forward to the oldest version still served.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from aptos_client import AptosApiError, AptosClient
+
+DEFAULT_DB = Path('.indexer') / 'events.db'
+DEFAULT_BATCH_SIZE = 100      # transactions per REST page (the node caps this at 100)
+DEFAULT_COMMIT_PAGES = 20     # pages buffered per SQLite transaction
+DEFAULT_FETCH_WORKERS = 4     # pages requested ahead of the writer
+PROGRESS_INTERVAL = 2.0
+MAX_SQLITE_INT = 2 ** 63
+
+# Column kinds: address and symbol are interned into lookup tables, u64 stored as INTEGER
+# (see encode_u64 for values past SQLite's signed 64-bit range)
+ADDRESS, SYMBOL, U64, BOOL = 'address', 'symbol', 'u64', 'bool'
+
+# '<module>::<event>' -> (table, [(column, field, kind)], [covering indexes])
+EVENT_TABLES = {
+    'main::TradeExecutedEvent': ('trades', [
+        ('trader', 'trader_address', ADDRESS),
+        ('follower', 'follower_address', ADDRESS),
+        ('symbol', 'symbol', SYMBOL),
+        ('amount', 'amount', U64),
+        ('is_buy', 'is_buy', BOOL),
+        ('timestamp', 'timestamp', U64),
+    ], [
+        ('trades_by_trader', 'trader, timestamp, symbol, amount, is_buy'),
+        ('trades_by_follower', 'follower, timestamp, symbol, amount, is_buy'),
+    ]),
+    'user_vault::PositionOpenedEvent': ('positions_opened', [
+        ('owner', 'vault_owner', ADDRESS),
+        ('position_id', 'position_id', U64),
+        ('trader', 'trader_address', ADDRESS),
+        ('symbol', 'symbol', SYMBOL),
+        ('amount', 'amount', U64),
+        ('entry_price', 'entry_price', U64),
+        ('is_long', 'is_long', BOOL),
+        ('timestamp', 'timestamp', U64),
+    ], [
+        ('positions_opened_by_owner', 'owner, position_id, symbol, amount, entry_price, is_long'),
+        ('positions_opened_by_trader', 'trader, timestamp, symbol, amount'),
+    ]),
+    'user_vault::PositionClosedEvent': ('positions_closed', [
+        ('owner', 'vault_owner', ADDRESS),
+        ('position_id', 'position_id', U64),
+        ('exit_price', 'exit_price', U64),
+        ('pnl', 'pnl', U64),
+        ('timestamp', 'timestamp', U64),
+    ], [
+        ('positions_closed_by_owner', 'owner, position_id, exit_price, pnl, timestamp'),
+    ]),
+    'user_vault::VaultBalanceUpdatedEvent': ('vault_balances', [
+        ('owner', 'vault_owner', ADDRESS),
+        ('old_balance', 'old_balance', U64),
+        ('new_balance', 'new_balance', U64),
+        ('change_amount', 'change_amount', U64),
+        ('timestamp', 'timestamp', U64),
+    ], [
+        ('vault_balances_by_owner', 'owner, version, new_balance'),
+    ]),
+    'trader_registry::TraderStatsUpdatedEvent': ('trader_stats', [
+        ('trader', 'trader_address', ADDRESS),
+        ('win_rate', 'win_rate', U64),
+        ('total_trades', 'total_trades', U64),
+        ('risk_score', 'risk_score', U64),
+        ('timestamp', 'timestamp', U64),
+    ], [
+        ('trader_stats_by_trader', 'trader, version, win_rate, total_trades, risk_score'),
+    ]),
+}
+
+
+def normalize_address(address):
+    """Canonical 0x-prefixed, 64-digit lowercase form"""
+    return '0x' + address.lower().removeprefix('0x').rjust(64, '0')
+
+
+def encode_u64(value):
+    """INTEGER below 2^63, else an 8-byte big-endian BLOB
+
+    SQLite would silently turn a larger integer into a REAL. BLOBs sort after every INTEGER and
+    among themselves by value, so comparisons and ORDER BY on the column stay numeric.
+    """
+    n = int(value)
+    return n if n < MAX_SQLITE_INT else n.to_bytes(8, 'big')
+
+
+def decode_u64(value):
+    return int.from_bytes(value, 'big') if isinstance(value, bytes) else value
+
+
+def decode_symbol(value):
+    """vector<u8> arrives as 0x-hex; keep readable ASCII, otherwise the hex itself"""
+    try:
+        text = bytes.fromhex(value.removeprefix('0x')).decode('ascii')
+        return text if text.isprintable() else value
+    except (ValueError, UnicodeDecodeError):
+        return value
+
+
+class EventStore:
+    """SQLite store: one WITHOUT ROWID table per event type keyed by (version, event_index)"""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA temp_store=MEMORY")
+        self.db.execute("PRAGMA cache_size=-65536")
+        self._create_schema()
+        self._load_interned()
+
+    def _load_interned(self):
+        self._addresses = dict(self.db.execute("SELECT address, id FROM addresses"))
+        self._symbols = dict(self.db.execute("SELECT symbol, id FROM symbols"))
+        self._new_addresses = []
+        self._new_symbols = []
+
+    def _create_schema(self):
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS cursor (
+                contract TEXT PRIMARY KEY,
+                next_version INTEGER NOT NULL,
+                events INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS addresses (id INTEGER PRIMARY KEY, address TEXT NOT NULL UNIQUE);
+            CREATE TABLE IF NOT EXISTS symbols (id INTEGER PRIMARY KEY, symbol TEXT NOT NULL UNIQUE);
+        """)
+        for table, columns, indexes in EVENT_TABLES.values():
+            column_sql = ', '.join(f"{name} INTEGER NOT NULL" for name, _, _ in columns)
+            self.db.execute(f"CREATE TABLE IF NOT EXISTS {table} (version INTEGER NOT NULL, "
+                            f"event_index INTEGER NOT NULL, {column_sql}, "
+                            f"PRIMARY KEY (version, event_index)) WITHOUT ROWID")
+            for index, index_columns in indexes:
+                self.db.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({index_columns})")
+
+    def cursor(self, contract):
+        """(next ledger version to read, events stored so far) for a contract; (None, 0) before the first batch"""
+        row = self.db.execute("SELECT next_version, events FROM cursor WHERE contract = ?", (contract,)).fetchone()
+        return row if row else (None, 0)
+
+    def address_id(self, address):
+        """Id for an address; new ids are assigned in memory and written with the next batch"""
+        key = self._addresses.get(address)
+        if key is None:
+            key = self._addresses[address] = len(self._addresses) + 1
+            self._new_addresses.append((key, address))
+        return key
+
+    def symbol_id(self, symbol):
+        key = self._symbols.get(symbol)
+        if key is None:
+            key = self._symbols[symbol] = len(self._symbols) + 1
+            self._new_symbols.append((key, symbol))
+        return key
+
+    def write(self, contract, rows_by_table, next_version, event_count):
+        """Insert a batch of rows and advance the cursor atomically"""
+        self.db.execute("BEGIN")
+        try:
+            self.db.executemany("INSERT INTO addresses (id, address) VALUES (?, ?)", self._new_addresses)
+            self.db.executemany("INSERT INTO symbols (id, symbol) VALUES (?, ?)", self._new_symbols)
+            for table, rows in rows_by_table.items():
+                if rows:
+                    placeholders = ', '.join('?' * len(rows[0]))
+                    self.db.executemany(f"INSERT OR IGNORE INTO {table} VALUES ({placeholders})", rows)
+            self.db.execute("INSERT INTO cursor (contract, next_version, events) VALUES (?, ?, ?) "
+                            "ON CONFLICT (contract) DO UPDATE SET next_version = excluded.next_version, "
+                            "events = events + excluded.events",
+                            (contract, next_version, event_count))
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            # Ids handed out for the rolled back batch were never stored
+            self._load_interned()
+            raise
+        self._new_addresses = []
+        self._new_symbols = []
+
+    def counts(self):
+        return {table: self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table, _, _ in EVENT_TABLES.values()}
+
+    def trader_trades(self, trader, since=0, limit=100):
+        """Most recent trades of a trader, served entirely from trades_by_trader"""
+        trader_id = self._addresses.get(normalize_address(trader))
+        if trader_id is None:
+            return []
+        rows = self.db.execute(
+            "SELECT timestamp, s.symbol, amount, is_buy FROM trades INDEXED BY trades_by_trader "
+            "JOIN symbols s ON s.id = trades.symbol WHERE trader = ? AND timestamp >= ? "
+            "ORDER BY timestamp DESC LIMIT ?", (trader_id, encode_u64(since), limit))
+        return [(decode_u64(timestamp), symbol, decode_u64(amount), is_buy)
+                for timestamp, symbol, amount, is_buy in rows]
+
+    def trader_stats_since(self, version=-1, event_index=-1):
+        """TraderStatsUpdatedEvent rows after (version, event_index), oldest first"""
+        rows = self.db.execute(
+            "SELECT version, event_index, a.address, win_rate, total_trades, risk_score FROM trader_stats "
+            "JOIN addresses a ON a.id = trader_stats.trader WHERE (version, event_index) > (?, ?) "
+            "ORDER BY version, event_index", (version, event_index))
+        return [row[:3] + tuple(map(decode_u64, row[3:])) for row in rows]
+
+    def close(self):
+        self.db.close()
+
+
+class EventIndexer:
+    """Catches a store up with the chain, fetching pages ahead while the previous batch is written"""
+
+    def __init__(self, client, store, contract_address, batch_size=None, commit_pages=None, workers=None,
+                 start_version=None):
+        self.client = client
+        self.store = store
+        self.contract = normalize_address(contract_address)
+        self.start_version = start_version
+        self.batch_size = batch_size or int(os.environ.get('INDEXER_BATCH_SIZE', DEFAULT_BATCH_SIZE))
+        self.commit_pages = commit_pages or int(os.environ.get('INDEXER_COMMIT_PAGES', DEFAULT_COMMIT_PAGES))
+        self.workers = workers or int(os.environ.get('INDEXER_FETCH_WORKERS', DEFAULT_FETCH_WORKERS))
+        self._prefixes = self._event_prefixes()
+        self.transactions = 0
+        self.events = 0
+        self.pages = 0
+        self.pruned = 0
+        self.fetch_seconds = 0.0
+        self.write_seconds = 0.0
+        self.started = None
+
+    def _event_prefixes(self):
+        """Full event type string -> (table, row builder) for this contract"""
+        short = '0x' + self.contract[2:].lstrip('0')
+        mapping = {}
+        for suffix, (table, columns, _) in EVENT_TABLES.items():
+            builder = self._row_builder(columns)
+            mapping[f"{self.contract}::{suffix}"] = (table, builder)
+            mapping[f"{short}::{suffix}"] = (table, builder)
+        return mapping
+
+    def _row_builder(self, columns):
+        store = self.store
+
+        convert = {
+            ADDRESS: lambda value: store.address_id(normalize_address(value)),
+            SYMBOL: lambda value: store.symbol_id(decode_symbol(value)),
+            U64: encode_u64,
+            BOOL: lambda value: 1 if value else 0,
+        }
+        fields = [(field, convert[kind]) for _, field, kind in columns]
+
+        def build(version, index, data):
+            return (version, index, *[conv(data[field]) for field, conv in fields])
+        return build
+
+    def _fetch(self, start):
+        started = time.perf_counter()
+        page = self.client.get(f"/transactions?start={start}&limit={self.batch_size}")
+        return page, time.perf_counter() - started
+
+    def _extract(self, page, rows_by_table):
+        count = 0
+        for tx in page:
+            events = tx.get('events')
+            if not events:
+                continue
+            version = int(tx['version'])
+            for index, event in enumerate(events):
+                target = self._prefixes.get(event['type'])
+                if target is not None:
+                    table, build = target
+                    rows_by_table.setdefault(table, []).append(build(version, index, event['data']))
+                    count += 1
+        return count
+
+    def ledger_version(self):
+        return int(self.client.ledger_info()['ledger_version'])
+
+    def oldest_version(self):
+        return int(self.client.ledger_info()['oldest_ledger_version'])
+
+    def resume_version(self):
+        """Stored cursor, else the configured start version, else the oldest version the node serves"""
+        next_version, _ = self.store.cursor(self.contract)
+        if next_version is not None:
+            return next_version
+        if self.start_version is not None:
+            return self.start_version
+        return self.oldest_version()
+
+    def _skip_pruned(self, version):
+        """Version to continue from after `version` answered 410"""
+        oldest = self.oldest_version()
+        if oldest <= version:
+            raise AptosApiError(410, f"version {version} is pruned but the node reports {oldest} as the oldest",
+                                'version_pruned')
+        print(f"⚠️ Versions {version:,}-{oldest - 1:,} are pruned on this node; continuing from {oldest:,} "
+              f"(events in that range are not indexed)", flush=True)
+        self.pruned += oldest - version
+        return oldest
+
+    def stats(self):
+        """Throughput counters for the current run"""
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        return {
+            'transactions': self.transactions,
+            'events': self.events,
+            'pages': self.pages,
+            'elapsed_s': elapsed,
+            'transactions_per_s': self.transactions / elapsed if elapsed else 0.0,
+            'events_per_s': self.events / elapsed if elapsed else 0.0,
+            'fetch_s': self.fetch_seconds,
+            'write_s': self.write_seconds,
+        }
+
+    def _progress(self, next_version, tip):
+        s = self.stats()
+        print(f"📥 version {next_version:,}/{tip + 1:,}  events {self.events:,}  "
+              f"{s['events_per_s']:,.0f} events/s  {s['transactions_per_s']:,.0f} tx/s", flush=True)
+
+    def catch_up(self, until=None, quiet=False):
+        """Index every transaction up to `until` (default: the current ledger version)"""
+        next_version = self.resume_version()
+        tip = self.ledger_version() if until is None else until
+        self.started = self.started or time.perf_counter()
+        last_progress = time.perf_counter()
+
+        rows_by_table, pending_events, buffered_pages = {}, 0, 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            in_flight = deque()
+            requested = next_version
+            while next_version <= tip:
+                while len(in_flight) < self.workers * 2 and requested <= tip:
+                    in_flight.append((requested, pool.submit(self._fetch, requested)))
+                    requested += self.batch_size
+
+                start, future = in_flight.popleft()
+                try:
+                    page, fetch_time = future.result()
+                except AptosApiError as e:
+                    if e.status != 410:
+                        raise
+                    for _, stale in in_flight:
+                        stale.cancel()
+                    in_flight.clear()
+                    next_version = requested = self._skip_pruned(start)
+                    # Record the jump even if nothing after it is indexed in this run
+                    self._commit(rows_by_table, next_version, pending_events)
+                    rows_by_table, pending_events, buffered_pages = {}, 0, 0
+                    continue
+                self.fetch_seconds += fetch_time
+                page = [tx for tx in page if int(tx['version']) <= tip]
+                if not page:
+                    break
+
+                pending_events += self._extract(page, rows_by_table)
+                next_version = int(page[-1]['version']) + 1
+                self.transactions += len(page)
+                self.pages += 1
+                buffered_pages += 1
+
+                # A short page (pruned or lagging node) invalidates the pages requested after it
+                if next_version != start + self.batch_size and next_version <= tip:
+                    in_flight.clear()
+                    requested = next_version
+
+                if buffered_pages >= self.commit_pages or next_version > tip:
+                    self._commit(rows_by_table, next_version, pending_events)
+                    rows_by_table, pending_events, buffered_pages = {}, 0, 0
+
+                if not quiet and time.perf_counter() - last_progress >= PROGRESS_INTERVAL:
+                    self._progress(next_version, tip)
+                    last_progress = time.perf_counter()
+
+            if buffered_pages:
+                self._commit(rows_by_table, next_version, pending_events)
+            for _, future in in_flight:
+                future.cancel()
+        return next_version
+
+    def _commit(self, rows_by_table, next_version, event_count):
+        started = time.perf_counter()
+        self.store.write(self.contract, rows_by_table, next_version, event_count)
+        self.write_seconds += time.perf_counter() - started
+        self.events += event_count
+
+    def follow(self, interval=2.0):
+        """Keep indexing new transactions until interrupted"""
+        while True:
+            self.catch_up(quiet=True)
+            time.sleep(interval)
+
+
+def print_stats(indexer, store):
+    s = indexer.stats()
+    print(f"\n📊 Indexed {s['events']:,} events from {s['transactions']:,} transactions "
+          f"in {s['elapsed_s']:.1f}s")
+    if indexer.pruned:
+        print(f"   ⚠️ skipped {indexer.pruned:,} pruned versions")
+    print(f"   {s['events_per_s']:,.0f} events/s, {s['transactions_per_s']:,.0f} tx/s "
+          f"({s['pages']:,} pages; fetch wait {s['fetch_s']:.1f}s, write {s['write_s']:.1f}s)")
+    for table, count in store.counts().items():
+        print(f"   {table:<18} {count:>12,}")
+
+
+def demo(transactions, db_path):
+    """Index a synthetic history from a pruned local stand-in node, stopping halfway to show resume"""
+    from mock_node import MockNode
+
+    contract = '0x' + 'c0' * 32
+    if Path(db_path).exists():
+        for suffix in ('', '-wal', '-shm'):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+
+    oldest = transactions // 10
+    with MockNode(oldest_version=oldest) as node:
+        node.add_synthetic_history(contract, transactions)
+        client = AptosClient(node.url)
+        print(f"🧪 Stand-in node serves versions {oldest:,}-{transactions - 1:,}; older ones are pruned")
+
+        fresh = EventIndexer(client, EventStore(':memory:'), contract)
+        starts_at_oldest = fresh.resume_version() == oldest
+        fresh.store.close()
+        print(f"{'✅' if starts_at_oldest else '❌'} a fresh store without --start-version starts at "
+              f"the oldest available version")
+
+        # A deploy version that the node has pruned since
+        store = EventStore(db_path)
+        first = EventIndexer(client, store, contract, start_version=0)
+        first.catch_up(until=transactions // 2 - 1, quiet=True)
+        store.close()
+        print(f"⏸️  Stopped after version {transactions // 2 - 1:,} ({first.events:,} events), restarting")
+
+        store = EventStore(db_path)
+        indexer = EventIndexer(client, store, contract)
+        print(f"▶️  Resuming from version {indexer.resume_version():,}")
+        indexer.catch_up()
+        indexer.events += first.events
+        indexer.transactions += first.transactions
+        indexer.pruned += first.pruned
+        indexer.started -= first.stats()['elapsed_s']
+        print_stats(indexer, store)
+
+        expected = (transactions - oldest) * node.history[2]
+        stored = sum(store.counts().values())
+        store.close()
+        skipped = first.pruned == oldest
+        print(f"{'✅' if skipped else '❌'} a 410 on the pruned start version skipped to {oldest:,}")
+        print(f"{'✅' if stored == expected else '❌'} {stored:,}/{expected:,} events stored exactly once")
+        return starts_at_oldest and skipped and stored == expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index copy-trading events into a local SQLite store")
+    parser.add_argument('--db', default=os.environ.get('INDEXER_DB', str(DEFAULT_DB)))
+    parser.add_argument('--url', help="node REST URL (default: fastest configured endpoint)")
+    parser.add_argument('--contract', help="contract address (default: COPY_TRADING_CONTRACT_ADDRESS_<NETWORK>)")
+    parser.add_argument('--start-version', type=int,
+                        default=int(os.environ['INDEXER_START_VERSION']) if os.environ.get('INDEXER_START_VERSION') else None,
+                        help="first version to index on a fresh store, e.g. the deploy transaction's "
+                             "(default: the node's oldest available version)")
+    parser.add_argument('--follow', action='store_true', help="keep polling for new transactions")
+    parser.add_argument('--demo', type=int, metavar='TRANSACTIONS',
+                        help="index a synthetic history of this many transactions from a local stand-in node")
+    args = parser.parse_args()
+
+    if args.demo:
+        sys.exit(0 if demo(args.demo, args.db) else 1)
+
+    from deploy import get_network_config, load_env
+    load_env()
+    network = os.environ.get('APTOS_NETWORK', 'testnet')
+    contract = args.contract or os.environ.get(f"COPY_TRADING_CONTRACT_ADDRESS_{network.upper()}")
+    if not contract:
+        print(f"❌ No contract address. Pass --contract or set COPY_TRADING_CONTRACT_ADDRESS_{network.upper()}")
+        sys.exit(1)
+    url = args.url
+    if not url:
+        url = get_network_config()['rpc_url']
+
+    store = EventStore(args.db)
+    indexer = EventIndexer(AptosClient.for_profile(None, network, url), store, contract,
+                           start_version=args.start_version)
+    try:
+        print(f"🔎 Indexing {indexer.contract} from version {indexer.resume_version():,} into {args.db}")
+        indexer.catch_up()
+        if args.follow:
+            indexer.follow()
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted; progress up to the last committed batch is saved")
+    except (AptosApiError, OSError) as e:
+        print(f"❌ Indexing failed: {e}")
+        sys.exit(1)
+    finally:
+        print_stats(indexer, store)
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Source watcher for OneClick Copy Trading contract development
+Reports edits to sources/ and Move.toml through Linux inotify (via ctypes, no extra packages),
+falling back to stat polling elsewhere or when inotify is unavailable
+
+Editors save in bursts (write, rename, chmod, swap files), so wait_for_changes() waits until the
+tree has been quiet for a debounce interval, and content_hashes() lets the caller ignore saves
+that did not change any bytes.
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import select
+import struct
+import time
+from pathlib import Path
+
+WATCHED_FILES = ('Move.toml',)
+WATCHED_DIRS = ('sources',)
+SOURCE_SUFFIX = '.move'
+DEFAULT_DEBOUNCE = 0.3
+MAX_DEBOUNCE = 2.0
+POLL_INTERVAL = 0.25
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def watched(relative):
+    """True for the paths whose content affects the build"""
+    parts = Path(relative).parts
+    if len(parts) == 1:
+        return parts[0] in WATCHED_FILES
+    return parts[0] in WATCHED_DIRS and relative.endswith(SOURCE_SUFFIX)
+
+
+def watched_files(root='.'):
+    root = Path(root)
+    paths = [root / name for name in WATCHED_FILES]
+    for directory in WATCHED_DIRS:
+        paths.extend(sorted((root / directory).glob(f'**/*{SOURCE_SUFFIX}')))
+    return paths
+
+
+def content_hashes(root='.'):
+    """{relative path: sha256} of every watched file"""
+    root = Path(root)
+    hashes = {}
+    for path in watched_files(root):
+        try:
+            hashes[path.relative_to(root).as_posix()] = hashlib.sha256(path.read_bytes()).hexdigest()
+        except (FileNotFoundError, IsADirectoryError):
+            pass
+    return hashes
+
+
+def changed_paths(old, new):
+    return sorted(path for path in set(old) | set(new) if old.get(path) != new.get(path))
+
+
+class InotifyWatcher:
+    """Directory watches on the package root and every directory under WATCHED_DIRS"""
+
+    name = 'inotify'
+
+    def __init__(self, root='.'):
+        self.root = Path(root)
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("inotify is not available on this platform")
+        self._libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}       # watch descriptor -> directory relative to root
+        self._add('.')
+        for directory in WATCHED_DIRS:
+            if (self.root / directory).is_dir():
+                self._add_tree(directory)
+
+    def _add(self, relative):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(self.root / relative), WATCH_MASK)
+        if wd >= 0:
+            self.watches[wd] = relative
+
+    def _add_tree(self, relative):
+        self._add(relative)
+        for current, dirs, _ in os.walk(self.root / relative):
+            for name in dirs:
+                self._add((Path(current) / name).relative_to(self.root).as_posix())
+
+    def changes(self, timeout):
+        """Watched paths touched within timeout seconds (None blocks), or an empty set"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        found = set()
+        while not found:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                break
+            try:
+                found = self._read_events(os.read(self.fd, 64 * 1024))
+            except BlockingIOError:
+                pass
+        return found
+
+    def _read_events(self, data):
+        found = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += EVENT_HEADER.size + length
+            directory = self.watches.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.watches[wd]
+                continue
+            relative = os.path.normpath(os.path.join(directory, os.fsdecode(name))).replace(os.sep, '/')
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and Path(relative).parts[0] in WATCHED_DIRS:
+                # A new directory may already hold files by the time its watch exists
+                self._add_tree(relative)
+                found.update(p for p in content_hashes(self.root) if p.startswith(f"{relative}/"))
+            elif watched(relative):
+                found.add(relative)
+        return found
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Compares (mtime, size) of the watched files every POLL_INTERVAL seconds"""
+
+    name = 'polling'
+
+    def __init__(self, root='.', interval=POLL_INTERVAL):
+        self.root = Path(root)
+        self.interval = interval
+        self.snapshot = self._stat()
+
+    def _stat(self):
+        stats = {}
+        for path in watched_files(self.root):
+            try:
+                st = path.stat()
+                stats[path.relative_to(self.root).as_posix()] = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                pass
+        return stats
+
+    def changes(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._stat()
+            found = set(changed_paths(self.snapshot, current))
+            self.snapshot = current
+            if found:
+                return found
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval if deadline is None else max(0.0, min(self.interval, deadline - time.monotonic())))
+
+    def close(self):
+        pass
+
+
+def open_watcher(root='.', poll=False):
+    """inotify when possible, else polling; DEPLOY_WATCH_POLL=true forces polling"""
+    if not poll and os.environ.get('DEPLOY_WATCH_POLL', 'false').lower() != 'true':
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError, TypeError) as e:
+            print(f"⚠️ inotify unavailable ({e}); polling every {POLL_INTERVAL}s instead")
+    return PollingWatcher(root)
+
+
+def wait_for_changes(watcher, debounce=DEFAULT_DEBOUNCE, max_wait=MAX_DEBOUNCE):
+    """Block until something changes, then until it has been quiet for debounce seconds
+
+    Returns (touched paths, monotonic time of the first event); a continuous stream of
+    writes is cut off max_wait seconds after it started.
+    """
+    touched = set()
+    while not touched:
+        touched = watcher.changes(None)
+    first_seen = time.monotonic()
+    while True:
+        remaining = first_seen + max_wait - time.monotonic()
+        if remaining <= 0:
+            break
+        more = watcher.changes(min(debounce, remaining))
+        if not more:
+            break
+        touched |= more
+    return touched, first_seen
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print content changes to the Move sources as they happen")
+    parser.add_argument('--poll', action='store_true', help="use stat polling instead of inotify")
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE)
+    args = parser.parse_args()
+
+    watcher = open_watcher(poll=args.poll)
+    hashes = content_hashes()
+    print(f"👀 Watching {', '.join(WATCHED_FILES + WATCHED_DIRS)} ({watcher.name}, {len(hashes)} files)")
+    try:
+        while True:
+            touched, first_seen = wait_for_changes(watcher, args.debounce)
+            current = content_hashes()
+            edited = changed_paths(hashes, current)
+            hashes = current
+            quiet = time.monotonic() - first_seen
+            print(f"{'✏️ ' if edited else '💤'} {', '.join(edited) or 'no content change in ' + ', '.join(sorted(touched))}"
+                  f" ({quiet:.2f}s debounce)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained trader leaderboard for OneClick Copy Trading
+Keeps every trader's ranking metrics in one sorted structure per metric, updated from
+trader_registry::TraderStatsUpdatedEvent and follower/AUM changes, so top-k and rank-of-trader
+queries never fetch get_trader_stats for every verified trader or sort on request
+
+No event carries follower or AUM changes: main::follow_trader and unfollow_trader only update
+main::TraderProfile. Those two metrics come from reconcile_profiles(), which reads the
+main::get_trader_profile view for every indexed trader, or from a caller that sees the follows
+itself and applies them with apply_follower_change().
+
+    win_rate          highest first (basis points, as in TraderProfile)
+    total_aum         highest first
+    total_followers   highest first
+    risk_score        lowest first (1 = very safe)
+
+Each ranking is a list of sorted buckets with a Fenwick tree over bucket sizes: rank() and the start
+of top() are O(log n), an update moves one key. Ties go to the trader seen first. Snapshots store the
+metric columns and every ranking's order, so a restart rebuilds without sorting and then replays only
+the events after the snapshot's cursor.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from bisect import bisect_left, insort
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ NumPy not found. Please install it first: pip install numpy")
+    sys.exit(1)
+
+from aptos_client import AptosApiError, AptosClient
+from event_indexer import DEFAULT_DB, DEFAULT_FETCH_WORKERS, EventStore, normalize_address
+
+U64_MAX = (1 << 64) - 1
+LOAD = 512
+DEFAULT_SNAPSHOT = Path('.indexer') / 'leaderboard.npz'
+
+# metric -> True when a higher value ranks first
+METRICS = {
+    'win_rate': True,
+    'total_aum': True,
+    'total_followers': True,
+    'risk_score': False,
+}
+# Every tracked column and its value for a newly registered trader (trader_registry::register_trader)
+DEFAULTS = {
+    'win_rate': 0,
+    'total_trades': 0,
+    'risk_score': 5,
+    'total_followers': 0,
+    'total_aum': 0,
+}
+
+
+class _RankedKeys:
+    """Sorted distinct ints in buckets of about LOAD keys, with a Fenwick tree over bucket sizes"""
+
+    def __init__(self, keys=()):
+        keys = list(keys)
+        self.buckets = [keys[i:i + LOAD] for i in range(0, len(keys), LOAD)]
+        self._reindex()
+
+    def _reindex(self):
+        self.maxes = [bucket[-1] for bucket in self.buckets]
+        n = len(self.buckets)
+        tree = [0] * (n + 1)
+        for i, bucket in enumerate(self.buckets, 1):
+            tree[i] += len(bucket)
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self.tree = tree
+        self.size = sum(map(len, self.buckets))
+
+    def __len__(self):
+        return self.size
+
+    def _bump(self, i, delta):
+        self.size += delta
+        i += 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def _before(self, i):
+        """Keys in buckets[:i]"""
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def _find(self, position):
+        """(bucket, offset) holding the key at a 0-based position"""
+        i, step = 0, 1 << (len(self.buckets).bit_length() - 1) if self.buckets else 0
+        while step:
+            j = i + step
+            if j < len(self.tree) and self.tree[j] <= position:
+                position -= self.tree[j]
+                i = j
+            step >>= 1
+        return i, position
+
+    def add(self, key):
+        if not self.buckets:
+            self.buckets = [[key]]
+            self._reindex()
+            return
+        i = min(bisect_left(self.maxes, key), len(self.maxes) - 1)
+        bucket = self.buckets[i]
+        insort(bucket, key)
+        self.maxes[i] = bucket[-1]
+        if len(bucket) > 2 * LOAD:
+            self.buckets[i:i + 1] = [bucket[:LOAD], bucket[LOAD:]]
+            self._reindex()
+        else:
+            self._bump(i, 1)
+
+    def remove(self, key):
+        i = bisect_left(self.maxes, key)
+        bucket = self.buckets[i]
+        del bucket[bisect_left(bucket, key)]
+        if bucket:
+            self.maxes[i] = bucket[-1]
+            self._bump(i, -1)
+        else:
+            del self.buckets[i]
+            self._reindex()
+
+    def rank(self, key):
+        """Number of keys smaller than key"""
+        i = bisect_left(self.maxes, key)
+        if i == len(self.maxes):
+            return self.size
+        return self._before(i) + bisect_left(self.buckets[i], key)
+
+    def slice(self, start, count):
+        keys = []
+        if start >= self.size:
+            return keys
+        i, j = self._find(start)
+        while len(keys) < count and i < len(self.buckets):
+            keys.extend(self.buckets[i][j:j + count - len(keys)])
+            i, j = i + 1, 0
+        return keys
+
+
+class Leaderboard:
+    """Per-metric rankings of every trader the index has been fed"""
+
+    def __init__(self):
+        self.addresses = []
+        self.ids = {}
+        self.columns = {name: [] for name in DEFAULTS}
+        self.rankings = {metric: _RankedKeys() for metric in METRICS}
+        self.cursor = (-1, -1)      # (version, event_index) of the last applied stats event
+
+    def __len__(self):
+        return len(self.addresses)
+
+    @staticmethod
+    def _key(metric, trader_id, value):
+        return ((U64_MAX - value if METRICS[metric] else value) << 32) | trader_id
+
+    def _trader_id(self, address, create=True):
+        address = normalize_address(address)
+        trader_id = self.ids.get(address)
+        if trader_id is None and create:
+            trader_id = self.ids[address] = len(self.addresses)
+            self.addresses.append(address)
+            for name, value in DEFAULTS.items():
+                self.columns[name].append(value)
+            for metric, ranking in self.rankings.items():
+                ranking.add(self._key(metric, trader_id, DEFAULTS[metric]))
+        return trader_id
+
+    def _set(self, trader_id, name, value):
+        column = self.columns[name]
+        old = column[trader_id]
+        if old == value:
+            return
+        column[trader_id] = value
+        if name in self.rankings:
+            ranking = self.rankings[name]
+            ranking.remove(self._key(name, trader_id, old))
+            ranking.add(self._key(name, trader_id, value))
+
+    # Updates
+
+    def apply_stats(self, trader, win_rate, total_trades, risk_score):
+        """Fields of a TraderStatsUpdatedEvent"""
+        trader_id = self._trader_id(trader)
+        self._set(trader_id, 'win_rate', win_rate)
+        self._set(trader_id, 'total_trades', total_trades)
+        self._set(trader_id, 'risk_score', risk_score)
+
+    def apply_stats_event(self, version, event_index, trader, win_rate, total_trades, risk_score):
+        """Apply an indexed event once; replays at or before the cursor are ignored"""
+        if (version, event_index) <= self.cursor:
+            return False
+        self.apply_stats(trader, win_rate, total_trades, risk_score)
+        self.cursor = (version, event_index)
+        return True
+
+    def apply_follower_change(self, trader, follower_change, aum_change):
+        """Signed deltas, clamped at zero like trader_registry::update_trader_followers"""
+        trader_id = self._trader_id(trader)
+        self._set(trader_id, 'total_followers', max(0, self.columns['total_followers'][trader_id] + follower_change))
+        self._set(trader_id, 'total_aum', min(U64_MAX, max(0, self.columns['total_aum'][trader_id] + aum_change)))
+
+    def set_profile(self, trader, total_followers, total_aum):
+        """Absolute follower count and AUM, e.g. from a get_trader_profile reconciliation"""
+        trader_id = self._trader_id(trader)
+        self._set(trader_id, 'total_followers', total_followers)
+        self._set(trader_id, 'total_aum', total_aum)
+
+    def sync(self, store):
+        """Apply the stats events an EventStore has indexed since the cursor; returns how many"""
+        applied = 0
+        for version, event_index, trader, win_rate, total_trades, risk_score in store.trader_stats_since(*self.cursor):
+            applied += self.apply_stats_event(version, event_index, trader, win_rate, total_trades, risk_score)
+        return applied
+
+    def reconcile_profiles(self, client, contract, workers=DEFAULT_FETCH_WORKERS):
+        """Set followers and AUM of every indexed trader from main::get_trader_profile
+
+        Traders without a main::TraderProfile keep their values. Returns how many changed.
+        """
+        function = f"{normalize_address(contract)}::main::get_trader_profile"
+
+        def fetch(address):
+            try:
+                # (is_verified, total_followers, total_aum, performance_fee, ...)
+                values = client.view(function, [address])
+                return address, int(values[1]), int(values[2])
+            except AptosApiError as e:
+                if e.status in (400, 404):
+                    return address, None, None
+                raise
+
+        changed = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for address, followers, aum in pool.map(fetch, list(self.addresses)):
+                if followers is None:
+                    continue
+                trader_id = self.ids[address]
+                if (self.columns['total_followers'][trader_id], self.columns['total_aum'][trader_id]) != (followers, aum):
+                    self.set_profile(address, followers, aum)
+                    changed += 1
+        return changed
+
+    def load_traders(self, addresses, **columns):
+        """Bulk-add traders with initial column values, then rebuild every ranking with one sort each"""
+        for address in addresses:
+            address = normalize_address(address)
+            if address in self.ids:
+                raise ValueError(f"Trader {address} is already indexed")
+            self.ids[address] = len(self.addresses)
+            self.addresses.append(address)
+        for name, default in DEFAULTS.items():
+            values = columns.get(name)
+            self.columns[name].extend([default] * len(addresses) if values is None else [int(v) for v in values])
+        self._rebuild()
+
+    def _rebuild(self, orders=None):
+        for metric in METRICS:
+            values = self.columns[metric]
+            if orders is not None:
+                keys = [self._key(metric, i, values[i]) for i in orders[metric]]
+                if len(keys) == len(values) and all(a < b for a, b in zip(keys, keys[1:])):
+                    self.rankings[metric] = _RankedKeys(keys)
+                    continue
+            self.rankings[metric] = _RankedKeys(sorted(self._key(metric, i, v) for i, v in enumerate(values)))
+
+    # Queries
+
+    def top(self, metric, k=10, offset=0):
+        """[(address, value)] for ranks offset + 1 .. offset + k"""
+        values = self.columns[metric]
+        rows = []
+        for key in self.rankings[metric].slice(offset, k):
+            trader_id = key & 0xFFFFFFFF
+            rows.append((self.addresses[trader_id], values[trader_id]))
+        return rows
+
+    def rank(self, metric, trader):
+        """1-based rank of a trader, or None if it has never been seen"""
+        trader_id = self._trader_id(trader, create=False)
+        if trader_id is None:
+            return None
+        return self.rankings[metric].rank(self._key(metric, trader_id, self.columns[metric][trader_id])) + 1
+
+    def stats(self, trader):
+        trader_id = self._trader_id(trader, create=False)
+        if trader_id is None:
+            return None
+        return {name: column[trader_id] for name, column in self.columns.items()}
+
+    # Snapshots
+
+    def save(self, path=DEFAULT_SNAPSHOT):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {'addresses': np.array(self.addresses, dtype='S'), 'cursor': np.array(self.cursor, dtype=np.int64)}
+        for name, column in self.columns.items():
+            arrays[name] = np.array(column, dtype=np.uint64)
+        for metric, ranking in self.rankings.items():
+            arrays[f"order_{metric}"] = np.array([key & 0xFFFFFFFF for key in ranking.slice(0, len(ranking))],
+                                                 dtype=np.uint32)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=DEFAULT_SNAPSHOT):
+        """Leaderboard from a snapshot, or an empty one if there is none"""
+        board = cls()
+        try:
+            snapshot = np.load(path)
+        except FileNotFoundError:
+            return board
+        with snapshot:
+            board.addresses = [a.decode() for a in snapshot['addresses'].tolist()]
+            board.ids = {address: i for i, address in enumerate(board.addresses)}
+            board.columns = {name: snapshot[name].tolist() for name in DEFAULTS}
+            board.cursor = tuple(snapshot['cursor'].tolist())
+            board._rebuild({metric: snapshot[f"order_{metric}"].tolist() for metric in METRICS})
+        return board
+
+
+# Benchmark
+
+def _address(i):
+    return normalize_address(f'{i + 1:x}')
+
+
+def naive_top(board, metric, k):
+    """What serving a request costs today: sort every trader's stats"""
+    values = board.columns[metric]
+    order = sorted(range(len(values)), key=lambda i: (-values[i] if METRICS[metric] else values[i], i))
+    return [(board.addresses[i], values[i]) for i in order[:k]]
+
+
+def benchmark(traders, updates, queries, seed, snapshot_path):
+    """Steady update stream and queries at the given size, checked against a full sort at the end"""
+    rng = random.Random(seed)
+    board = Leaderboard()
+    started = time.perf_counter()
+    board.load_traders([_address(i) for i in range(traders)],
+                       win_rate=[rng.randint(0, 10000) for _ in range(traders)],
+                       total_trades=[rng.randint(0, 5000) for _ in range(traders)],
+                       risk_score=[rng.randint(1, 10) for _ in range(traders)],
+                       total_followers=[rng.randint(0, 2000) for _ in range(traders)],
+                       total_aum=[rng.randint(0, 10**12) for _ in range(traders)])
+    print(f"📦 Loaded {traders:,} traders in {time.perf_counter() - started:.2f}s")
+
+    latencies = []
+    version = 0
+    for _ in range(updates):
+        trader = _address(rng.randrange(traders))
+        started = time.perf_counter()
+        if rng.random() < 0.5:
+            version += 1
+            board.apply_stats_event(version, 0, trader, rng.randint(0, 10000), rng.randint(0, 5000), rng.randint(1, 10))
+        else:
+            board.apply_follower_change(trader, rng.choice((1, -1)), rng.randint(-10**9, 10**9))
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    print(f"⚡ {updates:,} updates: {updates / sum(latencies):,.0f}/s, p50 {latencies[len(latencies) // 2] * 1e6:.1f} µs, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.1f} µs")
+
+    for metric in METRICS:
+        started = time.perf_counter()
+        for _ in range(queries):
+            board.top(metric, 10, rng.randrange(100))
+        top_us = (time.perf_counter() - started) / queries * 1e6
+        started = time.perf_counter()
+        for _ in range(queries):
+            board.rank(metric, _address(rng.randrange(traders)))
+        rank_us = (time.perf_counter() - started) / queries * 1e6
+        started = time.perf_counter()
+        naive_top(board, metric, 10)
+        naive_ms = (time.perf_counter() - started) * 1000
+        print(f"   {metric:<16} top-10 {top_us:6.1f} µs   rank {rank_us:6.1f} µs   (sort per request: {naive_ms:.0f} ms)")
+
+    started = time.perf_counter()
+    board.save(snapshot_path)
+    saved = time.perf_counter() - started
+    started = time.perf_counter()
+    restored = Leaderboard.load(snapshot_path)
+    loaded = time.perf_counter() - started
+    print(f"💾 Snapshot {Path(snapshot_path).stat().st_size / 1e6:.1f} MB: saved in {saved:.2f}s, "
+          f"restored in {loaded:.2f}s")
+
+    mismatches = 0
+    for metric in METRICS:
+        expected = naive_top(board, metric, traders)
+        if board.top(metric, traders) != expected or restored.top(metric, traders) != expected:
+            mismatches += 1
+            print(f"❌ {metric} ranking differs from a full sort")
+        for position in rng.sample(range(traders), min(traders, 1000)):
+            if board.rank(metric, expected[position][0]) != position + 1:
+                mismatches += 1
+                print(f"❌ {metric} rank of {expected[position][0]} is not {position + 1}")
+                break
+    if restored.cursor != board.cursor:
+        mismatches += 1
+    print(f"🔍 Rankings checked against a full sort: {mismatches} mismatches")
+    return mismatches == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trader leaderboard index over registry events")
+    parser.add_argument('--db', default=str(DEFAULT_DB), help="event indexer database to sync from")
+    parser.add_argument('--snapshot', default=str(DEFAULT_SNAPSHOT))
+    parser.add_argument('--metric', choices=sorted(METRICS), default='win_rate')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--rank', metavar='ADDRESS', help="print a trader's rank in every metric")
+    parser.add_argument('--url', help="node REST URL (default: fastest configured endpoint)")
+    parser.add_argument('--contract', help="contract address (default: COPY_TRADING_CONTRACT_ADDRESS_<NETWORK>)")
+    parser.add_argument('--no-reconcile', action='store_true',
+                        help="skip reading followers and AUM from main::get_trader_profile")
+    parser.add_argument('--benchmark', action='store_true')
+    parser.add_argument('--traders', type=int, default=100_000)
+    parser.add_argument('--updates', type=int, default=200_000)
+    parser.add_argument('--queries', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        sys.exit(0 if benchmark(args.traders, args.updates, args.queries, args.seed, args.snapshot) else 1)
+
+    board = Leaderboard.load(args.snapshot)
+    store = EventStore(args.db)
+    try:
+        applied = board.sync(store)
+    finally:
+        store.close()
+
+    reconciled = 0
+    if not args.no_reconcile and len(board):
+        from deploy import get_network_config, load_env
+        load_env()
+        network = os.environ.get('APTOS_NETWORK', 'testnet')
+        contract = args.contract or os.environ.get(f"COPY_TRADING_CONTRACT_ADDRESS_{network.upper()}")
+        if not contract:
+            print(f"❌ No contract address for follower and AUM rankings. Pass --contract, set "
+                  f"COPY_TRADING_CONTRACT_ADDRESS_{network.upper()} or use --no-reconcile")
+            sys.exit(1)
+        client = AptosClient.for_profile(None, network, args.url or get_network_config()['rpc_url'])
+        try:
+            reconciled = board.reconcile_profiles(client, contract)
+        except (AptosApiError, OSError) as e:
+            print(f"❌ Reading trader profiles failed: {e}")
+            sys.exit(1)
+
+    if applied or reconciled:
+        board.save(args.snapshot)
+    print(f"📊 {len(board):,} traders, {applied:,} new stats events (cursor {board.cursor[0]}), "
+          f"{reconciled:,} follower/AUM updates")
+    if args.rank:
+        stats = board.stats(args.rank)
+        if stats is None:
+            print(f"❌ {args.rank} has no indexed stats")
+            sys.exit(1)
+        for metric in METRICS:
+            print(f"   {metric:<16} #{board.rank(metric, args.rank):<8,} {stats[metric]:,}")
+        return
+    for position, (address, value) in enumerate(board.top(args.metric, args.top), 1):
+        print(f"   {position:>4}. {address} {value:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for an Aptos fullnode REST API
+Serves just enough of /v1 for the deploy tooling, with injectable latency and failures
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class MockNode:
+    """In-process HTTP server that imitates an Aptos node; use as a context manager"""
+
+    def __init__(self, host='127.0.0.1', port=0, delay=0.0, fail_rate=0.0, chain_id=2, seed=None,
+                 commit_latency=0.0, reject_rate=0.0, drop_rate=0.0, abort_rate=0.0, oldest_version=0):
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.chain_id = chain_id
+        # Versions below this are pruned, as on public fullnodes: reads answer 410 version_pruned
+        self.oldest_version = oldest_version
+        # Transaction simulation: time from acceptance to commit, permanent rejections at submit,
+        # accepted transactions silently lost from mempool, and committed-but-aborted executions
+        self.commit_latency = commit_latency
+        self.reject_rate = reject_rate
+        self.drop_rate = drop_rate
+        self.abort_rate = abort_rate
+        self.mempool = {}
+        self.pending = {}
+        self.requests = 0
+        self.started_at = time.time()
+        self.accounts = {}
+        self.transactions = {}
+        self.history = None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def faucet_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def should_fail(self):
+        with self._lock:
+            self.requests += 1
+            return self._rng.random() < self.fail_rate
+
+    def ledger_info(self):
+        now_us = int(time.time() * 1_000_000)
+        return {
+            'chain_id': self.chain_id,
+            'epoch': '1',
+            'ledger_version': str(self.history[1] - 1 if self.history else self.requests),
+            'oldest_ledger_version': str(self.oldest_version),
+            'ledger_timestamp': str(now_us),
+            'node_role': 'full_node',
+            'oldest_block_height': '0',
+            'block_height': str(self.requests),
+        }
+
+    def credit(self, address, amount):
+        """Create the account if needed and add to its APT balance; returns a committed tx hash"""
+        with self._lock:
+            account = self.accounts.setdefault(address, {'sequence_number': 0, 'balance': 0})
+            account['balance'] += amount
+            tx_hash = '0x' + hashlib.sha256(f"{address}:{len(self.transactions)}".encode()).hexdigest()
+            self.transactions[tx_hash] = {
+                'type': 'user_transaction', 'hash': tx_hash, 'success': True,
+                'vm_status': 'Executed successfully', 'version': str(len(self.transactions)),
+            }
+            return tx_hash
+
+    def add_synthetic_history(self, contract_address, transactions, events_per_txn=4, accounts=1000):
+        """Serve `transactions` deterministic ledger versions, each emitting copy-trading events"""
+        self.history = (contract_address, transactions, events_per_txn, accounts)
+
+    def synthetic_transaction(self, version):
+        contract, _, per_txn, accounts = self.history
+        symbols = ('0x425443', '0x455448', '0x415054')  # BTC, ETH, APT
+        timestamp = 1_700_000_000 + version
+        events = []
+        for i in range(per_txn):
+            n = version * per_txn + i
+            trader = f"0x{(n * 7919) % accounts:064x}"
+            owner = f"0x{(n * 104729) % accounts + accounts:064x}"
+            kind = n % 5
+            if kind == 0:
+                name, data = 'main::TradeExecutedEvent', {
+                    'trader_address': trader, 'follower_address': owner, 'symbol': symbols[n % 3],
+                    'amount': str(n % 100_000 + 1), 'is_buy': n % 2 == 0, 'timestamp': str(timestamp)}
+            elif kind == 1:
+                name, data = 'user_vault::PositionOpenedEvent', {
+                    'vault_owner': owner, 'position_id': str(n), 'trader_address': trader,
+                    'symbol': symbols[n % 3], 'amount': str(n % 50_000 + 1),
+                    'entry_price': str(1_000 + n % 997), 'is_long': n % 3 != 0, 'timestamp': str(timestamp)}
+            elif kind == 2:
+                name, data = 'user_vault::PositionClosedEvent', {
+                    'vault_owner': owner, 'position_id': str(n - 1), 'exit_price': str(1_000 + n % 991),
+                    'pnl': str(n % 7_000), 'timestamp': str(timestamp)}
+            elif kind == 3:
+                name, data = 'user_vault::VaultBalanceUpdatedEvent', {
+                    'vault_owner': owner, 'old_balance': str(n % 1_000_000),
+                    'new_balance': str(n % 1_000_000 + n % 5_000), 'change_amount': str(n % 5_000),
+                    'timestamp': str(timestamp)}
+            else:
+                name, data = 'trader_registry::TraderStatsUpdatedEvent', {
+                    'trader_address': trader, 'win_rate': str(n % 10_001), 'total_trades': str(n % 4_000),
+                    'risk_score': str(n % 101), 'timestamp': str(timestamp)}
+            events.append({
+                'guid': {'creation_number': '0', 'account_address': '0x0'},
+                'sequence_number': '0',
+                'type': f"{contract}::{name}",
+                'data': data,
+            })
+        return {
+            'version': str(version), 'type': 'user_transaction', 'success': True,
+            'hash': f"0x{version:064x}", 'timestamp': str(timestamp * 1_000_000), 'events': events,
+        }
+
+    def _advance(self, sender):
+        """Commit the sender's mempool transactions that are due, strictly in sequence order"""
+        pool = self.mempool.get(sender)
+        account = self.accounts.get(sender)
+        if not pool or account is None:
+            return
+        now = time.time()
+        while True:
+            entry = pool.get(account['sequence_number'])
+            if entry is None:
+                return
+            if entry['accepted_at'] + self.commit_latency > now:
+                if now < entry['expiration']:
+                    return
+                del pool[account['sequence_number']]  # expired before it could execute
+                continue
+            del pool[account['sequence_number']]
+            tx = entry['tx']
+            aborted = self._rng.random() < self.abort_rate
+            self.transactions[entry['hash']] = {
+                'type': 'user_transaction', 'hash': entry['hash'], 'version': str(len(self.transactions)),
+                'sender': sender, 'sequence_number': tx['sequence_number'], 'payload': tx['payload'],
+                'success': not aborted,
+                'vm_status': 'Move abort: EINSUFFICIENT_BALANCE(0x10001)' if aborted else 'Executed successfully',
+                'gas_used': str(self.gas_used(tx['payload'])),
+                'gas_unit_price': tx.get('gas_unit_price', '100'),
+                'timestamp': str(int(now * 1_000_000)),
+            }
+            account['sequence_number'] += 1
+
+    @staticmethod
+    def gas_used(payload):
+        """Synthetic gas: a per-function base cost hashed from the name plus a per-byte charge
+        for the arguments; no Move code runs, so it does not reflect the contracts"""
+        function = payload.get('function', '')
+        base = 500 + int(hashlib.sha256(function.encode()).hexdigest(), 16) % 1500
+        return base + len(json.dumps(payload.get('arguments', [])))
+
+    def submit_transaction(self, body):
+        """POST /v1/transactions: mempool admission with Aptos-style validation errors"""
+        tx = json.loads(body or b'{}')
+        sender = tx.get('sender')
+        with self._lock:
+            self._advance(sender)
+            account = self.accounts.get(sender)
+            if account is None:
+                return 400, {'message': 'Invalid transaction: Type: Validation Code: SENDING_ACCOUNT_DOES_NOT_EXIST',
+                             'error_code': 'vm_error', 'vm_error_code': 2}
+            seq = int(tx['sequence_number'])
+            now = time.time()
+            if seq < account['sequence_number']:
+                return 400, {'message': 'Invalid transaction: Type: Validation Code: SEQUENCE_NUMBER_TOO_OLD',
+                             'error_code': 'vm_error', 'vm_error_code': 3}
+            if int(tx['expiration_timestamp_secs']) <= now:
+                return 400, {'message': 'Invalid transaction: Type: Validation Code: TRANSACTION_EXPIRED',
+                             'error_code': 'vm_error', 'vm_error_code': 6}
+            if 'signature' not in tx:
+                return 400, {'message': 'Missing signature', 'error_code': 'invalid_input'}
+            if self._rng.random() < self.reject_rate:
+                return 400, {'message': 'Invalid transaction: Type: Validation Code: '
+                                        'INSUFFICIENT_BALANCE_FOR_TRANSACTION_FEE',
+                             'error_code': 'vm_error', 'vm_error_code': 5}
+            pool = self.mempool.setdefault(sender, {})
+            existing = pool.get(seq)
+            if existing and now < existing['expiration']:
+                return 400, {'message': 'Transaction already in mempool with a different payload',
+                             'error_code': 'invalid_transaction_update'}
+
+            tx_hash = '0x' + hashlib.sha256(body + str(now).encode()).hexdigest()
+            entry = {'tx': tx, 'hash': tx_hash, 'accepted_at': now,
+                     'expiration': int(tx['expiration_timestamp_secs'])}
+            if self._rng.random() >= self.drop_rate:
+                pool[seq] = entry
+                self.pending[tx_hash] = (sender, seq)
+        return 202, {'type': 'pending_transaction', 'hash': tx_hash, 'sender': sender,
+                     'sequence_number': tx['sequence_number'], 'payload': tx['payload']}
+
+    def lookup_transaction(self, tx_hash):
+        with self._lock:
+            sender, seq = self.pending.get(tx_hash, (None, None))
+            self._advance(sender)
+            tx = self.transactions.get(tx_hash)
+            if tx is not None:
+                self.pending.pop(tx_hash, None)
+                return 200, tx
+            entry = self.mempool.get(sender, {}).get(seq)
+            if entry is not None and entry['hash'] == tx_hash and time.time() < entry['expiration']:
+                return 200, {'type': 'pending_transaction', 'hash': tx_hash}
+        return 404, {'message': f'Transaction not found: {tx_hash}', 'error_code': 'transaction_not_found'}
+
+    def route(self, method, path, body, query=None):
+        """Return (status, payload) for a request; overridden by richer stand-ins"""
+        query = query or {}
+        parts = [p for p in path.split('/') if p]
+        if method == 'GET' and parts in (['v1'], []):
+            return 200, self.ledger_info()
+
+        if method == 'GET' and parts[:2] == ['v1', 'accounts'] and len(parts) == 3:
+            with self._lock:
+                self._advance(parts[2])
+            account = self.accounts.get(parts[2])
+            if account is None:
+                return 404, {'message': f'Account not found: {parts[2]}', 'error_code': 'account_not_found'}
+            return 200, {'sequence_number': str(account['sequence_number']),
+                         'authentication_key': parts[2]}
+
+        if method == 'POST' and parts == ['v1', 'view']:
+            request = json.loads(body or b'{}')
+            if request.get('function') == '0x1::coin::balance':
+                account = self.accounts.get(request['arguments'][0], {'balance': 0})
+                return 200, [str(account['balance'])]
+            return 400, {'message': f"Unsupported view function {request.get('function')}",
+                         'error_code': 'invalid_input'}
+
+        if method == 'GET' and parts == ['v1', 'transactions'] and self.history:
+            start = int(query.get('start', ['0'])[0])
+            if start < self.oldest_version:
+                return 410, {'message': f'Ledger version({start}) has been pruned', 'error_code': 'version_pruned'}
+            limit = min(int(query.get('limit', ['25'])[0]), 1000)
+            end = min(start + limit, self.history[1])
+            return 200, [self.synthetic_transaction(v) for v in range(start, end)]
+
+        if method == 'GET' and parts[:2] == ['v1', 'transactions'] and len(parts) == 4 \
+                and parts[2] in ('by_hash', 'wait_by_hash'):
+            return self.lookup_transaction(parts[3])
+
+        if method == 'POST' and parts == ['v1', 'transactions', 'encode_submission']:
+            return 200, '0x' + hashlib.sha256(body).hexdigest()
+
+        if method == 'POST' and parts == ['v1', 'transactions']:
+            return self.submit_transaction(body)
+
+        if method == 'POST' and parts == ['mint']:
+            amount = int(query.get('amount', ['100000000'])[0])
+            return 200, [self.credit(query['address'][0], amount)]
+
+        return 404, {'message': f'Not found: {path}', 'error_code': 'web_framework_error'}
+
+
+def _make_handler(node):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def _respond(self, method):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b''
+            if node.delay:
+                time.sleep(node.delay)
+            if node.should_fail():
+                status, payload = 503, {'message': 'injected failure', 'error_code': 'internal_error'}
+            else:
+                path, _, query = self.path.partition('?')
+                status, payload = node.route(method, path, body, parse_qs(query))
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._respond('GET')
+
+        def do_POST(self):
+            self._respond('POST')
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local Aptos REST stand-in")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--delay', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument('--oldest-version', type=int, default=0, help="versions below this answer 410 version_pruned")
+    args = parser.parse_args()
+
+    node = MockNode(port=args.port, delay=args.delay, fail_rate=args.fail_rate,
+                    oldest_version=args.oldest_version).start()
+    print(f"🧪 Mock Aptos node listening on {node.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        node.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Parallel, sharded Move unit test runner for OneClick Copy Trading
+Discovers #[test] functions in sources/ and tests/, spreads them over one shard per core as
+filtered `aptos move test` invocations, streams per-test timing and merges the results
+
+Each shard compiles into its own output directory, so shards never race on build/ and every test
+after a shard's first reuses its compiled package. Shards are balanced on the durations recorded
+by the previous run. With --incremental only tests that failed last time, are new, or live in a
+module whose sources (or whose package dependencies' sources) changed are rerun.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+
+from build_cache import DEFAULT_CACHE_DIR
+from cost_analyzer import MODULE_RE, matching, strip_comments
+from dep_mirror import fetch_flags
+from streaming import stream_command
+
+TEST_DIRS = ('sources', 'tests')
+SHARD_DIR = Path('build') / 'test-shards'
+REPORT_FILE = Path('build') / 'test-report.json'
+DEFAULT_DURATION = 1.0
+
+TEST_FUN_RE = re.compile(r'#\[test(?:\s*\([^\]]*\))?\]\s*(?:#\[[^\]]*\]\s*)*(?:public\s+)?fun\s+(\w+)')
+USE_RE = re.compile(r'\buse\s+(\w+)::(\w+)')
+RESULT_RE = re.compile(r'\[\s*(PASS|FAIL|TIMEOUT)\s*\]\s+(?:\w+::)?(\w+::\w+)\s*$')
+
+
+def state_file():
+    return Path(os.environ.get('DEPLOY_CACHE_DIR') or DEFAULT_CACHE_DIR) / 'test-results.json'
+
+
+def discover(package_dir='.'):
+    """({'module::test': module}, {module: fingerprint}) for every Move file in the package"""
+    modules = {}        # module -> (file digest, package modules it uses)
+    tests = {}
+    for directory in TEST_DIRS:
+        for path in sorted((Path(package_dir) / directory).glob('**/*.move')):
+            raw = path.read_bytes()
+            text = strip_comments(raw.decode(errors='replace'))
+            digest = hashlib.sha256(raw).hexdigest()
+            for module_match in MODULE_RE.finditer(text):
+                address, module = module_match.groups()
+                body = text[module_match.end():matching(text, module_match.end() - 1)]
+                uses = {name for addr, name in USE_RE.findall(body) if addr == address}
+                modules[module] = (digest, uses)
+                for test in TEST_FUN_RE.finditer(body):
+                    tests[f"{module}::{test.group(1)}"] = module
+
+    manifest = Path(package_dir) / 'Move.toml'
+    manifest_digest = hashlib.sha256(manifest.read_bytes()).hexdigest() if manifest.exists() else ''
+    fingerprints = {}
+    for module in modules:
+        seen, stack = set(), [module]
+        while stack:
+            current = stack.pop()
+            if current in seen or current not in modules:
+                continue
+            seen.add(current)
+            stack.extend(modules[current][1])
+        digest = hashlib.sha256(manifest_digest.encode())
+        for name in sorted(seen):
+            digest.update(f"{name}:{modules[name][0]}".encode())
+        fingerprints[module] = digest.hexdigest()
+    return tests, fingerprints
+
+
+def load_state():
+    try:
+        with open(state_file(), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {'tests': {}}
+
+
+def save_state(state):
+    path = state_file()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def select(tests, fingerprints, state, incremental):
+    """Tests to run now; in incremental mode, only failed, new or changed ones"""
+    if not incremental:
+        return sorted(tests)
+    previous = state.get('tests', {})
+    selected = []
+    for test, module in sorted(tests.items()):
+        last = previous.get(test)
+        if last is None or last['status'] != 'pass' or last.get('fingerprint') != fingerprints[module]:
+            selected.append(test)
+    return selected
+
+
+def shard(tests, workers, state):
+    """Longest-processing-time-first assignment on last run's durations"""
+    previous = state.get('tests', {})
+    known = [previous[t]['duration'] for t in tests if t in previous]
+    default = sum(known) / len(known) if known else DEFAULT_DURATION
+    cost = lambda t: previous.get(t, {}).get('duration', default)
+    shards = [[] for _ in range(max(1, min(workers, len(tests))))]
+    loads = [0.0] * len(shards)
+    for test in sorted(tests, key=cost, reverse=True):
+        i = loads.index(min(loads))
+        shards[i].append(test)
+        loads[i] += cost(test)
+    return shards
+
+
+class ShardRunner:
+    """Runs shards in parallel threads, one filtered CLI process per test at a time per shard"""
+
+    def __init__(self, package_dir='.', timeout=None):
+        self.package_dir = package_dir
+        self.flags = fetch_flags(package_dir)
+        self.timeout = timeout
+        self.results = {}
+        self.stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _run_test(self, index, test):
+        output_dir = SHARD_DIR / f"shard-{index}"
+        command = (f"aptos move test --package-dir {self.package_dir} --output-dir {output_dir} "
+                   f"--filter {test}{self.flags}")
+        result = stream_command(command, f"move test {test}", timeout=self.timeout,
+                                cancel_event=self.stop, echo=False)
+        reported = {}
+        for line in result.stdout_tail:
+            match = RESULT_RE.search(line)
+            if match:
+                reported[match.group(2)] = match.group(1).lower()
+        status = reported.get(test)
+        if status is None:
+            if result.cancelled or result.timed_out:
+                status = 'cancelled' if result.cancelled else 'timeout'
+            else:
+                status = 'missing' if reported or result.ok else 'error'
+        return status, result
+
+    def _run_shard(self, index, tests):
+        for test in tests:
+            if self.stop.is_set():
+                return
+            status, result = self._run_test(index, test)
+            with self._lock:
+                self.results[test] = {'status': status, 'duration': round(result.duration, 3), 'shard': index}
+                mark = {'pass': '✅', 'fail': '❌'}.get(status, '⚠️ ')
+                print(f"   {mark} [{index}] {test:<50} {result.duration:6.2f}s", flush=True)
+                if status == 'error':
+                    # No test result at all: the package does not build, so every shard would fail
+                    self.stop.set()
+                    print(f"❌ {test} did not run; stopping all shards")
+                    if result.stderr or result.stdout:
+                        print(f"Error: {result.stderr or result.stdout}")
+                elif status == 'fail':
+                    for line in result.stdout_tail:
+                        if line.strip() and not RESULT_RE.search(line):
+                            print(f"      │ {line}")
+
+    def run(self, shards):
+        threads = [threading.Thread(target=self._run_shard, args=(i, tests), daemon=True)
+                   for i, tests in enumerate(shards)]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.2)
+        except KeyboardInterrupt:
+            self.stop.set()
+            raise
+        return self.results
+
+
+def run_tests(package_dir='.', workers=None, incremental=False, timeout=None, clean=False):
+    """Discover, shard, run and merge; returns True when every selected test passed"""
+    workers = workers or int(os.environ.get('MOVE_TEST_WORKERS', 0)) or os.cpu_count() or 1
+    tests, fingerprints = discover(package_dir)
+    if not tests:
+        print(f"⚠️  No #[test] functions found under {', '.join(TEST_DIRS)}/")
+        return True
+
+    state = load_state()
+    selected = select(tests, fingerprints, state, incremental)
+    skipped = len(tests) - len(selected)
+    if not selected:
+        print(f"✅ All {len(tests)} tests passed previously and nothing they depend on changed")
+        return True
+
+    if clean:
+        shutil.rmtree(SHARD_DIR, ignore_errors=True)
+    shards = shard(selected, workers, state)
+    print(f"🧪 Running {len(selected)} of {len(tests)} Move tests in {len(shards)} shard(s)"
+          + (f", {skipped} unchanged tests skipped" if skipped else ""))
+
+    started = time.perf_counter()
+    results = ShardRunner(package_dir, timeout).run(shards)
+    elapsed = time.perf_counter() - started
+
+    for test in selected:
+        results.setdefault(test, {'status': 'not run', 'duration': 0.0, 'shard': None})
+    previous = state.get('tests', {})
+    state['tests'] = {test: previous[test] for test in tests if test in previous}
+    for test, result in results.items():
+        if result['status'] in ('pass', 'fail', 'timeout'):
+            state['tests'][test] = {**result, 'fingerprint': fingerprints[tests[test]]}
+    save_state(state)
+
+    report = {'elapsed_s': round(elapsed, 3), 'workers': len(shards), 'skipped': skipped,
+              'tests': dict(sorted(results.items()))}
+    REPORT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(REPORT_FILE, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    counts = {}
+    for result in results.values():
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    serial = sum(r['duration'] for r in results.values())
+    print(f"\n📊 {', '.join(f'{n} {status}' for status, n in sorted(counts.items()))} in {elapsed:.1f}s "
+          f"({serial:.1f}s of test time, {serial / elapsed if elapsed else 0:.1f}x parallel)")
+    slowest = sorted(results.items(), key=lambda item: item[1]['duration'], reverse=True)[:5]
+    print("   Slowest: " + ", ".join(f"{test} {r['duration']:.1f}s" for test, r in slowest))
+    failed = sorted(test for test, r in results.items() if r['status'] != 'pass')
+    for test in failed:
+        print(f"   ❌ {test}: {results[test]['status']}")
+    print(f"📝 Report written to {REPORT_FILE}")
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Move unit tests in parallel shards")
+    parser.add_argument('--workers', type=int, help="parallel shards (default: MOVE_TEST_WORKERS or CPU count)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only rerun failed, new and changed-module tests")
+    parser.add_argument('--timeout', type=float, help="seconds allowed per test invocation")
+    parser.add_argument('--clean', action='store_true', help="discard per-shard build directories first")
+    parser.add_argument('--list', action='store_true', help="list discovered tests and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        tests, fingerprints = discover()
+        selected = set(select(tests, fingerprints, load_state(), True))
+        for test in sorted(tests):
+            print(f"{'*' if test in selected else ' '} {test}")
+        return
+    sys.exit(0 if run_tests(workers=args.workers, incremental=args.incremental, timeout=args.timeout,
+                            clean=args.clean) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Compile-once, publish-many deployment for OneClick Copy Trading smart contracts
+Builds a single publish payload and submits it to every target network/profile in parallel
+worker processes, so one slow or failing endpoint does not hold up the others
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from aptos_client import load_profiles
+from dep_mirror import fetch_flags
+from streaming import PUBLISH_PATTERNS, stream_command
+
+PAYLOAD_FILE = Path('build') / 'publish-payload.json'
+DEFAULT_PUBLISH_TIMEOUT = 600
+
+
+class Target:
+    """A place to publish to: an Aptos CLI profile, optionally with an overriding REST URL"""
+
+    def __init__(self, label, profile, rest_url=None, network=None):
+        self.label = label
+        self.profile = profile
+        self.rest_url = rest_url
+        self.network = network or profile_network(profile)
+
+    @property
+    def cache_key(self):
+        """Publish-cache target: the label alone would match a label reused for another profile or URL"""
+        return repr(self)
+
+    def __repr__(self):
+        return f"{self.label}={self.profile}" + (f"@{self.rest_url}" if self.rest_url else "")
+
+
+def profile_network(profile):
+    """Network a CLI profile publishes to, falling back to APTOS_NETWORK for custom profiles"""
+    configured = load_profiles().get(profile)
+    if configured is not None and configured.network in ('mainnet', 'testnet', 'devnet', 'local'):
+        return configured.network
+    return os.environ.get('APTOS_NETWORK', 'testnet')
+
+
+def parse_target(spec):
+    """Parse '[label=]profile[@rest_url]', e.g. 'ankr-testnet=copy-trading-deploy@https://rpc.ankr.com/...'"""
+    head, _, rest_url = spec.strip().partition('@')
+    label, has_label, profile = head.partition('=')
+    if not has_label:
+        label, profile = '', label
+    if not profile:
+        raise ValueError(f"Invalid deploy target '{spec}': expected [label=]profile[@rest_url]")
+    return Target(label or profile, profile, rest_url or None)
+
+
+def parse_targets(specs):
+    """Targets from --target flags, falling back to the comma-separated DEPLOY_TARGETS variable"""
+    if not specs:
+        specs = [s for s in os.environ.get('DEPLOY_TARGETS', '').split(',') if s.strip()]
+    targets = [parse_target(s) for s in specs]
+    labels = [t.label for t in targets]
+    duplicates = {label for label in labels if labels.count(label) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate deploy target labels: {', '.join(sorted(duplicates))}")
+    return targets
+
+
+def build_payload_command():
+    """Compile the package once into a publish transaction payload"""
+    return (f"aptos move build-publish-payload --package-dir . --json-output-file {PAYLOAD_FILE} "
+            f"--assume-yes{fetch_flags()}")
+
+
+def publish_target(target, timeout):
+    """Worker process: submit the prebuilt payload to one target and report the outcome"""
+    command = f"aptos move run --json-file {PAYLOAD_FILE} --profile {target.profile} --assume-yes"
+    if target.rest_url:
+        command += f" --url {target.rest_url}"
+
+    started = time.time()
+    try:
+        result = stream_command(command, f"Publishing to {target.label}", patterns=PUBLISH_PATTERNS,
+                                timeout=timeout, label=target.label)
+    except Exception as e:
+        return {'target': target.label, 'ok': False, 'error': str(e), 'duration': time.time() - started}
+
+    if result.timed_out:
+        error = f"timed out after {timeout:.0f}s"
+    elif result.cancelled:
+        error = "cancelled"
+    elif result.returncode != 0:
+        error = (result.stderr_tail[-1] if result.stderr_tail else f"exit code {result.returncode}")
+    else:
+        error = None
+
+    return {
+        'target': target.label,
+        'ok': error is None,
+        'tx_hash': result.matches.get('tx_hash'),
+        'address': result.matches.get('contract_address'),
+        'duration': time.time() - started,
+        'error': error,
+    }
+
+
+def publish_all(targets, cache=None, source_hash=None, timeout=None, max_workers=None):
+    """Publish the payload to every target concurrently; returns {label: result}"""
+    if timeout is None:
+        timeout = float(os.environ.get('DEPLOY_PUBLISH_TIMEOUT', DEFAULT_PUBLISH_TIMEOUT))
+
+    results = {}
+    pending = []
+    for target in targets:
+        published = cache.lookup_publish(source_hash, target.cache_key) if cache and source_hash else None
+        if published:
+            results[target.label] = {
+                'target': target.label, 'ok': True, 'cached': True, 'duration': 0.0, 'error': None,
+                'tx_hash': published.get('tx_hash'), 'address': published.get('address'),
+            }
+        else:
+            pending.append(target)
+
+    if pending:
+        workers = max_workers or len(pending)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(publish_target, target, timeout): target for target in pending}
+            for future in as_completed(futures):
+                target = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'target': target.label, 'ok': False, 'error': str(e), 'duration': 0.0}
+                results[target.label] = result
+                status = "✅" if result['ok'] else "❌"
+                print(f"{status} {target.label} finished in {result['duration']:.1f}s")
+                if result['ok'] and cache and source_hash and result.get('tx_hash'):
+                    cache.store_publish(source_hash, target.cache_key, result['tx_hash'], result.get('address'),
+                                        result['duration'])
+
+    return {t.label: results[t.label] for t in targets}
+
+
+def print_results(results):
+    """Per-target summary table"""
+    print("\n🌐 Multi-target deployment results")
+    print(f"   {'target':<20} {'status':<8} {'duration':>9}  {'tx hash / error'}")
+    for label, result in results.items():
+        if result['ok']:
+            status = 'cached' if result.get('cached') else 'ok'
+            detail = f"{result.get('tx_hash')}  {result.get('address') or ''}".strip()
+        else:
+            status = 'failed'
+            detail = result.get('error') or ''
+        print(f"   {label:<20} {status:<8} {result['duration']:>8.1f}s  {detail}")
+    failed = [label for label, result in results.items() if not result['ok']]
+    print(f"   {len(results) - len(failed)}/{len(results)} targets succeeded")
+    return not failed
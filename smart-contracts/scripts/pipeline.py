@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Dependency-graph step scheduler for the OneClick Copy Trading deploy pipeline
+Independent steps run concurrently on a thread pool; each step starts once its dependencies finish
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import tracing
+
+
+class Step:
+    """A named unit of work with the names of the steps it depends on"""
+
+    def __init__(self, name, func, deps=()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+
+    @property
+    def duration(self):
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+class Pipeline:
+    """Runs a DAG of steps, overlapping every step whose dependencies are satisfied"""
+
+    def __init__(self, max_workers=None, on_failure=None, on_start=None):
+        if max_workers is None:
+            max_workers = int(os.environ.get('DEPLOY_WORKERS', '4'))
+        self.max_workers = max(1, max_workers)
+        self.on_failure = on_failure
+        self.on_start = on_start
+        self.steps = {}
+        self.started_at = None
+        self.finished_at = None
+
+    def add(self, name, func, deps=()):
+        """Register a step; func receives the dict of results of finished steps"""
+        if name in self.steps:
+            raise ValueError(f"Duplicate pipeline step: {name}")
+        for dep in deps:
+            if dep not in self.steps:
+                raise ValueError(f"Step {name} depends on unknown step {dep}")
+        self.steps[name] = Step(name, func, deps)
+        return self.steps[name]
+
+    def run(self):
+        """Execute all steps and return {name: result}; the first failure is re-raised"""
+        results = {}
+        pending = dict(self.steps)
+        running = {}
+        failure = None
+        self.started_at = time.perf_counter()
+        if self.on_start:
+            self.on_start()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                if failure is None:
+                    ready = [s for s in pending.values() if all(d in results for d in s.deps)]
+                    for step in ready:
+                        del pending[step.name]
+                        running[pool.submit(self._run_step, step, dict(results))] = step
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    try:
+                        step.result = future.result()
+                        results[step.name] = step.result
+                    except BaseException as e:
+                        # Schedule nothing new and let on_failure stop in-flight steps
+                        if failure is None:
+                            failure = e
+                            if self.on_failure:
+                                self.on_failure()
+
+        self.finished_at = time.perf_counter()
+        if failure is not None:
+            raise failure
+        return results
+
+    def _run_step(self, step, results):
+        step.started_at = time.perf_counter()
+        try:
+            with tracing.span(step.name):
+                return step.func(results)
+        finally:
+            step.finished_at = time.perf_counter()
+
+    def critical_path(self):
+        """Chain of steps that determined total wall-clock time"""
+        finished = [s for s in self.steps.values() if s.finished_at is not None]
+        if not finished:
+            return []
+        path = [max(finished, key=lambda s: s.finished_at)]
+        while True:
+            deps = [self.steps[d] for d in path[-1].deps if self.steps[d].finished_at is not None]
+            if not deps:
+                break
+            path.append(max(deps, key=lambda s: s.finished_at))
+        return list(reversed(path))
+
+    def print_summary(self):
+        """Print per-step start/end offsets and the critical path"""
+        if self.started_at is None:
+            return
+        critical = {s.name for s in self.critical_path()}
+        wall = (self.finished_at or time.perf_counter()) - self.started_at
+        serial = sum(s.duration for s in self.steps.values())
+
+        print("\n⏱️  Pipeline timing (seconds from start)")
+        print(f"   {'step':<22} {'start':>8} {'end':>8} {'duration':>9}")
+        ordered = sorted(self.steps.values(), key=lambda s: (s.started_at is None, s.started_at or 0))
+        for step in ordered:
+            if step.started_at is None:
+                print(f"   {step.name:<22} {'-':>8} {'-':>8} {'skipped':>9}")
+                continue
+            marker = ' *' if step.name in critical else ''
+            print(f"   {step.name:<22} {step.started_at - self.started_at:>8.2f} "
+                  f"{(step.finished_at or self.started_at) - self.started_at:>8.2f} "
+                  f"{step.duration:>9.2f}{marker}")
+        print(f"   Critical path (*): {' -> '.join(s.name for s in self.critical_path())}")
+        speedup = serial / wall if wall > 0 else 1.0
+        print(f"   Wall time: {wall:.2f}s  Serial time: {serial:.2f}s  Speedup: {speedup:.2f}x")
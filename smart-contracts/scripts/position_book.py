@@ -0,0 +1,717 @@
+#!/usr/bin/env python3
+"""
+Array-backed position book for OneClick Copy Trading
+Mirrors user_vault::VaultInfo and its positions off-chain in struct-of-arrays form: one NumPy column
+per field, positions from every vault in the same columns, so millions of positions cost a few dozen
+bytes each and a price tick revalues all of them in one vectorized pass
+
+Every operation follows the Move code: position ids are per-vault counters, PnL is the same u64
+integer formula (losses track as 0), closed positions keep their rows, and anything that would
+abort on-chain raises MoveAbort and leaves the book unchanged. mark_to_market() is the batch
+equivalent of one update_position_price transaction per position; positions whose update would
+abort keep their previous price and PnL and are counted instead.
+
+    per position   vault u32, trader u32, symbol u16, amount/entry/current/pnl/created_at u64,
+                   is_long, is_active, plus a u32 row in the owning vault's id -> row table
+    per vault      balance, locked_balance, daily_pnl, total_pnl, last_updated u64, active count
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ NumPy not found. Please install it first: pip install numpy")
+    sys.exit(1)
+
+U64_MAX = (1 << 64) - 1
+
+# user_vault abort codes; ARITHMETIC_ERROR is the VM status for u64 overflow and division by zero
+E_VAULT_NOT_EXISTS = 1
+E_INSUFFICIENT_BALANCE = 2
+E_INVALID_AMOUNT = 3
+E_VAULT_ALREADY_EXISTS = 4
+E_POSITION_NOT_FOUND = 5
+ARITHMETIC_ERROR = 4017
+
+POSITION_COLUMNS = {
+    'vault': np.uint32,
+    'trader': np.uint32,
+    'symbol': np.uint16,
+    'amount': np.uint64,
+    'entry_price': np.uint64,
+    'current_price': np.uint64,
+    'pnl': np.uint64,
+    'created_at': np.uint64,
+    'is_long': bool,
+    'is_active': bool,
+}
+VAULT_COLUMNS = {
+    'balance': np.uint64,
+    'locked_balance': np.uint64,
+    'daily_pnl': np.uint64,
+    'total_pnl': np.uint64,
+    'last_updated': np.uint64,
+    'active_count': np.uint32,
+}
+
+
+class MoveAbort(Exception):
+    """The operation would abort on-chain with this code"""
+
+    def __init__(self, code):
+        super().__init__(f"Move abort {code}")
+        self.code = code
+
+
+def _as_bytes(value):
+    return value.encode() if isinstance(value, str) else bytes(value)
+
+
+def _u64(value):
+    if value < 0 or value > U64_MAX:
+        raise MoveAbort(ARITHMETIC_ERROR)
+    return value
+
+
+def position_pnl(is_long, entry_price, price, amount):
+    """The PnL expression shared by close_position and update_position_price"""
+    if is_long:
+        if price <= entry_price:
+            return 0
+        move = price - entry_price
+    else:
+        if entry_price <= price:
+            return 0
+        move = entry_price - price
+    if entry_price == 0:
+        raise MoveAbort(ARITHMETIC_ERROR)
+    return _u64(move * amount) // entry_price
+
+
+def position_pnl_vector(is_long, entry_price, price, amount):
+    """(pnl, ok) for whole columns; rows where ok is False would abort and have pnl 0"""
+    up = price > entry_price
+    favourable = np.where(is_long, up, entry_price > price)
+    move = np.where(up, price - entry_price, entry_price - price)
+    ok = ~favourable | ((entry_price != 0) & (move <= np.uint64(U64_MAX) // np.maximum(amount, np.uint64(1))))
+    pnl = (move * amount) // np.maximum(entry_price, np.uint64(1))
+    pnl[~(favourable & ok)] = 0
+    return pnl, ok
+
+
+class _Columns:
+    """Growable struct-of-arrays table; capacity doubles so appends are amortized O(1)"""
+
+    def __init__(self, spec, capacity):
+        self.count = 0
+        self.data = {name: np.zeros(capacity, dtype=dtype) for name, dtype in spec.items()}
+
+    def __len__(self):
+        return self.count
+
+    def column(self, name):
+        return self.data[name][:self.count]
+
+    def append(self, n):
+        """Reserve n rows and return the first one"""
+        start = self.count
+        capacity = len(next(iter(self.data.values())))
+        if start + n > capacity:
+            capacity = max(start + n, capacity * 2)
+            for name, column in self.data.items():
+                grown = np.zeros(capacity, dtype=column.dtype)
+                grown[:start] = column[:start]
+                self.data[name] = grown
+        self.count += n
+        return start
+
+    @property
+    def nbytes(self):
+        return sum(column[:self.count].nbytes for column in self.data.values())
+
+
+class PositionView:
+    """Read-only view of one position row, shaped like user_vault::Position"""
+
+    __slots__ = ('_book', '_row', 'id')
+
+    def __init__(self, book, row, position_id):
+        self._book = book
+        self._row = row
+        self.id = position_id
+
+    def _field(self, name):
+        return self._book.positions.data[name][self._row]
+
+    @property
+    def trader_address(self):
+        return self._book.traders[self._field('trader')]
+
+    @property
+    def symbol(self):
+        return self._book.symbols[self._field('symbol')]
+
+    amount = property(lambda self: int(self._field('amount')))
+    entry_price = property(lambda self: int(self._field('entry_price')))
+    current_price = property(lambda self: int(self._field('current_price')))
+    pnl = property(lambda self: int(self._field('pnl')))
+    created_at = property(lambda self: int(self._field('created_at')))
+    is_long = property(lambda self: bool(self._field('is_long')))
+    is_active = property(lambda self: bool(self._field('is_active')))
+
+    def as_tuple(self):
+        return (self.id, self.trader_address, self.symbol, self.amount, self.entry_price, self.current_price,
+                self.is_long, self.pnl, self.created_at, self.is_active)
+
+
+class PositionBook:
+    """All vaults and their positions; owners are addresses, symbols are str or bytes"""
+
+    def __init__(self, capacity=1024):
+        self.owners = []
+        self.owner_ids = {}
+        self.traders = []
+        self.trader_ids = {}
+        self.symbols = []
+        self.symbol_ids = {}
+        self.vaults = _Columns(VAULT_COLUMNS, 64)
+        self.positions = _Columns(POSITION_COLUMNS, capacity)
+        self.vault_rows = []        # vault id -> array('I') of position rows, indexed by position id
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _vault(self, owner):
+        vault = self.owner_ids.get(owner)
+        if vault is None:
+            raise MoveAbort(E_VAULT_NOT_EXISTS)
+        return vault
+
+    def _row(self, vault, position_id):
+        rows = self.vault_rows[vault]
+        if not 0 <= position_id < len(rows):
+            raise MoveAbort(E_POSITION_NOT_FOUND)
+        row = rows[position_id]
+        if not self.positions.data['is_active'][row]:
+            raise MoveAbort(E_POSITION_NOT_FOUND)
+        return row
+
+    @staticmethod
+    def _intern(ids, values, value):
+        interned = ids.get(value)
+        if interned is None:
+            interned = ids[value] = len(values)
+            values.append(value)
+        return interned
+
+    def _vault_field(self, vault, name):
+        return int(self.vaults.data[name][vault])
+
+    # Entry points, in user_vault order
+
+    def initialize_vault(self, owner, initial_deposit=0, risk_level=1, now=0):
+        if owner in self.owner_ids:
+            raise MoveAbort(E_VAULT_ALREADY_EXISTS)
+        if not 1 <= risk_level <= 5:
+            raise MoveAbort(E_INVALID_AMOUNT)
+        vault = self.vaults.append(1)
+        for name in VAULT_COLUMNS:
+            self.vaults.data[name][vault] = 0
+        self.vaults.data['balance'][vault] = _u64(initial_deposit)
+        self.vaults.data['last_updated'][vault] = now
+        self.owner_ids[owner] = vault
+        self.owners.append(owner)
+        self.vault_rows.append(array('I'))
+
+    def deposit(self, owner, amount, now=0):
+        vault = self._vault(owner)
+        if amount <= 0:
+            raise MoveAbort(E_INVALID_AMOUNT)
+        self.vaults.data['balance'][vault] = _u64(self._vault_field(vault, 'balance') + amount)
+        self.vaults.data['last_updated'][vault] = now
+
+    def withdraw(self, owner, amount):
+        """Like the Move code, checks the total balance only and leaves last_updated alone"""
+        vault = self._vault(owner)
+        balance = self._vault_field(vault, 'balance')
+        if balance < amount:
+            raise MoveAbort(E_INSUFFICIENT_BALANCE)
+        self.vaults.data['balance'][vault] = balance - amount
+
+    def open_position(self, owner, trader_address, symbol, amount, entry_price, is_long, now=0):
+        """Returns the new position id"""
+        vault = self._vault(owner)
+        locked = self._vault_field(vault, 'locked_balance')
+        if amount > _u64(self._vault_field(vault, 'balance') - locked):
+            raise MoveAbort(E_INSUFFICIENT_BALANCE)
+        locked = _u64(locked + amount)
+
+        row = self.positions.append(1)
+        columns = self.positions.data
+        columns['vault'][row] = vault
+        columns['trader'][row] = self._intern(self.trader_ids, self.traders, trader_address)
+        columns['symbol'][row] = self._intern(self.symbol_ids, self.symbols, _as_bytes(symbol))
+        columns['amount'][row] = amount
+        columns['entry_price'][row] = entry_price
+        columns['current_price'][row] = entry_price
+        columns['pnl'][row] = 0
+        columns['created_at'][row] = now
+        columns['is_long'][row] = is_long
+        columns['is_active'][row] = True
+
+        position_id = len(self.vault_rows[vault])
+        self.vault_rows[vault].append(row)
+        self.vaults.data['locked_balance'][vault] = locked
+        self.vaults.data['active_count'][vault] += 1
+        self.vaults.data['last_updated'][vault] = now
+        return position_id
+
+    def close_position(self, owner, position_id, exit_price, now=0):
+        """Returns the realized pnl"""
+        vault = self._vault(owner)
+        row = self._row(vault, position_id)
+        columns = self.positions.data
+        amount = int(columns['amount'][row])
+        pnl = position_pnl(columns['is_long'][row], int(columns['entry_price'][row]), exit_price, amount)
+        updated = {
+            'locked_balance': _u64(self._vault_field(vault, 'locked_balance') - amount),
+            'total_pnl': _u64(self._vault_field(vault, 'total_pnl') + pnl),
+            'daily_pnl': _u64(self._vault_field(vault, 'daily_pnl') + pnl),
+            'balance': _u64(self._vault_field(vault, 'balance') + pnl),
+            'last_updated': now,
+        }
+        columns['current_price'][row] = exit_price
+        columns['pnl'][row] = pnl
+        columns['is_active'][row] = False
+        for name, value in updated.items():
+            self.vaults.data[name][vault] = value
+        self.vaults.data['active_count'][vault] -= 1
+        return pnl
+
+    def update_position_price(self, owner, position_id, current_price, now=0):
+        vault = self._vault(owner)
+        row = self._row(vault, position_id)
+        columns = self.positions.data
+        pnl = position_pnl(columns['is_long'][row], int(columns['entry_price'][row]), current_price,
+                           int(columns['amount'][row]))
+        columns['current_price'][row] = current_price
+        columns['pnl'][row] = pnl
+        self.vaults.data['last_updated'][vault] = now
+
+    def emergency_close_all(self, owner, now=0):
+        vault = self._vault(owner)
+        rows = np.frombuffer(self.vault_rows[vault], dtype=np.uint32)
+        active = rows[self.positions.data['is_active'][rows]]
+        released = sum(int(amount) for amount in self.positions.data['amount'][active])
+        locked = _u64(self._vault_field(vault, 'locked_balance') - released)
+        self.positions.data['is_active'][active] = False
+        self.vaults.data['locked_balance'][vault] = locked
+        self.vaults.data['active_count'][vault] = 0
+        self.vaults.data['last_updated'][vault] = now
+
+    # Views
+
+    def vault_exists(self, owner):
+        return owner in self.owner_ids
+
+    def vault_info(self, owner):
+        """(balance, locked_balance, daily_pnl, total_pnl, position count) like get_vault_info"""
+        vault = self._vault(owner)
+        return (*(self._vault_field(vault, name) for name in ('balance', 'locked_balance', 'daily_pnl', 'total_pnl')),
+                len(self.vault_rows[vault]))
+
+    def position(self, owner, position_id):
+        vault = self._vault(owner)
+        rows = self.vault_rows[vault]
+        if not 0 <= position_id < len(rows):
+            raise MoveAbort(E_POSITION_NOT_FOUND)
+        return PositionView(self, rows[position_id], position_id)
+
+    def active_positions_count(self, owner):
+        """O(1) here; the Move view walks the whole vector"""
+        return self._vault_field(self._vault(owner), 'active_count')
+
+    def available_balance(self, owner):
+        vault = self._vault(owner)
+        return _u64(self._vault_field(vault, 'balance') - self._vault_field(vault, 'locked_balance'))
+
+    # Batch operations
+
+    def open_positions(self, owners, traders, symbols, amounts, entry_prices, is_long, now=0):
+        """open_position for many trades at once, as if submitted in order; returns ids, -1 where aborted
+
+        Vaults whose trades all fit in their available balance are appended in one vectorized
+        step; a vault where any open would abort replays its trades one by one.
+        """
+        n = len(owners)
+        ids = np.full(n, -1, dtype=np.int64)
+        if n == 0:
+            return ids
+        vault = np.fromiter((self.owner_ids.get(owner, -1) for owner in owners), dtype=np.int64, count=n)
+        amounts = np.asarray(amounts, dtype=np.uint64)
+        entry_prices = np.asarray(entry_prices, dtype=np.uint64)
+        is_long = np.asarray(is_long, dtype=bool)
+
+        order = np.argsort(vault, kind='stable')
+        sorted_vault = vault[order]
+        starts = np.flatnonzero(np.r_[True, sorted_vault[1:] != sorted_vault[:-1]])
+        sizes = np.diff(np.r_[starts, n])
+        group = np.repeat(np.arange(len(starts)), sizes)
+        totals = np.cumsum(amounts[order], dtype=np.uint64)      # wraps; only differences are used
+        prefix = totals - np.r_[np.uint64(0), totals[:-1]][starts][group]
+        wrapped = np.zeros(len(starts), dtype=bool)
+        wrapped[group[1:][(prefix[1:] < prefix[:-1]) & (group[1:] == group[:-1])]] = True
+
+        group_vault = sorted_vault[starts]
+        known = group_vault >= 0
+        safe_vault = np.where(known, group_vault, 0)
+        balance = self.vaults.data['balance'][safe_vault]
+        locked = self.vaults.data['locked_balance'][safe_vault]
+        fast = known & ~wrapped & (balance >= locked) & (prefix[starts + sizes - 1] <= balance - locked)
+
+        fast_rows = fast[group]
+        picked = order[fast_rows]
+        if len(picked):
+            start = self.positions.append(len(picked))
+            columns = self.positions.data
+            end = start + len(picked)
+            columns['vault'][start:end] = vault[picked]
+            columns['trader'][start:end] = [self._intern(self.trader_ids, self.traders, traders[i]) for i in picked]
+            columns['symbol'][start:end] = [self._intern(self.symbol_ids, self.symbols, _as_bytes(symbols[i]))
+                                            for i in picked]
+            columns['amount'][start:end] = amounts[picked]
+            columns['entry_price'][start:end] = entry_prices[picked]
+            columns['current_price'][start:end] = entry_prices[picked]
+            columns['pnl'][start:end] = 0
+            columns['created_at'][start:end] = now
+            columns['is_long'][start:end] = is_long[picked]
+            columns['is_active'][start:end] = True
+
+            counts = np.fromiter((len(self.vault_rows[v]) for v in safe_vault), dtype=np.int64, count=len(starts))
+            rank = np.arange(n) - starts[group]
+            ids[picked] = (counts[group] + rank)[fast_rows]
+            rows = np.arange(start, end, dtype=np.uint32)
+            offset = 0
+            for g in np.flatnonzero(fast):
+                self.vault_rows[group_vault[g]].frombytes(rows[offset:offset + sizes[g]].tobytes())
+                offset += sizes[g]
+            fast_vaults = group_vault[fast]
+            self.vaults.data['locked_balance'][fast_vaults] = locked[fast] + prefix[starts + sizes - 1][fast]
+            self.vaults.data['active_count'][fast_vaults] += sizes[fast].astype(np.uint32)
+            self.vaults.data['last_updated'][fast_vaults] = now
+
+        for i in order[known[group] & ~fast_rows]:
+            try:
+                ids[i] = self.open_position(owners[i], traders[i], symbols[i], int(amounts[i]),
+                                            int(entry_prices[i]), bool(is_long[i]), now)
+            except MoveAbort:
+                pass
+        return ids
+
+    def mark_to_market(self, prices, now=0):
+        """Revalue every active position whose symbol is in prices; returns (revalued, aborted)"""
+        if not len(self.positions):
+            return 0, 0
+        lookup = np.zeros(len(self.symbols), dtype=np.uint64)
+        priced = np.zeros(len(self.symbols), dtype=bool)
+        for symbol, price in prices.items():
+            symbol_id = self.symbol_ids.get(_as_bytes(symbol))
+            if symbol_id is not None:
+                lookup[symbol_id] = _u64(price)
+                priced[symbol_id] = True
+
+        p = self.positions
+        symbol = p.column('symbol')
+        price = lookup[symbol]
+        pnl, ok = position_pnl_vector(p.column('is_long'), p.column('entry_price'), price, p.column('amount'))
+        selected = priced[symbol] & p.column('is_active')
+        updated = selected & ok
+        np.copyto(p.column('current_price'), price, where=updated)
+        np.copyto(p.column('pnl'), pnl, where=updated)
+        self.vaults.data['last_updated'][p.column('vault')[updated]] = now
+        revalued = int(np.count_nonzero(updated))
+        return revalued, int(np.count_nonzero(selected)) - revalued
+
+    def memory_usage(self):
+        """Bytes held by live rows: position columns, vault columns and the per-vault row tables"""
+        rows = sum(len(r) * r.itemsize + sys.getsizeof(array('I')) for r in self.vault_rows)
+        return self.positions.nbytes + self.vaults.nbytes + rows
+
+
+# Scalar reference: a line-by-line transcription of user_vault with a Python object per position
+
+class ReferenceVaults:
+
+    def __init__(self):
+        self.vaults = {}
+
+    def _vault(self, owner):
+        if owner not in self.vaults:
+            raise MoveAbort(E_VAULT_NOT_EXISTS)
+        return self.vaults[owner]
+
+    def initialize_vault(self, owner, initial_deposit=0, risk_level=1, now=0):
+        if owner in self.vaults:
+            raise MoveAbort(E_VAULT_ALREADY_EXISTS)
+        if not (risk_level >= 1 and risk_level <= 5):
+            raise MoveAbort(E_INVALID_AMOUNT)
+        self.vaults[owner] = {'balance': initial_deposit, 'locked_balance': 0, 'positions': [],
+                              'daily_pnl': 0, 'total_pnl': 0, 'last_updated': now}
+
+    def deposit(self, owner, amount, now=0):
+        vault = self._vault(owner)
+        if not amount > 0:
+            raise MoveAbort(E_INVALID_AMOUNT)
+        vault['balance'] = _u64(vault['balance'] + amount)
+        vault['last_updated'] = now
+
+    def withdraw(self, owner, amount):
+        vault = self._vault(owner)
+        if not vault['balance'] >= amount:
+            raise MoveAbort(E_INSUFFICIENT_BALANCE)
+        vault['balance'] = vault['balance'] - amount
+
+    def open_position(self, owner, trader_address, symbol, amount, entry_price, is_long, now=0):
+        vault = self._vault(owner)
+        if not amount <= _u64(vault['balance'] - vault['locked_balance']):
+            raise MoveAbort(E_INSUFFICIENT_BALANCE)
+        position_id = len(vault['positions'])
+        locked = _u64(vault['locked_balance'] + amount)
+        vault['positions'].append({'id': position_id, 'trader_address': trader_address, 'symbol': _as_bytes(symbol),
+                                   'amount': amount, 'entry_price': entry_price, 'current_price': entry_price,
+                                   'is_long': is_long, 'pnl': 0, 'created_at': now, 'is_active': True})
+        vault['locked_balance'] = locked
+        vault['last_updated'] = now
+        return position_id
+
+    def _position(self, owner, position_id):
+        vault = self._vault(owner)
+        if not position_id < len(vault['positions']):
+            raise MoveAbort(E_POSITION_NOT_FOUND)
+        position = vault['positions'][position_id]
+        if not position['is_active']:
+            raise MoveAbort(E_POSITION_NOT_FOUND)
+        return vault, position
+
+    def close_position(self, owner, position_id, exit_price, now=0):
+        vault, position = self._position(owner, position_id)
+        pnl = position_pnl(position['is_long'], position['entry_price'], exit_price, position['amount'])
+        locked = _u64(vault['locked_balance'] - position['amount'])
+        total = _u64(vault['total_pnl'] + pnl)
+        daily = _u64(vault['daily_pnl'] + pnl)
+        balance = _u64(vault['balance'] + pnl)
+        position.update(current_price=exit_price, pnl=pnl, is_active=False)
+        vault.update(locked_balance=locked, total_pnl=total, daily_pnl=daily, balance=balance, last_updated=now)
+        return pnl
+
+    def update_position_price(self, owner, position_id, current_price, now=0):
+        vault, position = self._position(owner, position_id)
+        pnl = position_pnl(position['is_long'], position['entry_price'], current_price, position['amount'])
+        position.update(current_price=current_price, pnl=pnl)
+        vault['last_updated'] = now
+
+    def emergency_close_all(self, owner, now=0):
+        vault = self._vault(owner)
+        locked = vault['locked_balance']
+        for position in vault['positions']:
+            if position['is_active']:
+                locked = _u64(locked - position['amount'])
+        for position in vault['positions']:
+            position['is_active'] = False
+        vault['locked_balance'] = locked
+        vault['last_updated'] = now
+
+    def mark_to_market(self, prices, now=0):
+        revalued = aborted = 0
+        prices = {_as_bytes(symbol): price for symbol, price in prices.items()}
+        for owner, vault in self.vaults.items():
+            for position in vault['positions']:
+                if position['is_active'] and position['symbol'] in prices:
+                    try:
+                        self.update_position_price(owner, position['id'], prices[position['symbol']], now)
+                        revalued += 1
+                    except MoveAbort:
+                        aborted += 1
+        return revalued, aborted
+
+
+# Differential check and benchmark
+
+def _state(book, reference):
+    """(book rows, reference rows) of every vault and position, for comparison"""
+    got, expected = [], []
+    for owner, vault in reference.vaults.items():
+        expected.append((owner, vault['balance'], vault['locked_balance'], vault['daily_pnl'], vault['total_pnl'],
+                         vault['last_updated'], sum(p['is_active'] for p in vault['positions'])))
+        expected.extend(tuple(p[name] for name in ('id', 'trader_address', 'symbol', 'amount', 'entry_price',
+                                                   'current_price', 'is_long', 'pnl', 'created_at', 'is_active'))
+                        for p in vault['positions'])
+        vault_id = book.owner_ids.get(owner)
+        if vault_id is None:
+            continue
+        balance, locked, daily, total, count = book.vault_info(owner)
+        got.append((owner, balance, locked, daily, total, book._vault_field(vault_id, 'last_updated'),
+                    book.active_positions_count(owner)))
+        got.extend(book.position(owner, i).as_tuple() for i in range(count))
+    return got, expected
+
+
+def differential_check(operations, seed):
+    """Apply the same random operations to the book and the scalar reference and compare everything"""
+    rng = random.Random(seed)
+    book, reference = PositionBook(capacity=16), ReferenceVaults()
+    owners = [f'0x{i:x}' for i in range(1, 60)]
+    traders = [f'0xt{i}' for i in range(8)]
+    symbols = ['APT/USDC', 'BTC/USDC', 'ETH/USDC', 'SOL/USDC']
+
+    def u64():
+        return rng.choice([0, 1, U64_MAX, U64_MAX // 3, rng.randint(0, 10**6), rng.randint(1, 10**12),
+                           rng.randint(0, U64_MAX)])
+
+    def price():
+        return rng.choice([0, rng.randint(1, 10**4), rng.randint(10**8, 2 * 10**8), u64()])
+
+    mismatches = 0
+
+    def apply(name, *args):
+        nonlocal mismatches
+        outcomes = []
+        for target in (book, reference):
+            try:
+                outcomes.append(('ok', getattr(target, name)(*args)))
+            except MoveAbort as e:
+                outcomes.append(('abort', e.code))
+        if outcomes[0] != outcomes[1]:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"❌ {name}{args}: book {outcomes[0]} != reference {outcomes[1]}")
+
+    now = 1_700_000_000
+    for _ in range(operations):
+        now += rng.randint(0, 5)
+        owner = rng.choice(owners)
+        count = len(reference.vaults.get(owner, {}).get('positions', ()))
+        position_id = rng.randint(0, count) if rng.random() < 0.9 else rng.randint(0, 3)
+        op = rng.random()
+        if op < 0.08:
+            apply('initialize_vault', owner, rng.choice([0, rng.randint(1, 10**12), u64()]),
+                  rng.choice([1, 3, 5, 0, 6]), now)
+        elif op < 0.14:
+            apply('deposit', owner, rng.choice([0, rng.randint(1, 10**12), u64()]), now)
+        elif op < 0.18:
+            apply('withdraw', owner, rng.choice([rng.randint(0, 10**12), u64()]))
+        elif op < 0.50:
+            apply('open_position', owner, rng.choice(traders), rng.choice(symbols),
+                  rng.choice([0, rng.randint(1, 10**9), rng.randint(1, 10**12), u64()]), price(),
+                  rng.random() < 0.5, now)
+        elif op < 0.62:
+            apply('close_position', owner, position_id, price(), now)
+        elif op < 0.72:
+            apply('update_position_price', owner, position_id, price(), now)
+        elif op < 0.74:
+            apply('emergency_close_all', owner, now)
+        elif op < 0.90:
+            apply('mark_to_market', {s: price() for s in rng.sample(symbols, rng.randint(1, len(symbols)))}, now)
+        else:
+            batch = [(rng.choice(owners), rng.choice(traders), rng.choice(symbols),
+                      rng.choice([rng.randint(0, 10**9), u64()]), price(), rng.random() < 0.5)
+                     for _ in range(rng.randint(1, 40))]
+            got = book.open_positions(*zip(*batch), now=now).tolist()
+            expected = []
+            for trade in batch:
+                try:
+                    expected.append(reference.open_position(*trade, now))
+                except MoveAbort:
+                    expected.append(-1)
+            if got != expected:
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"❌ open_positions: book {got} != reference {expected}")
+
+    got, expected = _state(book, reference)
+    if got != expected:
+        mismatches += 1
+        print(f"❌ Final state differs: {sum(a != b for a, b in zip(got, expected))} rows, "
+              f"{len(got)} vs {len(expected)} entries")
+    print(f"🔍 Differential check over {operations:,} operations, {len(book):,} positions in "
+          f"{len(book.owners)} vaults: {mismatches} mismatches")
+    return mismatches == 0
+
+
+def benchmark(positions, vaults, symbols, ticks, seed):
+    """Memory per position, bulk open rate and mark-to-market ticks per second"""
+    rng = np.random.default_rng(seed)
+    names = [f'SYM{i}/USDC' for i in range(symbols)]
+    base_prices = rng.integers(10**6, 10**10, size=symbols, dtype=np.uint64)
+    owners = [f'0x{i:x}' for i in range(vaults)]
+    traders = [f'0xt{i}' for i in range(max(1, vaults // 100))]
+
+    book = PositionBook(capacity=positions)
+    for owner in owners:
+        book.initialize_vault(owner, 10**18, 3)
+    owner_of = rng.integers(0, vaults, size=positions)
+    symbol_of = rng.integers(0, symbols, size=positions)
+    started = time.perf_counter()
+    ids = book.open_positions([owners[v] for v in owner_of], [traders[v % len(traders)] for v in owner_of],
+                              [names[s] for s in symbol_of], rng.integers(10**6, 10**12, size=positions, dtype=np.uint64),
+                              base_prices[symbol_of], rng.random(positions) < 0.5)
+    open_seconds = time.perf_counter() - started
+    assert (ids >= 0).all()
+
+    tracemalloc.start()
+    reference = ReferenceVaults()
+    sample = min(positions, 20000)
+    for i in range(sample):
+        owner = f'0x{i % 100:x}'
+        if owner not in reference.vaults:
+            reference.initialize_vault(owner, 10**18, 3)
+        reference.open_position(owner, traders[0], names[i % symbols], 10**9, 10**8, i % 2 == 0)
+    object_bytes = tracemalloc.get_traced_memory()[0] / sample
+    tracemalloc.stop()
+
+    durations = []
+    for _ in range(ticks):
+        moves = rng.integers(9500, 10500, size=symbols, dtype=np.uint64)
+        prices = dict(zip(names, (base_prices * moves // 10000).tolist()))
+        started = time.perf_counter()
+        book.mark_to_market(prices)
+        durations.append(time.perf_counter() - started)
+    tick = sorted(durations)[len(durations) // 2]
+
+    started = time.perf_counter()
+    reference.mark_to_market({name: 10**8 + 7 for name in names})
+    scalar_per_position = (time.perf_counter() - started) / sample
+
+    print(f"📦 {positions:,} positions in {vaults:,} vaults: {book.memory_usage() / positions:.1f} bytes/position "
+          f"(Python objects: {object_bytes:.0f} bytes/position)")
+    print(f"⚡ open_positions: {positions / open_seconds:,.0f} positions/s")
+    print(f"⚡ mark_to_market: {tick * 1000:.1f} ms/tick, {1 / tick:.1f} ticks/s "
+          f"({tick / positions * 1e9:.1f} ns/position)")
+    print(f"🐢 scalar reference: {scalar_per_position * positions * 1000:.0f} ms/tick at this size "
+          f"({scalar_per_position * positions / tick:.0f}x slower)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Array-backed user_vault position book")
+    parser.add_argument('--positions', type=int, default=1_000_000, help="positions in the benchmark book")
+    parser.add_argument('--vaults', type=int, default=100_000)
+    parser.add_argument('--symbols', type=int, default=32)
+    parser.add_argument('--ticks', type=int, default=20, help="price ticks to time")
+    parser.add_argument('--check', type=int, default=20_000, help="operations in the differential check")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    ok = differential_check(args.check, args.seed)
+    benchmark(args.positions, args.vaults, args.symbols, args.ticks, args.seed)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
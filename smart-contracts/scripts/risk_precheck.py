@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Batch risk pre-check for OneClick Copy Trading
+Mirrors risk_manager::validate_trade, calculate_position_size and calculate_trade_risk_score over
+NumPy arrays so thousands of follower trades can be screened without one view call per follower
+
+Every check runs in the same order as the Move code and returns the same
+(is_valid, risk_score, max_allowed_amount, rejection_reason). Inputs that would abort the
+transaction on-chain (missing vault, u64 overflow/underflow, division by zero) are reported
+with the ABORT_* reason codes instead of raising.
+"""
+
+import argparse
+import random
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ NumPy not found. Please install it first: pip install numpy")
+    sys.exit(1)
+
+U64_MAX = (1 << 64) - 1
+SECONDS_PER_DAY = 86400
+
+# Reason codes, indexing REASON_TEXT (the rejection_reason bytes returned on-chain)
+OK = 0
+NO_PROFILE = 1
+NOT_VERIFIED = 2
+BLACKLISTED = 3
+SYMBOL_NOT_ALLOWED = 4
+TOO_MANY_POSITIONS = 5
+POSITION_TOO_LARGE = 6
+DAILY_LOSS_EXCEEDED = 7
+INSUFFICIENT_FUNDS = 8
+ABORT_VAULT_NOT_FOUND = 9
+ABORT_ARITHMETIC = 10
+
+REASON_TEXT = [
+    '',
+    'No risk profile found',
+    'Trader not verified',
+    'Trader is blacklisted',
+    'Trading pair not allowed',
+    'Too many open positions',
+    'Exceeds maximum position size',
+    'Daily loss limit exceeded',
+    'Not enough funds',
+    'Vault not found (transaction aborts)',
+    'Arithmetic error (transaction aborts)',
+]
+
+# Columns of a trade batch and their dtypes
+PROFILE_COLUMNS = {
+    'has_profile': bool,
+    'risk_level': np.uint8,
+    'max_daily_loss': np.uint64,
+    'max_position_size': np.uint64,
+    'max_positions': np.uint8,
+    'daily_loss_so_far': np.uint64,
+    'daily_reset_timestamp': np.uint64,
+}
+VAULT_COLUMNS = {
+    'has_vault': bool,
+    'vault_balance': np.uint64,
+    'locked_balance': np.uint64,
+    'position_count': np.uint64,
+}
+TRADE_COLUMNS = {
+    'trader_verified': bool,
+    'amount': np.uint64,
+}
+
+
+class RiskParameters:
+    """Off-chain copy of the global risk_manager::RiskParameters resource"""
+
+    def __init__(self, max_single_position_percentage=10, allowed_symbols=(b"APT/USDC", b"BTC/USDC",
+                 b"ETH/USDC", b"SOL/USDC"), blacklisted_traders=()):
+        self.max_single_position_percentage = max_single_position_percentage
+        self.allowed_symbols = [_as_bytes(s) for s in allowed_symbols]
+        self.blacklisted_traders = list(blacklisted_traders)
+
+
+class RiskCheckResult:
+    """Arrays of (is_valid, risk_score, max_allowed_amount, reason code) per trade"""
+
+    def __init__(self, n):
+        self.is_valid = np.zeros(n, dtype=bool)
+        self.risk_score = np.zeros(n, dtype=np.uint8)
+        self.max_allowed_amount = np.zeros(n, dtype=np.uint64)
+        self.reason = np.zeros(n, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.is_valid)
+
+    def row(self, i):
+        """(is_valid, risk_score, max_allowed_amount, rejection_reason) of trade i"""
+        return (bool(self.is_valid[i]), int(self.risk_score[i]), int(self.max_allowed_amount[i]),
+                REASON_TEXT[self.reason[i]])
+
+    def rows(self):
+        return [self.row(i) for i in range(len(self))]
+
+
+def _as_bytes(value):
+    return value.encode() if isinstance(value, str) else bytes(value)
+
+
+def _columns(batch, spec):
+    return {name: np.asarray(batch[name], dtype=dtype) for name, dtype in spec.items()}
+
+
+def _symbols(column):
+    """Symbols as a fixed-width bytes array so membership tests stay vectorized"""
+    symbols = np.asarray(column)
+    if symbols.dtype.kind == 'U':
+        return np.char.encode(symbols)
+    if symbols.dtype.kind != 'S':
+        return np.asarray([_as_bytes(s) for s in symbols], dtype=bytes)
+    return symbols
+
+
+def prepare_batch(batch):
+    """Convert a batch of lists into typed NumPy columns once, so repeated checks don't re-convert"""
+    prepared = {}
+    for spec in (PROFILE_COLUMNS, VAULT_COLUMNS, TRADE_COLUMNS):
+        prepared.update(_columns(batch, spec))
+    prepared['trader_address'] = np.asarray(batch['trader_address'], dtype=str)
+    prepared['symbol'] = _symbols(batch['symbol'])
+    return prepared
+
+
+def today_timestamp(now_seconds):
+    """risk_manager::get_today_timestamp"""
+    return (now_seconds // SECONDS_PER_DAY) * SECONDS_PER_DAY
+
+
+def validate_trades(params, batch, now_seconds):
+    """Vectorized risk_manager::validate_trade
+
+    batch maps column names to equal-length arrays: the PROFILE_COLUMNS of each user's
+    UserRiskProfile, the VAULT_COLUMNS from user_vault::get_vault_info, the TRADE_COLUMNS,
+    plus 'trader_address' and 'symbol' (one entry per trade).
+    """
+    profile = _columns(batch, PROFILE_COLUMNS)
+    vault = _columns(batch, VAULT_COLUMNS)
+    trade = _columns(batch, TRADE_COLUMNS)
+    n = len(trade['amount'])
+    result = RiskCheckResult(n)
+    decided = np.zeros(n, dtype=bool)
+
+    def reject(rows, reason, risk_score, max_allowed=0):
+        rows = rows & ~decided
+        result.reason[rows] = reason
+        result.risk_score[rows] = risk_score
+        result.max_allowed_amount[rows] = max_allowed[rows] if isinstance(max_allowed, np.ndarray) else max_allowed
+        decided[rows] = True
+
+    amount = trade['amount']
+
+    reject(~profile['has_profile'], NO_PROFILE, 10)
+
+    # reset_daily_limits_if_needed
+    daily_loss = np.where(profile['daily_reset_timestamp'] < np.uint64(today_timestamp(now_seconds)),
+                          np.uint64(0), profile['daily_loss_so_far'])
+
+    reject(~trade['trader_verified'], NOT_VERIFIED, 10)
+
+    if params.blacklisted_traders:
+        traders = np.asarray(batch['trader_address'], dtype=str)
+        reject(np.isin(traders, np.asarray(params.blacklisted_traders, dtype=str)), BLACKLISTED, 10)
+
+    if params.allowed_symbols:
+        allowed = np.isin(_symbols(batch['symbol']), np.asarray(params.allowed_symbols, dtype=bytes))
+    else:
+        allowed = np.zeros(n, dtype=bool)
+    reject(~allowed, SYMBOL_NOT_ALLOWED, 10)
+
+    reject(~vault['has_vault'], ABORT_VAULT_NOT_FOUND, 10)
+
+    vault_balance, locked = vault['vault_balance'], vault['locked_balance']
+    position_count = vault['position_count']
+    reject(position_count >= profile['max_positions'].astype(np.uint64), TOO_MANY_POSITIONS, 8)
+
+    # available_balance = vault_balance - locked_balance and
+    # vault_balance * max_single_position_percentage both abort on over/underflow
+    pct = int(params.max_single_position_percentage)
+    reject(locked > vault_balance, ABORT_ARITHMETIC, 10)
+    if pct:
+        reject(vault_balance > np.uint64(U64_MAX // pct), ABORT_ARITHMETIC, 10)
+    available = vault_balance - np.minimum(locked, vault_balance)
+    max_position_amount = (vault_balance * np.uint64(pct)) // np.uint64(100)
+    effective_max = np.minimum(max_position_amount, profile['max_position_size'])
+
+    reject(amount > effective_max, POSITION_TOO_LARGE, 7, effective_max)
+
+    # projected_daily_loss = daily_loss_so_far + amount
+    reject(amount > np.uint64(U64_MAX) - daily_loss, ABORT_ARITHMETIC, 10)
+    projected = daily_loss + np.minimum(amount, np.uint64(U64_MAX) - daily_loss)
+    over_daily = projected > profile['max_daily_loss']
+    # max_daily_loss - daily_loss_so_far underflows when the limit was already passed
+    reject(over_daily & (daily_loss > profile['max_daily_loss']), ABORT_ARITHMETIC, 10)
+    reject(over_daily, DAILY_LOSS_EXCEEDED, 9,
+           profile['max_daily_loss'] - np.minimum(daily_loss, profile['max_daily_loss']))
+
+    reject(amount > available, INSUFFICIENT_FUNDS, 6, available)
+
+    # calculate_trade_risk_score: amount * 100 / vault_balance
+    reject((amount > np.uint64(U64_MAX // 100)) | (vault_balance == 0), ABORT_ARITHMETIC, 10)
+    passed = ~decided
+    risk_score = calculate_trade_risk_scores(profile['risk_level'], amount, vault_balance, position_count,
+                                             rows=passed)
+    result.is_valid[passed] = True
+    result.risk_score[passed] = risk_score[passed]
+    result.max_allowed_amount[passed] = effective_max[passed]
+    result.reason[passed] = OK
+    return result
+
+
+def calculate_trade_risk_scores(risk_level, trade_amount, vault_balance, current_positions, rows=None):
+    """Vectorized risk_manager::calculate_trade_risk_score (rows outside `rows` are left at 0)"""
+    risk_level = np.asarray(risk_level, dtype=np.uint64)
+    trade_amount = np.asarray(trade_amount, dtype=np.uint64)
+    vault_balance = np.asarray(vault_balance, dtype=np.uint64)
+    current_positions = np.asarray(current_positions, dtype=np.uint64)
+    if rows is None:
+        rows = np.ones(len(trade_amount), dtype=bool)
+
+    safe_balance = np.where(rows & (vault_balance > 0), vault_balance, np.uint64(1))
+    safe_amount = np.where(rows, trade_amount, np.uint64(0))
+    position_percentage = (safe_amount * np.uint64(100)) // safe_balance
+    position_risk = np.select([position_percentage > 15, position_percentage > 10, position_percentage > 5],
+                              [3, 2, 1], 0).astype(np.uint64)
+    diversification_risk = np.select([current_positions == 0, current_positions < 3], [2, 1], 0).astype(np.uint64)
+    trader_risk = np.uint64(2)  # fixed in the Move implementation
+
+    total = risk_level + position_risk + diversification_risk + trader_risk
+    scores = np.minimum(total, np.uint64(10)).astype(np.uint8)
+    scores[~rows] = 0
+    return scores
+
+
+def calculate_position_sizes(batch, vault_balance, trader_risk_score):
+    """Vectorized risk_manager::calculate_position_size
+
+    Rows where vault_balance * percentage would overflow u64 raise OverflowError, as the
+    Move code would abort.
+    """
+    profile = _columns(batch, {k: PROFILE_COLUMNS[k] for k in ('has_profile', 'risk_level', 'max_position_size')})
+    vault_balance = np.asarray(vault_balance, dtype=np.uint64)
+    trader_risk_score = np.asarray(trader_risk_score, dtype=np.uint8)
+    risk_level = profile['risk_level']
+
+    base_percentage = np.select([risk_level == 1, risk_level == 2, risk_level == 3, risk_level == 4],
+                                [2, 5, 10, 15], 20).astype(np.uint64)
+    trader_adjustment = np.select([trader_risk_score <= 3, trader_risk_score <= 6], [100, 80], 60).astype(np.uint64)
+    adjusted = (base_percentage * trader_adjustment) // np.uint64(100)
+
+    has_profile = profile['has_profile']
+    if np.any(has_profile & (vault_balance > np.uint64(U64_MAX) // np.maximum(adjusted, np.uint64(1)))):
+        raise OverflowError("vault_balance * percentage does not fit in u64")
+    calculated = (vault_balance * adjusted) // np.uint64(100)
+    sizes = np.minimum(calculated, profile['max_position_size'])
+    sizes[~has_profile] = 0
+    return sizes
+
+
+# Scalar reference: a line-by-line transcription of the Move code
+
+class _Abort(Exception):
+    pass
+
+
+def _u64(value):
+    if value < 0 or value > U64_MAX:
+        raise _Abort()
+    return value
+
+
+def calculate_trade_risk_score_scalar(user_risk_level, trade_amount, vault_balance, current_positions):
+    if vault_balance == 0:
+        raise _Abort()
+    position_percentage = _u64(trade_amount * 100) // vault_balance
+    position_risk = 3 if position_percentage > 15 else 2 if position_percentage > 10 else \
+        1 if position_percentage > 5 else 0
+    diversification_risk = 2 if current_positions == 0 else 1 if current_positions < 3 else 0
+    trader_risk = 2
+    total_risk = user_risk_level + position_risk + diversification_risk + trader_risk
+    return 10 if total_risk > 10 else total_risk
+
+
+def validate_trade_scalar(params, row, now_seconds):
+    """risk_manager::validate_trade for one trade, given one row of batch columns"""
+    try:
+        return _validate_trade_scalar(params, row, now_seconds)
+    except _Abort:
+        reason = ABORT_VAULT_NOT_FOUND if row['has_profile'] and not row['has_vault'] else ABORT_ARITHMETIC
+        return (False, 10, 0, REASON_TEXT[reason])
+
+
+def _validate_trade_scalar(params, row, now_seconds):
+    if not row['has_profile']:
+        return (False, 10, 0, REASON_TEXT[NO_PROFILE])
+
+    daily_loss_so_far = row['daily_loss_so_far']
+    if today_timestamp(now_seconds) > row['daily_reset_timestamp']:
+        daily_loss_so_far = 0
+
+    if not row['trader_verified']:
+        return (False, 10, 0, REASON_TEXT[NOT_VERIFIED])
+    if row['trader_address'] in params.blacklisted_traders:
+        return (False, 10, 0, REASON_TEXT[BLACKLISTED])
+    if _as_bytes(row['symbol']) not in params.allowed_symbols:
+        return (False, 10, 0, REASON_TEXT[SYMBOL_NOT_ALLOWED])
+    if not row['has_vault']:
+        raise _Abort()
+
+    vault_balance, locked_balance = row['vault_balance'], row['locked_balance']
+    position_count = row['position_count']
+    amount = row['amount']
+
+    if position_count >= row['max_positions']:
+        return (False, 8, 0, REASON_TEXT[TOO_MANY_POSITIONS])
+
+    available_balance = _u64(vault_balance - locked_balance)
+    max_position_amount = _u64(vault_balance * params.max_single_position_percentage) // 100
+    effective_max = min(max_position_amount, row['max_position_size'])
+    if amount > effective_max:
+        return (False, 7, effective_max, REASON_TEXT[POSITION_TOO_LARGE])
+
+    projected_daily_loss = _u64(daily_loss_so_far + amount)
+    if projected_daily_loss > row['max_daily_loss']:
+        return (False, 9, _u64(row['max_daily_loss'] - daily_loss_so_far), REASON_TEXT[DAILY_LOSS_EXCEEDED])
+
+    if amount > available_balance:
+        return (False, 6, available_balance, REASON_TEXT[INSUFFICIENT_FUNDS])
+
+    risk_score = calculate_trade_risk_score_scalar(row['risk_level'], amount, vault_balance, position_count)
+    return (True, risk_score, effective_max, '')
+
+
+def calculate_position_size_scalar(row, vault_balance, trader_risk_score):
+    if not row['has_profile']:
+        return 0
+    level = row['risk_level']
+    base_percentage = 2 if level == 1 else 5 if level == 2 else 10 if level == 3 else 15 if level == 4 else 20
+    trader_adjustment = 100 if trader_risk_score <= 3 else 80 if trader_risk_score <= 6 else 60
+    adjusted_percentage = (base_percentage * trader_adjustment) // 100
+    calculated_amount = _u64(vault_balance * adjusted_percentage) // 100
+    return min(calculated_amount, row['max_position_size'])
+
+
+# Benchmark and differential check
+
+def random_batch(n, params, now_seconds, seed):
+    """Random trades that exercise every branch, including boundary and abort cases"""
+    rng = random.Random(seed)
+    today = today_timestamp(now_seconds)
+    traders = [f'0x{i:x}' for i in range(50)]
+    symbols = params.allowed_symbols + [b'DOGE/USDC']
+
+    def u64():
+        return rng.choice([0, 1, U64_MAX, U64_MAX // 100 + 1, U64_MAX // 10 + 1,
+                           rng.randint(0, 10**6), rng.randint(0, 10**12), rng.randint(0, U64_MAX)])
+
+    batch = {name: [] for name in list(PROFILE_COLUMNS) + list(VAULT_COLUMNS) + list(TRADE_COLUMNS)}
+    batch['trader_address'] = []
+    batch['symbol'] = []
+    for _ in range(n):
+        balance = rng.choice([0, rng.randint(1, 10**9), rng.randint(1, 10**15), u64()])
+        batch['has_profile'].append(rng.random() > 0.02)
+        batch['risk_level'].append(rng.randint(1, 5))
+        batch['max_daily_loss'].append(rng.choice([u64(), rng.randint(0, balance + 1)]))
+        batch['max_position_size'].append(rng.choice([u64(), rng.randint(0, balance + 1)]))
+        batch['max_positions'].append(rng.randint(0, 30))
+        batch['daily_loss_so_far'].append(rng.choice([0, u64(), rng.randint(0, balance + 1)]))
+        batch['daily_reset_timestamp'].append(rng.choice([today, today - SECONDS_PER_DAY]))
+        batch['has_vault'].append(rng.random() > 0.02)
+        batch['vault_balance'].append(balance)
+        batch['locked_balance'].append(rng.choice([0, rng.randint(0, balance + 1), u64()]))
+        batch['position_count'].append(rng.randint(0, 30))
+        batch['trader_verified'].append(rng.random() > 0.05)
+        batch['amount'].append(rng.choice([u64(), rng.randint(0, max(1, balance // 5))]))
+        batch['trader_address'].append(rng.choice(traders))
+        batch['symbol'].append(rng.choice(symbols))
+    return batch
+
+
+def differential_check(n, seed):
+    """Compare validate_trades/calculate_position_sizes with the scalar reference on random input"""
+    params = RiskParameters(blacklisted_traders=['0x1', '0x2'])
+    now_seconds = 1_700_000_000
+    batch = random_batch(n, params, now_seconds, seed)
+    result = validate_trades(params, prepare_batch(batch), now_seconds)
+    mismatches = 0
+    for i in range(n):
+        row = {name: column[i] for name, column in batch.items()}
+        expected = validate_trade_scalar(params, row, now_seconds)
+        if result.row(i) != expected:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"❌ Trade {i}: batch {result.row(i)} != scalar {expected}")
+
+    rng = random.Random(seed + 1)
+    balances = [rng.randint(0, U64_MAX // 20) for _ in range(n)]
+    scores = [rng.randint(1, 10) for _ in range(n)]
+    sizes = calculate_position_sizes(batch, balances, scores).tolist()
+    for i in range(n):
+        row = {name: column[i] for name, column in batch.items()}
+        if sizes[i] != calculate_position_size_scalar(row, balances[i], scores[i]):
+            mismatches += 1
+
+    reasons = np.bincount(result.reason, minlength=len(REASON_TEXT))
+    print(f"🔍 Differential check over {n:,} trades: {mismatches} mismatches")
+    for code, count in enumerate(reasons):
+        print(f"   {REASON_TEXT[code] or 'Valid':<40} {count:>8,}")
+    return mismatches == 0
+
+
+def benchmark(n, seed):
+    """Per-trade cost of the batch evaluator against the scalar loop"""
+    params = RiskParameters(blacklisted_traders=['0x1', '0x2'])
+    now_seconds = 1_700_000_000
+    batch = random_batch(n, params, now_seconds, seed)
+    prepared = prepare_batch(batch)
+
+    started = time.perf_counter()
+    validate_trades(params, prepared, now_seconds)
+    batch_seconds = time.perf_counter() - started
+
+    sample = min(n, 20000)
+    rows = [{name: column[i] for name, column in batch.items()} for i in range(sample)]
+    started = time.perf_counter()
+    for row in rows:
+        validate_trade_scalar(params, row, now_seconds)
+    scalar_seconds = (time.perf_counter() - started) / sample * n
+
+    print(f"⚡ validate_trades over {n:,} trades: {batch_seconds * 1000:.1f} ms "
+          f"({batch_seconds / n * 1e9:.0f} ns/trade)")
+    print(f"🐢 scalar reference: {scalar_seconds / n * 1e9:.0f} ns/trade "
+          f"({scalar_seconds / batch_seconds:.0f}x slower)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch risk pre-check for copy trades")
+    parser.add_argument('--trades', type=int, default=200_000, help="batch size for the benchmark")
+    parser.add_argument('--check', type=int, default=50_000, help="trades in the differential check")
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    ok = differential_check(args.check, args.seed)
+    benchmark(args.trades, args.seed)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+RPC endpoint latency prober for OneClick Copy Trading deployments
+Measures ledger-info round trips and error rates for every candidate REST endpoint concurrently,
+ranks them and caches the ranking on disk for a TTL; endpoints serving another chain than the
+network's are never ranked healthy
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from build_cache import DEFAULT_CACHE_DIR
+
+APTOS_LABS_RPC = {
+    'testnet': 'https://api.testnet.aptoslabs.com/v1',
+    'mainnet': 'https://api.mainnet.aptoslabs.com/v1',
+}
+# Chain id every endpoint of a network must report
+CHAIN_IDS = {'mainnet': 1, 'testnet': 2}
+DEFAULT_SAMPLES = 3
+DEFAULT_TIMEOUT = 5.0
+DEFAULT_TTL = 300
+RANKINGS_FILE = 'rpc-rankings.json'
+
+# CLI output that blames the endpoint rather than the transaction: connection failures,
+# HTTP 429 and 5xx responses
+ENDPOINT_ERROR_RE = re.compile(
+    r'connection (?:refused|reset|closed|aborted)|error sending request|error trying to connect'
+    r'|failed to connect|dns error|broken pipe'
+    r'|(?:status|http|code)\W{0,3}(?:code\W{0,3})?(?:429|5\d\d)\b'
+    r'|too many requests|bad gateway|service unavailable|gateway time-?out', re.IGNORECASE)
+
+
+def candidate_endpoints(network):
+    """Every configured REST endpoint for a network, in the order get_network_config prefers them"""
+    suffix = network.upper()
+    candidates = [
+        os.environ.get(f'APTOS_ANKR_{suffix}_RPC'),
+        os.environ.get(f'APTOS_{suffix}_RPC'),
+        APTOS_LABS_RPC.get(network),
+    ]
+    seen = []
+    for url in candidates:
+        if url and url not in seen:
+            seen.append(url)
+    return seen
+
+
+def _headers(url):
+    headers = {'Accept': 'application/json'}
+    api_key = os.environ.get('APTOS_API_KEY')
+    if api_key and 'aptoslabs.com' in url:
+        headers['Authorization'] = f'Bearer {api_key}'
+    return headers
+
+
+def probe_endpoint(url, samples=DEFAULT_SAMPLES, timeout=DEFAULT_TIMEOUT):
+    """Time `samples` ledger-info requests against one endpoint"""
+    latencies = []
+    errors = []
+    chain_id = None
+    for _ in range(samples):
+        started = time.perf_counter()
+        try:
+            request = urllib.request.Request(url.rstrip('/'), headers=_headers(url))
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                info = json.loads(response.read())
+            chain_id = info['chain_id']
+            latencies.append(time.perf_counter() - started)
+        except (urllib.error.URLError, OSError, ValueError, KeyError) as e:
+            errors.append(str(getattr(e, 'reason', e)))
+
+    return {
+        'url': url,
+        'healthy': bool(latencies),
+        'latency': statistics.median(latencies) if latencies else None,
+        'error_rate': len(errors) / samples if samples else 1.0,
+        'chain_id': chain_id,
+        'errors': errors[:3],
+        'probed_at': time.time(),
+    }
+
+
+def rank(results):
+    """Healthy endpoints first, then by error rate and median latency"""
+    return sorted(results, key=lambda r: (not r['healthy'], r['error_rate'], r['latency'] or float('inf')))
+
+
+def probe_all(urls, samples=DEFAULT_SAMPLES, timeout=DEFAULT_TIMEOUT):
+    """Probe every endpoint concurrently and return them ranked"""
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+        results = list(pool.map(lambda url: probe_endpoint(url, samples, timeout), urls))
+    return rank(results)
+
+
+def reject_wrong_chain(network, ranking):
+    """Mark endpoints of another chain (e.g. a testnet URL in APTOS_MAINNET_RPC) unhealthy"""
+    expected = CHAIN_IDS.get(network)
+    if expected is None:
+        return ranking
+    for result in ranking:
+        if result['healthy'] and int(result['chain_id']) != expected:
+            result['healthy'] = False
+            result['errors'] = [f"chain_id {result['chain_id']}, expected {expected} for {network}"] + result['errors']
+    return rank(ranking)
+
+
+class RankingCache:
+    """On-disk endpoint rankings keyed by network and candidate set, valid for ttl seconds"""
+
+    def __init__(self, path=None, ttl=None):
+        cache_dir = Path(os.environ.get('DEPLOY_CACHE_DIR') or DEFAULT_CACHE_DIR)
+        self.path = Path(path or cache_dir / RANKINGS_FILE)
+        self.ttl = float(ttl if ttl is not None else os.environ.get('APTOS_RPC_PROBE_TTL', DEFAULT_TTL))
+
+    def _key(self, network, urls):
+        return f"{network}|{'|'.join(sorted(urls))}"
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, network, urls):
+        entry = self._load().get(self._key(network, urls))
+        if entry and time.time() - entry['stored_at'] < self.ttl:
+            return entry['ranking']
+        return None
+
+    def _save(self, data):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def put(self, network, urls, ranking):
+        data = self._load()
+        data[self._key(network, urls)] = {'stored_at': time.time(), 'ranking': ranking}
+        self._save(data)
+
+    def invalidate(self, network, urls):
+        data = self._load()
+        if data.pop(self._key(network, urls), None) is not None:
+            self._save(data)
+
+
+_memo = {}
+
+
+def ranked_endpoints(network, urls=None, cache=None, refresh=False):
+    """Ranked probe results for a network, served from memory, then disk, then a fresh probe"""
+    urls = list(urls if urls is not None else candidate_endpoints(network))
+    key = (network, tuple(urls))
+    if not refresh and key in _memo:
+        return _memo[key]
+
+    cache = cache or RankingCache()
+    ranking = None if refresh else cache.get(network, urls)
+    if ranking is None:
+        ranking = reject_wrong_chain(network, probe_all(urls))
+        cache.put(network, urls, ranking)
+    else:
+        ranking = reject_wrong_chain(network, ranking)
+    _memo[key] = ranking
+    return ranking
+
+
+def healthy_urls(network, urls=None, cache=None):
+    """Endpoint URLs to try in order: healthy ones by speed; empty when none answered"""
+    return [r['url'] for r in ranked_endpoints(network, urls, cache) if r['healthy']]
+
+
+def mark_failed(network, url, urls=None, cache=None):
+    """Demote an endpoint that just failed so later lookups in this run try the next one"""
+    urls = list(urls if urls is not None else candidate_endpoints(network))
+    ranking = ranked_endpoints(network, urls, cache)
+    for result in ranking:
+        if result['url'] == url:
+            result['healthy'] = False
+            result['error_rate'] = 1.0
+    _memo[(network, tuple(urls))] = rank(ranking)
+    (cache or RankingCache()).invalidate(network, urls)
+
+
+def endpoint_unavailable(output):
+    """True when a failed CLI call's output shows the endpoint, not the request, was at fault"""
+    return ENDPOINT_ERROR_RE.search(output) is not None
+
+
+def print_ranking(ranking):
+    print(f"   {'endpoint':<55} {'latency':>9} {'errors':>7}")
+    for result in ranking:
+        latency = f"{result['latency'] * 1000:.0f} ms" if result['latency'] is not None else '-'
+        status = '' if result['healthy'] else '  ❌ ' + '; '.join(result['errors'][:1])
+        print(f"   {result['url'][:55]:<55} {latency:>9} {result['error_rate']:>6.0%}{status}")
+
+
+def self_check():
+    """Check ranking, failover and the ranking cache against local stand-in nodes"""
+    import tempfile
+    from mock_node import MockNode
+
+    failures = []
+
+    def check(name, ok):
+        print(f"   {'✅' if ok else '❌'} {name}")
+        if not ok:
+            failures.append(name)
+
+    with MockNode(fail_rate=1.0) as broken, MockNode(delay=0.2) as slow, MockNode(delay=0.01) as fast, \
+            tempfile.TemporaryDirectory() as tmp:
+        urls = [broken.url, slow.url, fast.url]
+        ranking = probe_all(urls)
+        print("🧪 Stand-in nodes: broken (always 503), slow (200 ms), fast (10 ms)")
+        print_ranking(ranking)
+        check("ranked fast, slow, broken", [r['url'] for r in ranking] == [fast.url, slow.url, broken.url])
+        check("the 503 node is unhealthy with every probe failed",
+              not ranking[-1]['healthy'] and ranking[-1]['error_rate'] == 1.0)
+
+        network = 'self-check'
+        cache = RankingCache(Path(tmp) / RANKINGS_FILE, ttl=60)
+        _memo.clear()
+        check("failover order skips the 503 node", healthy_urls(network, urls, cache) == [fast.url, slow.url])
+
+        probes = fast.requests
+        _memo.clear()
+        check("a ranking within its TTL is served from disk without probing",
+              healthy_urls(network, urls, cache) == [fast.url, slow.url] and fast.requests == probes)
+        check("a ranking past its TTL is ignored", RankingCache(cache.path, ttl=0).get(network, urls) is None)
+
+        mark_failed(network, fast.url, urls, cache)
+        check("a failed endpoint is demoted for the rest of the run", healthy_urls(network, urls, cache) == [slow.url])
+        check("marking an endpoint failed invalidates the cached ranking",
+              cache.get(network, urls) is None and json.loads(cache.path.read_text()) == {})
+        _memo.clear()
+        check("the next run re-probes", healthy_urls(network, urls, cache) == [fast.url, slow.url]
+              and fast.requests > probes)
+
+    with MockNode(chain_id=1) as other_chain, MockNode(delay=0.05) as testnet, \
+            tempfile.TemporaryDirectory() as tmp:
+        urls = [other_chain.url, testnet.url]
+        cache = RankingCache(Path(tmp) / RANKINGS_FILE, ttl=60)
+        _memo.clear()
+        check("a faster endpoint of another chain is never tried on testnet",
+              healthy_urls('testnet', urls, cache) == [testnet.url])
+        _memo.clear()
+        check("nor when the ranking comes from disk", healthy_urls('testnet', urls, cache) == [testnet.url])
+        _memo.clear()
+        check("the same endpoint is the mainnet choice", healthy_urls('mainnet', urls, cache) == [other_chain.url])
+
+    print(f"🔍 {len(failures)} failed checks")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe and rank Aptos REST endpoints")
+    parser.add_argument('--network', default=os.environ.get('APTOS_NETWORK', 'testnet'))
+    parser.add_argument('--refresh', action='store_true', help="ignore the cached ranking")
+    parser.add_argument('--self-check', action='store_true',
+                        help="check ranking, failover and caching against local stand-in servers")
+    args = parser.parse_args()
+
+    if args.self_check:
+        sys.exit(0 if self_check() else 1)
+
+    ranking = ranked_endpoints(args.network, refresh=args.refresh)
+    print(f"📡 {args.network} endpoints, fastest healthy first")
+    print_ranking(ranking)
+
+
+if __name__ == "__main__":
+    main()
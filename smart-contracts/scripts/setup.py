@@ -3,27 +3,28 @@
 Setup script for OneClick Copy Trading smart contracts development environment
 """
 
-import subprocess
+import argparse
 import sys
 import os
 import platform
 
+from dep_mirror import fetch_flags, prepare
+from move_tests import run_tests
+from streaming import stream_command
+import tracing
+
 def run_command(command, description, exit_on_error=True):
-    """Run a shell command and handle errors"""
+    """Run a shell command, streaming its output, and handle errors"""
     print(f"\n🔄 {description}...")
-    try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
-        print(f"✅ {description} completed successfully")
-        if result.stdout:
-            print(f"Output: {result.stdout.strip()}")
+    result = stream_command(command, description)
+    if result.ok:
+        print(f"✅ {description} completed successfully ({result.duration:.1f}s)")
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} failed")
-        if e.stderr:
-            print(f"Error: {e.stderr}")
-        if exit_on_error:
-            return False
-        return False
+
+    print(f"❌ {description} failed")
+    if result.stderr:
+        print(f"Error: {result.stderr}")
+    return False
 
 def detect_os():
     """Detect the operating system"""
@@ -59,7 +60,7 @@ def install_aptos_cli():
 def check_aptos_cli():
     """Check if Aptos CLI is installed and working"""
     try:
-        result = subprocess.run("aptos --version", shell=True, capture_output=True, text=True)
+        result = tracing.run("aptos --version")
         if result.returncode == 0:
             print(f"✅ Aptos CLI found: {result.stdout.strip()}")
             return True
@@ -68,7 +69,7 @@ def check_aptos_cli():
     except:
         return False
 
-def setup_development_environment():
+def setup_development_environment(workers=None, incremental=False):
     """Setup the complete development environment"""
     print("🎯 OneClick Copy Trading - Development Environment Setup")
     print("=" * 60)
@@ -112,15 +113,20 @@ def setup_development_environment():
     else:
         print("✅ All required files found")
     
+    # Resolve git dependencies from the local mirror instead of cloning aptos-core
+    print("\n📦 Preparing Move dependencies...")
+    if not prepare():
+        print("⚠️  Dependencies not mirrored; the Move CLI will fetch them itself.")
+
     # Compile contracts
     print("\n🏗️  Compiling contracts...")
-    if not run_command("aptos move compile --package-dir .", "Compiling Move contracts", False):
+    if not run_command(f"aptos move compile --package-dir .{fetch_flags()}", "Compiling Move contracts", False):
         print("❌ Contract compilation failed. Please check your Move code.")
         return False
     
-    # Run tests
+    # Run tests, sharded across cores
     print("\n🧪 Running tests...")
-    if not run_command("aptos move test --package-dir .", "Running Move tests", False):
+    if not run_tests(workers=workers, incremental=incremental):
         print("⚠️  Some tests failed. Please review your test cases.")
         # Don't return False here as tests might fail due to environment issues
     
@@ -212,10 +218,40 @@ await client.submitTransaction(signedTxn);
     
     print("📖 Quick start guide created: QUICK_START.md")
 
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Set up the OneClick Copy Trading smart contract environment")
+    parser.add_argument('--trace', metavar='OUT_JSON',
+                        help="record per-subprocess timing/resource usage to a Chrome trace file")
+    parser.add_argument('--workers', type=int,
+                        help="parallel Move test shards (default: MOVE_TEST_WORKERS or CPU count)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only rerun Move tests that failed last time or whose modules changed")
+    parser.add_argument('--test-only', action='store_true', help="skip setup and only run the Move tests")
+    parser.add_argument('--offline', action='store_true',
+                        help="resolve Move dependencies only from the local mirror (MOVE_DEP_OFFLINE)")
+    return parser.parse_args()
+
 def main():
     """Main setup function"""
+    args = parse_args()
+    if args.trace:
+        tracing.enable(args.trace)
+    if args.offline:
+        os.environ['MOVE_DEP_OFFLINE'] = 'true'
+
+    if args.test_only:
+        try:
+            with tracing.span('move_tests'):
+                success = run_tests(workers=args.workers, incremental=args.incremental)
+        finally:
+            if tracing.active():
+                tracing.active().write()
+        sys.exit(0 if success else 1)
+
     try:
-        success = setup_development_environment()
+        with tracing.span('setup_development_environment'):
+            success = setup_development_environment(args.workers, args.incremental)
         
         if success:
             create_quick_start_guide()
@@ -241,6 +277,9 @@ def main():
     except Exception as e:
         print(f"\n❌ Setup failed: {str(e)}")
         sys.exit(1)
+    finally:
+        if tracing.active():
+            tracing.active().write()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Trigger-price index for stop-loss sweeps in OneClick Copy Trading
+Indexes the positions of a PositionBook by the price at which risk_manager::should_trigger_stop_loss
+first returns true, so a price tick touches only the positions it actually crosses instead of
+evaluating every open position
+
+should_trigger_stop_loss is monotone in the price on each side, so for a position with entry price e
+and its owner's stop_loss_percentage s it fires (returns true, or aborts on u64 overflow or division
+by zero) exactly when
+
+    long    price <= max(e - ceil(s * e / 100), abort bound)        s == 0 fires at any price
+    short   price >= min(e + ceil(s * e / 100), abort bound)
+
+Each symbol keeps a long and a short side as sorted key arrays; a tick bisects once per side and
+slices off the fired suffix. Fired positions leave the index (the sweep closes them); closed
+positions are dropped lazily when they are crossed. Owners without a risk profile never fire, as
+on-chain, until set_stop_loss() records one.
+
+The index also tracks the price-driven part of is_position_at_risk: a position is marked at
+amount * price / entry_price, the scaling user_vault uses for PnL, and crosses MAX_POSITION_VALUE
+at a fixed price. The other two criteria are per account and do not move with the price.
+"""
+
+import argparse
+import random
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ NumPy not found. Please install it first: pip install numpy")
+    sys.exit(1)
+
+from position_book import ARITHMETIC_ERROR, U64_MAX, MoveAbort, PositionBook
+
+MAX_POSITION_VALUE = 1000000
+ABORT_MOVE = U64_MAX // 100         # a larger price move overflows `move * 100`
+
+
+def _as_bytes(value):
+    return value.encode() if isinstance(value, str) else bytes(value)
+
+
+# Scalar reference: line-by-line transcriptions of the Move code
+
+def _u64(value):
+    if value < 0 or value > U64_MAX:
+        raise MoveAbort(ARITHMETIC_ERROR)
+    return value
+
+
+def should_trigger_stop_loss(stop_loss_percentage, entry_price, current_price, is_long):
+    """stop_loss_percentage is None when the user has no risk profile"""
+    if stop_loss_percentage is None:
+        return False
+    if is_long:
+        if current_price <= entry_price:
+            if entry_price == 0:
+                raise MoveAbort(ARITHMETIC_ERROR)
+            price_change_percentage = _u64((entry_price - current_price) * 100) // entry_price
+        else:
+            price_change_percentage = 0
+    else:
+        if current_price >= entry_price:
+            if entry_price == 0:
+                raise MoveAbort(ARITHMETIC_ERROR)
+            price_change_percentage = _u64((current_price - entry_price) * 100) // entry_price
+        else:
+            price_change_percentage = 0
+    return price_change_percentage >= stop_loss_percentage
+
+
+def is_position_at_risk(position_value, total_pnl, account_value_threshold, daily_loss_so_far, max_daily_loss):
+    """The last two arguments come from the user's risk profile; pass 0, 1 when there is none"""
+    return ((total_pnl < account_value_threshold) or (position_value > MAX_POSITION_VALUE)
+            or (daily_loss_so_far >= max_daily_loss))
+
+
+def position_value(amount, entry_price, price):
+    """Mark value used for the MAX_POSITION_VALUE check; zero entry prices count as zero"""
+    return amount * price // entry_price if entry_price else 0
+
+
+# Trigger prices
+
+def fire_price(stop_loss_percentage, entry_price, is_long):
+    """Price at which should_trigger_stop_loss stops returning false, or None if it never does"""
+    if is_long:
+        if stop_loss_percentage == 0:
+            return U64_MAX
+        bounds = []
+        if stop_loss_percentage * entry_price <= 100 * entry_price:
+            bounds.append(entry_price - (stop_loss_percentage * entry_price + 99) // 100)
+        if entry_price == 0 or entry_price > ABORT_MOVE:
+            bounds.append(max(0, entry_price - ABORT_MOVE - 1))
+        return max(bounds) if bounds else None
+    if stop_loss_percentage == 0 or entry_price == 0:
+        return 0
+    price = min(entry_price + (stop_loss_percentage * entry_price + 99) // 100, entry_price + ABORT_MOVE + 1)
+    return price if price <= U64_MAX else None
+
+
+def risk_price(amount, entry_price):
+    """Lowest price at which position_value exceeds MAX_POSITION_VALUE, or None"""
+    if amount == 0 or entry_price == 0:
+        return None
+    price = -(-(MAX_POSITION_VALUE + 1) * entry_price // amount)
+    return price if price <= U64_MAX else None
+
+
+class _SortedKeys:
+    """Ascending u64 keys with the position row each belongs to"""
+
+    __slots__ = ('keys', 'rows')
+
+    def __init__(self):
+        self.keys = np.zeros(0, dtype=np.uint64)
+        self.rows = np.zeros(0, dtype=np.uint32)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, keys, rows):
+        order = np.argsort(keys, kind='stable')
+        keys, rows = keys[order], rows[order]
+        at = np.searchsorted(self.keys, keys, side='right')
+        self.keys = np.insert(self.keys, at, keys)
+        self.rows = np.insert(self.rows, at, rows)
+
+    def pop_from(self, key):
+        """Remove and return the rows whose key is >= key"""
+        i = int(np.searchsorted(self.keys, np.uint64(key), side='left'))
+        fired = self.rows[i:]
+        self.keys, self.rows = self.keys[:i], self.rows[:i]
+        return fired
+
+    def between(self, low, high):
+        """Rows with low < key <= high"""
+        start = int(np.searchsorted(self.keys, np.uint64(low), side='right')) if low is not None else 0
+        return self.rows[start:int(np.searchsorted(self.keys, np.uint64(high), side='right'))]
+
+    def keep(self, alive):
+        mask = alive[self.rows]
+        self.keys, self.rows = self.keys[mask], self.rows[mask]
+
+
+class _SymbolIndex:
+    __slots__ = ('long', 'short', 'risk', 'last_price')
+
+    def __init__(self):
+        self.long = _SortedKeys()       # key: fire price; fires when price <= key
+        self.short = _SortedKeys()      # key: U64_MAX - fire price; fires when price >= fire price
+        self.risk = _SortedKeys()       # key: risk price; at risk when price >= key
+        self.last_price = None
+
+
+class Sweep:
+    """Outcome of one price tick for one symbol; all fields are PositionBook rows"""
+
+    __slots__ = ('triggered', 'aborted', 'newly_at_risk')
+
+    def __init__(self, triggered, aborted, newly_at_risk):
+        self.triggered = triggered
+        self.aborted = aborted
+        self.newly_at_risk = newly_at_risk
+
+
+class StopLossIndex:
+    """Per-symbol trigger-price index over the active positions of a PositionBook"""
+
+    def __init__(self, book):
+        self.book = book
+        self.stop_loss = {}         # owner -> stop_loss_percentage (risk profile exists)
+        self.symbols = {}           # symbol id -> _SymbolIndex
+        self.tracked = 0            # rows below this have been offered to the index
+
+    def _symbol(self, symbol_id):
+        index = self.symbols.get(symbol_id)
+        if index is None:
+            index = self.symbols[symbol_id] = _SymbolIndex()
+        return index
+
+    def set_stop_loss(self, owner, stop_loss_percentage):
+        """Record a risk profile (create_risk_profile) and index the owner's open positions"""
+        if owner in self.stop_loss:
+            raise ValueError(f"{owner} already has a risk profile")
+        self.stop_loss[owner] = stop_loss_percentage
+        vault = self.book.owner_ids.get(owner)
+        if vault is not None:
+            rows = np.frombuffer(self.book.vault_rows[vault], dtype=np.uint32)
+            self._index(rows[rows < self.tracked], fire_only=True)
+
+    def track(self):
+        """Index the positions opened since the last call; returns how many were added"""
+        start, self.tracked = self.tracked, len(self.book)
+        return self._index(np.arange(start, self.tracked, dtype=np.uint32))
+
+    def _index(self, rows, fire_only=False):
+        columns = self.book.positions.data
+        rows = rows[columns['is_active'][rows]]
+        if not len(rows):
+            return 0
+        owners = self.book.owners
+        stops = [self.stop_loss.get(owners[v]) for v in columns['vault'][rows].tolist()]
+        entry = columns['entry_price'][rows].tolist()
+        is_long = columns['is_long'][rows].tolist()
+        fire = [None if s is None else fire_price(s, e, lg) for s, e, lg in zip(stops, entry, is_long)]
+        risk = [] if fire_only else [risk_price(a, e) for a, e in zip(columns['amount'][rows].tolist(), entry)]
+        symbol = columns['symbol'][rows]
+
+        for symbol_id in np.unique(symbol).tolist():
+            index = self._symbol(symbol_id)
+            members = np.flatnonzero(symbol == symbol_id)
+            for side, wanted in ((index.long, True), (index.short, False)):
+                picked = [i for i in members.tolist() if is_long[i] == wanted and fire[i] is not None]
+                if picked:
+                    keys = [fire[i] if wanted else U64_MAX - fire[i] for i in picked]
+                    side.add(np.array(keys, dtype=np.uint64), rows[picked])
+            picked = [i for i in members.tolist() if risk and risk[i] is not None]
+            if picked:
+                index.risk.add(np.array([risk[i] for i in picked], dtype=np.uint64), rows[picked])
+        return len(rows)
+
+    def on_price(self, symbol, price):
+        """Sweep one symbol at a new price; fired positions are removed from the index"""
+        index = self.symbols.get(self.book.symbol_ids.get(_as_bytes(symbol)))
+        empty = np.zeros(0, dtype=np.uint32)
+        if index is None:
+            return Sweep(empty, empty, empty)
+        active = self.book.positions.data['is_active']
+
+        fired = np.concatenate((index.long.pop_from(price), index.short.pop_from(U64_MAX - price)))
+        fired = fired[active[fired]]
+        aborted = np.zeros(len(fired), dtype=bool)
+        if len(fired):
+            columns = self.book.positions.data
+            aborted = _aborts(columns['entry_price'][fired], columns['is_long'][fired], price)[0]
+
+        if index.last_price is None or price >= index.last_price:
+            crossed = index.risk.between(index.last_price, price)
+            newly_at_risk = crossed[active[crossed]]
+        else:
+            newly_at_risk = empty
+        index.last_price = price
+        return Sweep(fired[~aborted], fired[aborted], newly_at_risk)
+
+    def at_risk(self, symbol):
+        """Active rows whose value exceeds MAX_POSITION_VALUE at the symbol's last price"""
+        index = self.symbols.get(self.book.symbol_ids.get(_as_bytes(symbol)))
+        if index is None or index.last_price is None:
+            return np.zeros(0, dtype=np.uint32)
+        rows = index.risk.between(None, index.last_price)
+        return rows[self.book.positions.data['is_active'][rows]]
+
+    def prune(self):
+        """Drop closed positions from every side"""
+        alive = self.book.positions.column('is_active')
+        for index in self.symbols.values():
+            for side in (index.long, index.short, index.risk):
+                side.keep(alive)
+
+    def __len__(self):
+        return sum(len(index.long) + len(index.short) for index in self.symbols.values())
+
+
+def _aborts(entry, is_long, price):
+    """Rows where should_trigger_stop_loss aborts at this price instead of returning"""
+    price = np.uint64(price)
+    adverse = np.where(is_long, price <= entry, price >= entry)
+    move = np.where(is_long, entry - np.minimum(entry, price), price - np.minimum(entry, price))
+    return adverse & ((entry == 0) | (move > np.uint64(ABORT_MOVE))), adverse, move
+
+
+def full_scan(book, stop_loss, symbol_id, price):
+    """Vectorized should_trigger_stop_loss over every active position of a symbol: the O(n) baseline
+
+    stop_loss is a per-vault int16 array with -1 where there is no risk profile.
+    Returns (triggered rows, aborted rows).
+    """
+    p = book.positions
+    rows = np.flatnonzero((p.column('symbol') == symbol_id) & p.column('is_active'))
+    stop = stop_loss[p.data['vault'][rows]]
+    entry, is_long = p.data['entry_price'][rows], p.data['is_long'][rows]
+    aborts, adverse, move = _aborts(entry, is_long, price)
+    aborts &= stop >= 0
+    change = np.where(adverse, move * np.uint64(100) // np.maximum(entry, np.uint64(1)), 0)
+    triggered = (stop >= 0) & ~aborts & (change >= stop.astype(np.uint64))
+    return rows[triggered], rows[aborts]
+
+
+# Differential check and benchmark
+
+def differential_check(ticks, seed):
+    """Random book, profiles and prices (including every boundary price); index vs scalar"""
+    rng = random.Random(seed)
+    book = PositionBook(capacity=64)
+    index = StopLossIndex(book)
+    owners = [f'0x{i:x}' for i in range(1, 80)]
+    symbols = ['APT/USDC', 'BTC/USDC', 'ETH/USDC']
+    for owner in owners:
+        book.initialize_vault(owner, U64_MAX, 3)
+    profiles = {}
+
+    def entry():
+        return rng.choice([0, 1, 99, rng.randint(1, 10**4), rng.randint(10**8, 10**9), ABORT_MOVE,
+                           ABORT_MOVE + 1, rng.randint(ABORT_MOVE, U64_MAX), U64_MAX])
+
+    def open_some(n):
+        for _ in range(n):
+            try:
+                book.open_position(rng.choice(owners), '0xt', rng.choice(symbols), rng.randint(0, 10**6),
+                                   entry(), rng.random() < 0.5)
+            except MoveAbort:
+                pass
+        index.track()
+
+    for owner in owners[:60]:
+        profiles[owner] = rng.choice([0, 1, 5, 10, 50, 99, 100, 101, 200, 255, rng.randint(1, 100)])
+        index.set_stop_loss(owner, profiles[owner])
+    open_some(1500)
+
+    fired_rows = set()
+    mismatches = checked = 0
+    for _ in range(ticks):
+        roll = rng.random()
+        if roll < 0.1:
+            open_some(rng.randint(1, 30))
+        elif roll < 0.15 and len(profiles) < len(owners):
+            owner = owners[len(profiles)]
+            profiles[owner] = rng.randint(0, 120)
+            index.set_stop_loss(owner, profiles[owner])
+        elif roll < 0.25:
+            for _ in range(5):
+                owner = rng.choice(owners)
+                count = book.vault_info(owner)[4]
+                if count:
+                    try:
+                        book.close_position(owner, rng.randrange(count), rng.randint(0, 10**9))
+                    except MoveAbort:
+                        pass
+
+        symbol = rng.choice(symbols)
+        symbol_id = book.symbol_ids.get(_as_bytes(symbol))
+        rows = [] if symbol_id is None else np.flatnonzero(book.positions.column('symbol') == symbol_id).tolist()
+        candidates = [r for r in rows if book.positions.data['is_active'][r] and r not in fired_rows]
+        boundary = [fire_price(profiles.get(book.owners[book.positions.data['vault'][r]], 0),
+                               int(book.positions.data['entry_price'][r]), bool(book.positions.data['is_long'][r]))
+                    for r in rng.sample(candidates, min(3, len(candidates)))]
+        price = rng.choice([0, U64_MAX, rng.randint(0, 10**9), rng.randint(0, U64_MAX)]
+                           + [min(U64_MAX, max(0, b + d)) for b in boundary if b is not None for d in (-1, 0, 1)])
+
+        expected_triggered, expected_aborted = set(), set()
+        for row in candidates:
+            owner = book.owners[book.positions.data['vault'][row]]
+            try:
+                if should_trigger_stop_loss(profiles.get(owner), int(book.positions.data['entry_price'][row]),
+                                            price, bool(book.positions.data['is_long'][row])):
+                    expected_triggered.add(row)
+            except MoveAbort:
+                expected_aborted.add(row)
+        checked += len(candidates)
+
+        sweep = index.on_price(symbol, price)
+        got = (set(sweep.triggered.tolist()), set(sweep.aborted.tolist()))
+        if got != (expected_triggered, expected_aborted):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"❌ {symbol} @ {price}: index fired {len(got[0])}+{len(got[1])} aborted, "
+                      f"scalar {len(expected_triggered)}+{len(expected_aborted)} aborted")
+        fired_rows |= got[0] | got[1]
+
+        values = {r for r in rows if book.positions.data['is_active'][r] and is_position_at_risk(
+            position_value(int(book.positions.data['amount'][r]), int(book.positions.data['entry_price'][r]), price),
+            1, 0, 0, 1)}
+        if set(index.at_risk(symbol).tolist()) != values:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"❌ {symbol} @ {price}: at_risk differs from the scalar value check")
+
+    print(f"🔍 Differential check over {ticks:,} ticks ({checked:,} position checks): {mismatches} mismatches, "
+          f"{len(fired_rows):,} positions fired")
+    return mismatches == 0
+
+
+def benchmark(positions, vaults, symbols, ticks, volatility, seed):
+    """Per-tick latency of the index against a vectorized full scan at the same book size"""
+    rng = np.random.default_rng(seed)
+    names = [f'SYM{i}/USDC' for i in range(symbols)]
+    prices = rng.integers(10**6, 10**10, size=symbols, dtype=np.uint64)
+    owners = [f'0x{i:x}' for i in range(vaults)]
+
+    book = PositionBook(capacity=positions)
+    for owner in owners:
+        book.initialize_vault(owner, 10**18, 3)
+    owner_of = rng.integers(0, vaults, size=positions)
+    symbol_of = rng.integers(0, symbols, size=positions)
+    entry = prices[symbol_of] * rng.integers(9000, 11000, size=positions, dtype=np.uint64) // 10000
+    book.open_positions([owners[v] for v in owner_of], ['0xt'] * positions, [names[s] for s in symbol_of],
+                        rng.integers(10**3, 10**9, size=positions, dtype=np.uint64), entry,
+                        rng.random(positions) < 0.5)
+
+    index = StopLossIndex(book)
+    stop_by_vault = np.full(vaults, -1, dtype=np.int16)
+    for v, owner in enumerate(owners):
+        stop_by_vault[v] = int(rng.integers(5, 51))
+        index.set_stop_loss(owner, int(stop_by_vault[v]))
+    started = time.perf_counter()
+    index.track()
+    build_seconds = time.perf_counter() - started
+    indexed = len(index)
+
+    index_ticks, scan_ticks, fired = [], [], 0
+    for _ in range(ticks):
+        step = rng.integers(int(10000 - volatility * 100), int(10000 + volatility * 100) + 1, size=symbols,
+                            dtype=np.uint64)
+        prices = prices * step // 10000
+        started = time.perf_counter()
+        for name, price in zip(names, prices.tolist()):
+            sweep = index.on_price(name, price)
+            fired += len(sweep.triggered) + len(sweep.aborted)
+        index_ticks.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for symbol_id, price in enumerate(prices.tolist()):
+            full_scan(book, stop_by_vault, book.symbol_ids[_as_bytes(names[symbol_id])], price)
+        scan_ticks.append(time.perf_counter() - started)
+
+    def percentile(values, q):
+        return sorted(values)[min(len(values) - 1, int(len(values) * q))] * 1000
+
+    print(f"📦 Indexed {indexed:,} of {positions:,} positions across {symbols} symbols in {build_seconds:.1f}s")
+    print(f"⚡ index sweep:  p50 {percentile(index_ticks, 0.5):.2f} ms, p99 {percentile(index_ticks, 0.99):.2f} ms "
+          f"per tick of all symbols ({fired:,} positions fired over {ticks} ticks)")
+    print(f"🐢 full scan:    p50 {percentile(scan_ticks, 0.5):.2f} ms, p99 {percentile(scan_ticks, 0.99):.2f} ms "
+          f"({percentile(scan_ticks, 0.5) / max(percentile(index_ticks, 0.5), 1e-6):.0f}x slower)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stop-loss trigger-price index over the position book")
+    parser.add_argument('--positions', type=int, default=1_000_000, help="open positions in the benchmark")
+    parser.add_argument('--vaults', type=int, default=100_000)
+    parser.add_argument('--symbols', type=int, default=32)
+    parser.add_argument('--ticks', type=int, default=50, help="price ticks to time")
+    parser.add_argument('--volatility', type=float, default=1.0, help="max price move per tick, percent")
+    parser.add_argument('--check', type=int, default=3000, help="ticks in the differential check")
+    parser.add_argument('--seed', type=int, default=5)
+    args = parser.parse_args()
+
+    ok = differential_check(args.check, args.seed)
+    benchmark(args.positions, args.vaults, args.symbols, args.ticks, args.volatility, args.seed)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
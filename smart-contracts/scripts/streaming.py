@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Streaming subprocess runner for the OneClick Copy Trading scripts
+Echoes child output line by line, extracts values (tx hash, address) as soon as they appear,
+keeps only a bounded tail of the output and supports timeouts and cancellation
+"""
+
+import os
+import queue
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+import tracing
+
+MAX_LINE_CHARS = 4096
+MAX_MATCH_CHARS = 1 << 20
+DEFAULT_TAIL_LINES = 200
+
+# Patterns for values printed by `aptos move publish`
+PUBLISH_PATTERNS = {
+    'tx_hash': [
+        re.compile(r'Transaction hash:\s*(\S+)'),
+        re.compile(r'"transaction_hash":\s*"([^"]+)"'),
+    ],
+    'contract_address': [
+        re.compile(r'Code was successfully deployed to resource account:\s*(\S+)'),
+        # The publishing account; this is the contract address only while the copy_trading named
+        # address in Move.toml is the publishing profile's own account
+        re.compile(r'"sender":\s*"([^"]+)"'),
+    ],
+}
+
+# Set to abort every running stream_command() (e.g. when a sibling pipeline step fails); cleared
+# again by reset_cancel() when the next pipeline starts
+_cancel_all = threading.Event()
+
+
+def cancel_all():
+    """Terminate every command currently running through stream_command()"""
+    _cancel_all.set()
+
+
+def reset_cancel():
+    """Let commands run again after a cancel_all()"""
+    _cancel_all.clear()
+
+
+class StreamResult:
+    """Outcome of a streamed command: exit code, bounded output tails and extracted values"""
+
+    def __init__(self, command, tail_lines):
+        self.command = command
+        self.returncode = None
+        self.stdout_tail = deque(maxlen=tail_lines)
+        self.stderr_tail = deque(maxlen=tail_lines)
+        self.matches = {}
+        self.line_count = 0
+        self.timed_out = False
+        self.cancelled = False
+        self.duration = 0.0
+
+    @property
+    def ok(self):
+        return self.returncode == 0 and not self.timed_out and not self.cancelled
+
+    @property
+    def stdout(self):
+        return '\n'.join(self.stdout_tail)
+
+    @property
+    def stderr(self):
+        return '\n'.join(self.stderr_tail)
+
+
+def _pump(name, pipe, lines):
+    """Forward lines from a child pipe into the shared queue
+
+    Lines are read in MAX_LINE_CHARS pieces and reassembled, so a pattern can match anywhere
+    in a long line of CLI JSON; only the first MAX_MATCH_CHARS of a line are kept.
+    """
+    try:
+        pieces, size = [], 0
+        while True:
+            piece = pipe.readline(MAX_LINE_CHARS)
+            if size < MAX_MATCH_CHARS:
+                pieces.append(piece)
+                size += len(piece)
+            if piece and not piece.endswith('\n'):
+                continue
+            if size:
+                lines.put((name, ''.join(pieces).rstrip('\r\n')))
+            if not piece:
+                break
+            pieces, size = [], 0
+    finally:
+        pipe.close()
+        lines.put((name, None))
+
+
+def _stop(proc):
+    """Terminate a child, escalating to kill if it ignores the request"""
+    if proc.poll() is not None:
+        return
+    proc.terminate()
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def stream_command(command, description=None, patterns=None, on_match=None, timeout=None,
+                   cancel_event=None, echo=True, tail_lines=DEFAULT_TAIL_LINES, label=None):
+    """Run a shell command, echoing and parsing its output incrementally
+
+    patterns maps a name to a list of regexes whose first group is captured the first time it
+    matches; on_match(name, value) is called immediately. Memory is bounded by tail_lines.
+    Echoed lines are prefixed with label when several commands share the terminal.
+    """
+    patterns = patterns or {}
+    prefix = f"   │ [{label}] " if label else "   │ "
+    result = StreamResult(command, tail_lines)
+    deadline = time.monotonic() + timeout if timeout else None
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True, errors='replace', bufsize=1)
+
+    lines = queue.Queue()
+    pumps = [
+        threading.Thread(target=_pump, args=('stdout', proc.stdout, lines), daemon=True),
+        threading.Thread(target=_pump, args=('stderr', proc.stderr, lines), daemon=True),
+    ]
+    for pump in pumps:
+        pump.start()
+
+    open_pipes = len(pumps)
+    try:
+        while open_pipes:
+            if deadline and time.monotonic() > deadline:
+                result.timed_out = True
+                break
+            if _cancel_all.is_set() or (cancel_event is not None and cancel_event.is_set()):
+                result.cancelled = True
+                break
+
+            try:
+                name, line = lines.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if line is None:
+                open_pipes -= 1
+                continue
+
+            result.line_count += 1
+            tail = result.stdout_tail if name == 'stdout' else result.stderr_tail
+            if len(line) <= MAX_LINE_CHARS:
+                tail.append(line)
+            else:
+                tail.extend(line[i:i + MAX_LINE_CHARS] for i in range(0, len(line), MAX_LINE_CHARS))
+            if echo:
+                print(f"{prefix}{line}", file=sys.stdout if name == 'stdout' else sys.stderr, flush=True)
+
+            for key, regexes in patterns.items():
+                if key in result.matches:
+                    continue
+                for regex in regexes:
+                    match = regex.search(line)
+                    if match:
+                        result.matches[key] = match.group(1)
+                        if on_match:
+                            on_match(key, match.group(1))
+                        break
+    except KeyboardInterrupt:
+        result.cancelled = True
+        raise
+    finally:
+        if result.timed_out or result.cancelled:
+            _stop(proc)
+        result.returncode, usage = _reap(proc)
+        result.duration = time.perf_counter() - start
+        tracer = tracing.active()
+        if tracer is not None:
+            tracer.add_process(description or command, command, start, time.perf_counter(),
+                               result.returncode, usage)
+
+    return result
+
+
+def _reap(proc):
+    """Wait for the child, returning (exit code, rusage or None)"""
+    if hasattr(os, 'wait4') and proc.returncode is None:
+        try:
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            return proc.returncode, usage
+        except ChildProcessError:
+            pass
+    return proc.wait(), None
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Pipelined batch transaction submitter for OneClick Copy Trading
+Assigns sequence numbers locally, keeps a window of transactions in flight, confirms them
+asynchronously and repairs sequence gaps left by rejected or expired transactions
+
+A sequence number that will never commit stalls every later transaction of the sender, so each
+such slot is refilled at the same sequence number:
+
+    transient error (HTTP 429/5xx, connection reset)  resubmit the same transaction after a backoff
+    expired before commit (lost from mempool)         re-sign with a fresh expiration
+    permanently rejected at submission                 record the failure, fill the slot with a no-op
+    SEQUENCE_NUMBER_TOO_OLD                            the slot is taken: resync and requeue the payload
+    invalid_transaction_update on a first attempt      the slot is held by another pending transaction: likewise
+    invalid_transaction_update on a retry              an earlier attempt reached the mempool: await it
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from aptos_client import AptosApiError, AptosClient, get_profile
+
+DEFAULT_WINDOW = 64
+DEFAULT_TTL = 30
+DEFAULT_MAX_GAS = 20_000
+DEFAULT_GAS_UNIT_PRICE = 100
+MAX_ATTEMPTS = 5
+CONFIRM_INTERVAL = 0.1
+LOST_AFTER = 1.0     # seconds before a stalled head-of-line transaction is looked up by hash
+# No-op (a zero transfer to self) used to fill a sequence number whose own transaction was rejected
+GAP_FILLER_FUNCTION = '0x1::aptos_account::transfer'
+
+
+def entry_function(function, *arguments, type_arguments=()):
+    """JSON entry function payload; u64 arguments are sent as strings like the REST API expects"""
+    return {
+        'type': 'entry_function_payload',
+        'function': function,
+        'type_arguments': list(type_arguments),
+        'arguments': [str(a) if isinstance(a, int) and not isinstance(a, bool) else a for a in arguments],
+    }
+
+
+class Ed25519Signer:
+    """Signs with an Aptos CLI profile key; requires the cryptography package"""
+
+    def __init__(self, private_key_hex):
+        try:
+            from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+            from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+        except ImportError:
+            print("❌ cryptography not found. Please install it first: pip install cryptography")
+            sys.exit(1)
+        key = private_key_hex.removeprefix('ed25519-priv-').removeprefix('0x')
+        self._key = Ed25519PrivateKey.from_private_bytes(bytes.fromhex(key))
+        self.public_key = '0x' + self._key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw).hex()
+
+    def sign(self, message):
+        return '0x' + self._key.sign(message).hex()
+
+
+class Transaction:
+    """One payload's journey through the window"""
+
+    __slots__ = ('index', 'payload', 'sequence_number', 'hash', 'expiration', 'attempts',
+                 'slot_attempts', 'submitted_at', 'first_submitted_at', 'filler', 'ready_at')
+
+    def __init__(self, index, payload, filler=False):
+        self.index = index
+        self.payload = payload
+        self.sequence_number = None
+        self.hash = None
+        self.expiration = 0
+        self.attempts = 0
+        self.slot_attempts = 0  # attempts at the current sequence number
+        self.submitted_at = None
+        self.first_submitted_at = None
+        self.filler = filler
+        self.ready_at = 0.0     # perf_counter() before which a retry is held back
+
+
+class Submitter:
+    """Submits many transactions from one account with a bounded in-flight window"""
+
+    def __init__(self, client, sender, signer, window=None, ttl=None, max_gas=DEFAULT_MAX_GAS,
+                 gas_unit_price=DEFAULT_GAS_UNIT_PRICE, workers=None):
+        self.client = client
+        self.sender = sender
+        self.signer = signer
+        self.window = window or int(os.environ.get('SUBMIT_WINDOW', DEFAULT_WINDOW))
+        self.ttl = ttl or int(os.environ.get('SUBMIT_TTL', DEFAULT_TTL))
+        self.max_gas = max_gas
+        self.gas_unit_price = gas_unit_price
+        self.workers = workers or min(self.window, 16)
+        self.counters = {'submitted': 0, 'retried': 0, 'expired': 0, 'rejected': 0, 'gaps_filled': 0,
+                         'resynced': 0, 'committed': 0, 'aborted': 0}
+
+    def _read(self, request):
+        """Run a read-only node request, retrying transient failures with backoff"""
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                return request()
+            except AptosApiError as e:
+                if (e.status != 429 and e.status < 500) or attempt == MAX_ATTEMPTS:
+                    raise
+            except OSError:
+                if attempt == MAX_ATTEMPTS:
+                    raise
+            time.sleep(min(0.05 * 2 ** attempt, 1.0))
+
+    def chain_sequence_number(self):
+        account = self._read(lambda: self.client.account(self.sender))
+        if account is None:
+            raise AptosApiError(404, f"Account {self.sender} does not exist")
+        return int(account['sequence_number'])
+
+    def _build(self, tx):
+        payload = tx.payload
+        if tx.filler:
+            payload = entry_function(GAP_FILLER_FUNCTION, self.sender, 0)
+        body = {
+            'sender': self.sender,
+            'sequence_number': str(tx.sequence_number),
+            'max_gas_amount': str(self.max_gas),
+            'gas_unit_price': str(self.gas_unit_price),
+            'expiration_timestamp_secs': str(tx.expiration),
+            'payload': payload,
+        }
+        message = self.client.post('/transactions/encode_submission', body)
+        body['signature'] = {
+            'type': 'ed25519_signature',
+            'public_key': self.signer.public_key,
+            'signature': self.signer.sign(bytes.fromhex(message.removeprefix('0x'))),
+        }
+        return body
+
+    def _send(self, tx):
+        """Worker: sign and submit; returns (tx, outcome, detail)"""
+        tx.expiration = int(time.time()) + self.ttl
+        tx.attempts += 1
+        tx.slot_attempts += 1
+        try:
+            pending = self.client.post('/transactions', self._build(tx))
+            return tx, 'accepted', pending['hash']
+        except AptosApiError as e:
+            if e.status == 429 or e.status >= 500:
+                return tx, 'transient', str(e)
+            if 'SEQUENCE_NUMBER_TOO_OLD' in str(e):
+                return tx, 'too_old', str(e)
+            if e.error_code == 'invalid_transaction_update':
+                if tx.slot_attempts > 1:
+                    # An earlier attempt that looked failed actually reached the mempool
+                    return tx, 'duplicate', str(e)
+                # Nothing of ours was sent at this sequence number: another transaction holds it
+                return tx, 'slot_taken', str(e)
+            return tx, 'rejected', str(e)
+        except OSError as e:
+            return tx, 'transient', str(e)
+
+    def submit_all(self, payloads, on_result=None):
+        """Submit payloads in order; returns one result dict per payload"""
+        results = [None] * len(payloads)
+        queue = deque(Transaction(i, payload) for i, payload in enumerate(payloads))
+        refill = deque()        # transactions that must reuse their sequence number
+        in_flight = {}          # sequence number -> Transaction awaiting commit
+        sending = {}            # future -> Transaction
+        next_seq = self.chain_sequence_number()
+        last_poll = 0.0
+        self.started = time.perf_counter()
+        latencies = []
+
+        def finish(tx, status, detail=None, vm_status=None, gas_used=None):
+            if tx.filler:
+                return
+            latency = None
+            if tx.first_submitted_at is not None:
+                latency = time.perf_counter() - tx.first_submitted_at
+            results[tx.index] = {'index': tx.index, 'status': status, 'hash': tx.hash,
+                                 'sequence_number': tx.sequence_number, 'vm_status': vm_status,
+                                 'gas_used': gas_used, 'error': detail, 'attempts': tx.attempts,
+                                 'function': tx.payload.get('function'), 'latency': latency}
+            if latency is not None and status == 'committed':
+                latencies.append(latency)
+            if on_result:
+                on_result(results[tx.index])
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while queue or refill or in_flight or sending:
+                # Fill the window: repaired slots first, then new payloads at the next sequence number
+                now = time.perf_counter()
+                while len(in_flight) + len(sending) < self.window:
+                    tx = next((t for t in refill if t.ready_at <= now), None)
+                    if tx is not None:
+                        refill.remove(tx)
+                    elif not queue:
+                        break
+                    else:
+                        tx = queue.popleft()
+                        tx.sequence_number = next_seq
+                        next_seq += 1
+                    tx.submitted_at = time.perf_counter()
+                    if tx.first_submitted_at is None:
+                        tx.first_submitted_at = tx.submitted_at
+                    sending[pool.submit(self._send, tx)] = tx
+
+                # Wake up for the next completion, confirmation poll or retry that comes due
+                timeout = CONFIRM_INTERVAL
+                if refill:
+                    timeout = max(0.0, min(timeout, min(t.ready_at for t in refill) - time.perf_counter()))
+                done, _ = wait(list(sending), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    tx = sending.pop(future)
+                    _, outcome, detail = future.result()
+                    self.counters['submitted'] += 1
+                    if outcome == 'accepted':
+                        tx.hash = detail
+                        in_flight[tx.sequence_number] = tx
+                    elif outcome == 'duplicate':
+                        in_flight[tx.sequence_number] = tx
+                    elif outcome == 'transient' and tx.attempts < MAX_ATTEMPTS:
+                        self.counters['retried'] += 1
+                        tx.ready_at = time.perf_counter() + min(0.05 * 2 ** tx.attempts, 1.0)
+                        refill.append(tx)
+                    elif outcome in ('too_old', 'slot_taken'):
+                        # Someone else used this sequence number; this payload needs a new one
+                        self.counters['resynced'] += 1
+                        next_seq = max(next_seq, self.chain_sequence_number())
+                        retry = Transaction(tx.index, tx.payload)
+                        retry.attempts = tx.attempts
+                        retry.first_submitted_at = tx.first_submitted_at
+                        queue.appendleft(retry)
+                    elif tx.filler:
+                        if tx.attempts >= MAX_ATTEMPTS:
+                            raise AptosApiError(0, f"Cannot fill sequence gap {tx.sequence_number}: {detail}")
+                        refill.append(tx)
+                    else:
+                        self.counters['rejected'] += 1
+                        finish(tx, 'rejected', detail)
+                        # Keep later sequence numbers executable with a no-op in this slot
+                        filler = Transaction(tx.index, tx.payload, filler=True)
+                        filler.sequence_number = tx.sequence_number
+                        self.counters['gaps_filled'] += 1
+                        refill.append(filler)
+
+                if in_flight and time.perf_counter() - last_poll >= CONFIRM_INTERVAL:
+                    last_poll = time.perf_counter()
+                    self._confirm(in_flight, refill, finish)
+
+        self.elapsed = time.perf_counter() - self.started
+        self.latencies = sorted(latencies)
+        return results
+
+    def _confirm(self, in_flight, refill, finish):
+        """Resolve in-flight transactions below the on-chain sequence number; refill expired slots"""
+        chain_seq = self.chain_sequence_number()
+        now = time.time()
+        for seq in sorted(in_flight):
+            tx = in_flight[seq]
+            if seq < chain_seq:
+                del in_flight[seq]
+                if tx.hash is None:
+                    finish(tx, 'unconfirmed', "committed from an earlier attempt whose hash is unknown")
+                    continue
+                try:
+                    committed = self._read(lambda: self.client.transaction(tx.hash))
+                except AptosApiError as e:
+                    if e.status != 404:
+                        raise
+                    committed = None
+                if committed is None or committed.get('type') == 'pending_transaction':
+                    # The slot was consumed by a different transaction (e.g. from another process)
+                    self.counters['resynced'] += 1
+                    finish(tx, 'superseded', "sequence number used by another transaction")
+                    continue
+                status = 'committed' if committed.get('success') else 'aborted'
+                if not tx.filler:
+                    self.counters[status] += 1
+                finish(tx, status, vm_status=committed.get('vm_status'),
+                       gas_used=int(committed.get('gas_used') or 0))
+            elif now > tx.expiration + 1 or (seq == chain_seq and self._lost(tx)):
+                del in_flight[seq]
+                self.counters['expired'] += 1
+                if tx.attempts >= MAX_ATTEMPTS:
+                    self.counters['rejected'] += 1
+                    finish(tx, 'expired', f"not committed after {tx.attempts} attempts")
+                    tx = Transaction(tx.index, tx.payload, filler=True)
+                    tx.sequence_number = seq
+                    self.counters['gaps_filled'] += 1
+                refill.append(tx)
+
+    def _lost(self, tx):
+        """True when the transaction blocking the account is no longer known to the node"""
+        if tx.hash is None or time.perf_counter() - tx.submitted_at < LOST_AFTER:
+            return False
+        try:
+            self._read(lambda: self.client.transaction(tx.hash))
+            return False
+        except AptosApiError as e:
+            return e.status == 404
+
+    def report(self, results):
+        committed = self.counters['committed']
+        tps = committed / self.elapsed if self.elapsed else 0.0
+        print(f"\n📤 {len(results):,} transactions in {self.elapsed:.2f}s: {tps:,.1f} TPS committed "
+              f"(window {self.window})")
+        if self.latencies:
+            p = lambda q: self.latencies[min(len(self.latencies) - 1, int(q * len(self.latencies)))] * 1000
+            print(f"   submit-to-commit latency p50 {p(0.5):.0f} ms, p95 {p(0.95):.0f} ms, p99 {p(0.99):.0f} ms")
+        print("   " + ", ".join(f"{name} {count:,}" for name, count in self.counters.items()))
+        return tps
+
+
+def demo(count, window, seed):
+    """Submit against a stand-in node with latency, transient failures, rejections and drops"""
+    from mock_node import MockNode
+
+    class DemoSigner:
+        # The stand-in node does not verify signatures
+        public_key = '0x' + '11' * 32
+
+        def sign(self, message):
+            return '0x' + '22' * 64
+
+    contract = '0x' + 'c0' * 32
+    sender = '0x' + 'ab' * 32
+    payloads = [entry_function(f"{contract}::main::follow_trader", f"0x{i:064x}", 1_000_000, 100_000, 10)
+                for i in range(count)]
+
+    tps = {}
+    for label, size in (('sequential', 1), ('pipelined', window)):
+        with MockNode(delay=0.005, fail_rate=0.01, seed=seed, commit_latency=0.2,
+                      reject_rate=0.005, drop_rate=0.005, abort_rate=0.01) as node:
+            node.credit(sender, 10 ** 10)
+            client = AptosClient(node.url)
+            submitter = Submitter(client, sender, DemoSigner(), window=size, ttl=2)
+            n = count if size > 1 else min(count, 40)
+            print(f"\n🚚 {label}: {n:,} follow_trader transactions, window {size}")
+            results = submitter.submit_all(payloads[:n])
+            tps[label] = submitter.report(results)
+            resolved = sum(1 for r in results if r and r['status'] in ('committed', 'aborted', 'rejected', 'expired', 'superseded', 'unconfirmed'))
+            if resolved != n or node.accounts[sender]['sequence_number'] != submitter.chain_sequence_number():
+                print("❌ Some transactions were never resolved")
+                return False
+    print(f"\n⚡ Pipelining speedup: {tps['pipelined'] / tps['sequential']:.1f}x")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipelined batch transaction submitter")
+    parser.add_argument('--demo', type=int, metavar='COUNT', help="submit COUNT transactions to a stand-in node")
+    parser.add_argument('--profile', default='copy-trading-deploy')
+    parser.add_argument('--window', type=int, default=int(os.environ.get('SUBMIT_WINDOW', DEFAULT_WINDOW)))
+    parser.add_argument('--function', help="entry function, e.g. 0x...::main::deposit_funds")
+    parser.add_argument('--args-file', help="file with one comma-separated argument list per line")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    if args.demo:
+        sys.exit(0 if demo(args.demo, args.window, args.seed) else 1)
+
+    if not args.function or not args.args_file:
+        parser.error("--function and --args-file are required unless --demo is given")
+    profile = get_profile(args.profile)
+    if profile is None or not profile.private_key:
+        print(f"❌ Profile {args.profile} has no account key. Run: aptos init --profile {args.profile}")
+        sys.exit(1)
+
+    with open(args.args_file, 'r') as f:
+        payloads = [entry_function(args.function, *[a.strip() for a in line.split(',')])
+                    for line in f if line.strip()]
+    client = AptosClient.for_profile(profile)
+    submitter = Submitter(client, profile.account, Ed25519Signer(profile.private_key), window=args.window)
+    print(f"🚚 Submitting {len(payloads):,} transactions from {profile.account} via {client.rest_url}")
+    results = submitter.submit_all(payloads)
+    submitter.report(results)
+    failed = [r for r in results if r['status'] != 'committed']
+    for r in failed[:10]:
+        print(f"   ❌ #{r['index']} {r['status']}: {r['error'] or r['vm_status']}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
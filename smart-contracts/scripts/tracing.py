@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Opt-in timing and resource tracing for the OneClick Copy Trading scripts
+Records every subprocess and pipeline step and writes a Chrome trace-event file plus a summary table
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+_tracer = None
+
+
+class Tracer:
+    """Collects spans and writes them in Chrome trace-event format"""
+
+    def __init__(self, path):
+        self.path = path
+        self.origin = time.perf_counter()
+        self.started_at = time.time()
+        self.events = []
+        self._lock = threading.Lock()
+        self._threads = {}
+
+    def _tid(self):
+        ident = threading.get_ident()
+        with self._lock:
+            if ident not in self._threads:
+                self._threads[ident] = len(self._threads) + 1
+            return self._threads[ident]
+
+    def _us(self, t):
+        return int((t - self.origin) * 1_000_000)
+
+    def add(self, name, category, start, end, **details):
+        """Record a completed span; start/end are time.perf_counter() values"""
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': self._us(start),
+            'dur': max(0, self._us(end) - self._us(start)),
+            'pid': os.getpid(),
+            'tid': self._tid(),
+            'args': {k: v for k, v in details.items() if v is not None},
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def add_process(self, name, command, start, end, exit_code, usage=None):
+        """Record a finished subprocess with its rusage when available"""
+        details = {'command': command, 'exit_code': exit_code}
+        if usage is not None:
+            details.update(
+                cpu_user_s=round(usage.ru_utime, 4),
+                cpu_sys_s=round(usage.ru_stime, 4),
+                peak_rss_mb=round(_rss_mb(usage.ru_maxrss), 2),
+            )
+        self.add(name, 'process', start, end, **details)
+
+    @contextmanager
+    def span(self, name, category='step'):
+        """Trace the wall time of a block of code"""
+        start = time.perf_counter()
+        status = 'ok'
+        try:
+            yield
+        except BaseException:
+            status = 'failed'
+            raise
+        finally:
+            self.add(name, category, start, time.perf_counter(), status=status)
+
+    def summary_lines(self):
+        """Plain-text table of all recorded spans in start order"""
+        lines = [f"{'category':<10} {'name':<45} {'wall s':>8} {'cpu s':>8} {'peak RSS MB':>12} {'exit':>5}"]
+        for event in sorted(self.events, key=lambda e: e['ts']):
+            args = event['args']
+            cpu = args.get('cpu_user_s', 0) + args.get('cpu_sys_s', 0) if 'cpu_user_s' in args else None
+            rss = args.get('peak_rss_mb')
+            exit_code = args.get('exit_code', '')
+            lines.append(
+                f"{event['cat']:<10} {event['name'][:45]:<45} {event['dur'] / 1_000_000:>8.2f} "
+                f"{(f'{cpu:.2f}' if cpu is not None else '-'):>8} "
+                f"{(f'{rss:.1f}' if rss is not None else '-'):>12} {str(exit_code):>5}"
+            )
+        return lines
+
+    def write(self):
+        """Write the trace JSON and a sibling .txt summary, and print the summary"""
+        trace = {
+            'traceEvents': self.events,
+            'displayTimeUnit': 'ms',
+            'otherData': {
+                'started_at': self.started_at,
+                'host': platform.node(),
+                'platform': platform.platform(),
+                'python': platform.python_version(),
+                'argv': sys.argv,
+            },
+        }
+        with open(self.path, 'w') as f:
+            json.dump(trace, f, indent=1)
+
+        lines = self.summary_lines()
+        summary_path = os.path.splitext(self.path)[0] + '.txt'
+        with open(summary_path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+
+        print(f"\n📈 Trace summary ({len(self.events)} spans)")
+        for line in lines:
+            print(f"   {line}")
+        print(f"📄 Trace written to {self.path} (open in chrome://tracing or Perfetto), summary in {summary_path}")
+
+
+def enable(path):
+    """Turn tracing on for the rest of the process"""
+    global _tracer
+    _tracer = Tracer(path)
+    return _tracer
+
+
+def active():
+    """The current Tracer, or None when tracing is off"""
+    return _tracer
+
+
+@contextmanager
+def span(name, category='step'):
+    """Trace a block when tracing is enabled, otherwise do nothing"""
+    if _tracer is None:
+        yield
+        return
+    with _tracer.span(name, category):
+        yield
+
+
+def _rss_mb(maxrss):
+    # ru_maxrss is bytes on macOS and kilobytes everywhere else
+    if sys.platform == 'darwin':
+        return maxrss / (1024 * 1024)
+    return maxrss / 1024
+
+
+def run(command, description=None):
+    """subprocess.run(command, shell=True, capture_output=True, text=True) that records a trace span"""
+    if _tracer is None or not hasattr(os, 'wait4'):
+        start = time.perf_counter()
+        result = subprocess.run(command, shell=True, capture_output=True, text=True)
+        if _tracer is not None:
+            _tracer.add_process(description or command, command, start, time.perf_counter(), result.returncode)
+        return result
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+    # Drain both pipes so the child can't block on a full buffer
+    chunks = {'stdout': [], 'stderr': []}
+
+    def drain(name, pipe):
+        chunks[name].append(pipe.read())
+        pipe.close()
+
+    readers = [threading.Thread(target=drain, args=(n, getattr(proc, n)), daemon=True) for n in chunks]
+    for reader in readers:
+        reader.start()
+
+    # wait4 reports the rusage of this child (and the descendants it waited for)
+    # rather than the process-wide RUSAGE_CHILDREN totals, so concurrent steps
+    # don't get each other's CPU time.
+    _, status, usage = os.wait4(proc.pid, 0)
+    end = time.perf_counter()
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    for reader in readers:
+        reader.join()
+
+    _tracer.add_process(description or command, command, start, end, proc.returncode, usage)
+    return subprocess.CompletedProcess(command, proc.returncode, ''.join(chunks['stdout']), ''.join(chunks['stderr']))
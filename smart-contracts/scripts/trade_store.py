@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Append-only columnar trade-history store for OneClick Copy Trading analytics
+Holds trader_registry::TradeRecord rows off-chain, one NumPy memmap file per field, with
+per-trader and per-symbol offset indexes so range scans only touch the rows they return
+
+Layout of a store directory:
+
+    meta.json             row count, indexed row count, index generation, dictionary sizes
+    traders.txt           trader addresses, line n is trader id n
+    symbols.txt           symbols, line n is symbol id n
+    <field>.col           raw little-endian column values, one file per FIELDS entry
+    by_<key>.<g>.rows     row numbers grouped by key, ascending within a key
+    by_<key>.<g>.offsets  rows of key k are by_<key>.<g>.rows[offsets[k]:offsets[k + 1]]
+
+Every index rebuild writes a new generation <g> next to the old one and only then commits meta.json,
+so a crash mid-rebuild leaves meta.json describing the previous, still intact generation.
+
+Rows past the indexed count (the tail) are found by a chunked scan; the indexes are rebuilt
+once the tail outgrows INDEX_TAIL_RATIO of the indexed rows, so appends stay amortized O(1).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ NumPy not found. Please install it first: pip install numpy")
+    sys.exit(1)
+
+# TradeRecord fields plus the owning trader; pnl is a u64 exactly as on chain
+FIELDS = {
+    'trader': np.dtype('<u4'),
+    'symbol': np.dtype('<u2'),
+    'amount': np.dtype('<u8'),
+    'entry_price': np.dtype('<u8'),
+    'exit_price': np.dtype('<u8'),
+    'pnl': np.dtype('<u8'),
+    'is_long': np.dtype('u1'),
+    'duration': np.dtype('<u8'),
+    'timestamp': np.dtype('<u8'),
+}
+INDEXED_KEYS = ('trader', 'symbol')
+INDEX_TAIL_RATIO = 0.25
+MIN_INDEX_ROWS = 1 << 20
+SCAN_CHUNK = 1 << 22
+FORMAT_VERSION = 1
+
+
+class TradeStore:
+    """Columnar trade history on disk; open with mode 'r' to read or 'a' to append"""
+
+    def __init__(self, path, mode='r'):
+        self.path = Path(path)
+        self.writable = mode == 'a'
+        if self.writable:
+            self.path.mkdir(parents=True, exist_ok=True)
+        elif not (self.path / 'meta.json').exists():
+            raise FileNotFoundError(f"No trade store at {self.path}")
+
+        self.meta = self._read_meta()
+        self.traders = self._read_dictionary('traders.txt', self.meta['traders'])
+        self.symbols = self._read_dictionary('symbols.txt', self.meta['symbols'])
+        self.trader_ids = {address: i for i, address in enumerate(self.traders)}
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+        if self.writable:
+            self._discard_uncommitted()
+        self._columns = {}
+        self._indexes = {}
+
+    def __len__(self):
+        return self.meta['count']
+
+    # Metadata and dictionaries are the commit point: anything written past them is ignored
+
+    def _read_meta(self):
+        try:
+            with open(self.path / 'meta.json', 'r') as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            meta = {'version': FORMAT_VERSION, 'count': 0, 'indexed': 0, 'traders': 0, 'symbols': 0,
+                    'time_sorted': True, 'last_timestamp': 0, 'row_dtype': '<u4',
+                    'index_generation': 0}
+        if meta['version'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported trade store version {meta['version']}")
+        return meta
+
+    def _write_meta(self):
+        tmp_path = self.path / 'meta.json.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.meta, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path / 'meta.json')
+
+    def _read_dictionary(self, name, size):
+        try:
+            with open(self.path / name, 'r') as f:
+                return f.read().splitlines()[:size]
+        except FileNotFoundError:
+            return []
+
+    def _discard_uncommitted(self):
+        """Drop bytes and dictionary entries a crashed append left behind"""
+        for name, dtype in FIELDS.items():
+            column = self.path / f"{name}.col"
+            if column.exists() and column.stat().st_size != self.meta['count'] * dtype.itemsize:
+                os.truncate(column, self.meta['count'] * dtype.itemsize)
+        self._remove_stale_indexes()
+        for name, entries in (('traders.txt', self.traders), ('symbols.txt', self.symbols)):
+            with open(self.path / name, 'w') as f:
+                f.writelines(f"{entry}\n" for entry in entries)
+
+    def _index_path(self, key, kind, generation=None):
+        generation = self.meta.get('index_generation', 0) if generation is None else generation
+        # Stores written before generations existed keep unsuffixed index files as generation 0
+        return self.path / (f"by_{key}.{kind}" if generation == 0 else f"by_{key}.{generation}.{kind}")
+
+    def _remove_stale_indexes(self):
+        """Delete index files of every generation but the committed one"""
+        current = {self._index_path(key, kind) for key in INDEXED_KEYS for kind in ('rows', 'offsets')}
+        for path in self.path.glob('by_*'):
+            if path not in current:
+                path.unlink()
+
+    # Reading
+
+    def column(self, name):
+        """Read-only memmap over the committed rows of one field"""
+        count = self.meta['count']
+        cached = self._columns.get(name)
+        if cached is None or len(cached) != count:
+            if count == 0:
+                cached = np.zeros(0, dtype=FIELDS[name])
+            else:
+                cached = np.memmap(self.path / f"{name}.col", dtype=FIELDS[name], mode='r', shape=(count,))
+            self._columns[name] = cached
+        return cached
+
+    def _index(self, key):
+        indexed = self.meta['indexed']
+        cached = self._indexes.get(key)
+        if cached is None or cached[0] != indexed:
+            if indexed == 0:
+                cached = (0, np.zeros(0, dtype=self.meta['row_dtype']), np.zeros(1, dtype=np.uint64))
+            else:
+                rows = np.memmap(self._index_path(key, 'rows'), dtype=self.meta['row_dtype'], mode='r',
+                                 shape=(indexed,))
+                offsets = np.fromfile(self._index_path(key, 'offsets'), dtype='<u8')
+                cached = (indexed, rows, offsets)
+            self._indexes[key] = cached
+        return cached
+
+    def _bisect(self, rows, lo, hi, timestamp):
+        """First position in rows[lo:hi] whose trade is at or after timestamp (rows in time order)"""
+        timestamps = self.column('timestamp')
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if timestamps[rows[mid]] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _rows_for(self, key, key_id, start=None, end=None):
+        """Row numbers (ascending) holding key_id: an index slice plus matches in the tail"""
+        indexed, rows, offsets = self._index(key)
+        parts = []
+        if key_id + 1 < len(offsets):
+            lo, hi = int(offsets[key_id]), int(offsets[key_id + 1])
+            # Rows are ascending, so when appends were in time order a window is a sub-slice
+            if self.meta['time_sorted']:
+                if start is not None:
+                    lo = self._bisect(rows, lo, hi, start)
+                if end is not None:
+                    hi = self._bisect(rows, lo, hi, end)
+                parts.append(np.asarray(rows[lo:hi], dtype=np.int64))
+            else:
+                parts.append(self._time_filter(np.asarray(rows[lo:hi], dtype=np.int64), start, end))
+        column = self.column(key)
+        for offset in range(indexed, len(column), SCAN_CHUNK):
+            chunk = column[offset:offset + SCAN_CHUNK]
+            parts.append(self._time_filter(np.flatnonzero(chunk == key_id) + offset, start, end))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def _time_filter(self, rows, start, end):
+        if start is None and end is None:
+            return rows
+        timestamps = self.column('timestamp')[rows]
+        mask = np.ones(len(rows), dtype=bool)
+        if start is not None:
+            mask &= timestamps >= start
+        if end is not None:
+            mask &= timestamps < end
+        return rows[mask]
+
+    def gather(self, rows, fields=None):
+        """Selected fields for the given rows as a dict of arrays"""
+        return {name: np.asarray(self.column(name)[rows]) for name in (fields or FIELDS)}
+
+    def trader_rows(self, trader, start=None, end=None):
+        """Rows of a trader's trades with start <= timestamp < end"""
+        trader_id = self.trader_ids.get(trader)
+        if trader_id is None:
+            return np.zeros(0, dtype=np.int64)
+        return self._rows_for('trader', trader_id, start, end)
+
+    def symbol_rows(self, symbol, start=None, end=None):
+        """Rows of every trade in a symbol with start <= timestamp < end"""
+        symbol_id = self.symbol_ids.get(symbol)
+        if symbol_id is None:
+            return np.zeros(0, dtype=np.int64)
+        return self._rows_for('symbol', symbol_id, start, end)
+
+    def window_rows(self, start=None, end=None):
+        """Rows of every trade with start <= timestamp < end"""
+        timestamps = self.column('timestamp')
+        if self.meta['time_sorted']:
+            lo = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+            hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side='left'))
+            return np.arange(lo, max(lo, hi), dtype=np.int64)
+        parts = []
+        for offset in range(0, len(timestamps), SCAN_CHUNK):
+            chunk = timestamps[offset:offset + SCAN_CHUNK]
+            mask = np.ones(len(chunk), dtype=bool)
+            if start is not None:
+                mask &= chunk >= start
+            if end is not None:
+                mask &= chunk < end
+            parts.append(np.flatnonzero(mask) + offset)
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def trader_trades(self, trader, start=None, end=None, fields=None):
+        return self.gather(self.trader_rows(trader, start, end), fields)
+
+    def symbol_trades(self, symbol, start=None, end=None, fields=None):
+        return self.gather(self.symbol_rows(symbol, start, end), fields)
+
+    # Appending
+
+    def _intern(self, values, ids, entries, limit):
+        """Map addresses/symbols to dense ids, registering new ones"""
+        out = np.empty(len(values), dtype=np.int64)
+        for i, value in enumerate(values):
+            key = ids.get(value)
+            if key is None:
+                key = ids[value] = len(entries)
+                if key >= limit:
+                    raise OverflowError(f"Too many distinct values (limit {limit})")
+                entries.append(value)
+            out[i] = key
+        return out
+
+    def append(self, trader, symbol, amount, entry_price, exit_price, pnl, is_long, duration, timestamp):
+        """Append a batch of TradeRecords; trader/symbol are addresses and symbol strings (or ids)"""
+        if not self.writable:
+            raise PermissionError("Trade store opened read-only")
+
+        columns = {
+            'amount': amount, 'entry_price': entry_price, 'exit_price': exit_price, 'pnl': pnl,
+            'is_long': is_long, 'duration': duration, 'timestamp': timestamp,
+        }
+        columns['trader'] = self._key_column(trader, self.trader_ids, self.traders, 'trader')
+        columns['symbol'] = self._key_column(symbol, self.symbol_ids, self.symbols, 'symbol')
+        n = len(columns['timestamp'])
+        for name, dtype in FIELDS.items():
+            values = np.asarray(columns[name])
+            if len(values) != n:
+                raise ValueError(f"Column {name} has {len(values)} values, expected {n}")
+            if values.dtype.kind in 'iu' and len(values) and (values.min() < 0 or values.max() > np.iinfo(dtype).max):
+                raise OverflowError(f"Column {name} does not fit {dtype}")
+            columns[name] = values.astype(dtype, copy=False)
+        if n == 0:
+            return 0
+
+        for name in FIELDS:
+            with open(self.path / f"{name}.col", 'ab') as f:
+                columns[name].tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+        self._write_dictionary('traders.txt', self.traders, self.meta['traders'])
+        self._write_dictionary('symbols.txt', self.symbols, self.meta['symbols'])
+
+        timestamps = columns['timestamp']
+        self.meta['time_sorted'] = bool(
+            self.meta['time_sorted'] and timestamps[0] >= self.meta['last_timestamp']
+            and (n == 1 or bool(np.all(timestamps[1:] >= timestamps[:-1]))))
+        self.meta['last_timestamp'] = max(int(self.meta['last_timestamp']), int(timestamps.max()))
+        self.meta['count'] += n
+        self.meta['traders'] = len(self.traders)
+        self.meta['symbols'] = len(self.symbols)
+        self._write_meta()
+
+        tail = self.meta['count'] - self.meta['indexed']
+        if tail >= max(MIN_INDEX_ROWS, INDEX_TAIL_RATIO * self.meta['indexed']):
+            self.build_indexes()
+        return n
+
+    def register(self, traders=(), symbols=()):
+        """Assign ids up front so later batches can pass integer trader/symbol columns"""
+        trader_ids = self._key_column(list(traders), self.trader_ids, self.traders, 'trader')
+        symbol_ids = self._key_column(list(symbols), self.symbol_ids, self.symbols, 'symbol')
+        return trader_ids, symbol_ids
+
+    def _key_column(self, values, ids, entries, name):
+        values = np.asarray(values)
+        limit = np.iinfo(FIELDS[name]).max + 1
+        if len(values) and values.dtype.kind in 'iu':
+            if len(values) and values.max() >= len(entries):
+                raise ValueError(f"Unknown {name} id {values.max()}")
+            return values
+        return self._intern(values.tolist(), ids, entries, limit)
+
+    def _write_dictionary(self, name, entries, committed):
+        if len(entries) > committed:
+            with open(self.path / name, 'a') as f:
+                f.writelines(f"{entry}\n" for entry in entries[committed:])
+
+    def build_indexes(self):
+        """Rebuild the per-trader and per-symbol offset indexes over every committed row"""
+        count = self.meta['count']
+        row_dtype = np.dtype('<u4') if count < (1 << 32) else np.dtype('<u8')
+        generation = self.meta.get('index_generation', 0) + 1
+        for key in INDEXED_KEYS:
+            keys = np.asarray(self.column(key))
+            order = np.argsort(keys, kind='stable').astype(row_dtype)
+            sizes = len(self.traders) if key == 'trader' else len(self.symbols)
+            offsets = np.zeros(sizes + 1, dtype='<u8')
+            np.cumsum(np.bincount(keys, minlength=sizes), out=offsets[1:])
+            for kind, values in (('rows', order), ('offsets', offsets)):
+                with open(self._index_path(key, kind, generation), 'wb') as f:
+                    values.tofile(f)
+                    f.flush()
+                    os.fsync(f.fileno())
+            del order
+        self.meta['indexed'] = count
+        self.meta['row_dtype'] = row_dtype.str
+        self.meta['index_generation'] = generation
+        self._write_meta()
+        self._indexes.clear()
+        self._remove_stale_indexes()
+
+
+def random_history(rows, traders, symbols, seed=0, start_time=1_700_000_000, chunk=1_000_000):
+    """Yield synthetic append() batches in timestamp order"""
+    rng = np.random.default_rng(seed)
+    hot_traders = max(1, traders // 1000)
+    produced = 0
+    while produced < rows:
+        n = min(chunk, rows - produced)
+        entry = rng.integers(1_000, 100_000, size=n, dtype=np.uint64)
+        exit_price = entry + rng.integers(0, 2_000, size=n, dtype=np.uint64) - 1_000
+        is_long = rng.integers(0, 2, size=n, dtype=np.uint8)
+        amount = rng.integers(1, 1_000_000, size=n, dtype=np.uint64)
+        gain = np.where(is_long == 1, exit_price > entry, exit_price < entry)
+        diff = np.where(exit_price > entry, exit_price - entry, entry - exit_price)
+        yield {
+            # a fifth of the volume comes from the 0.1% most active traders
+            'trader': np.where(rng.random(n) < 0.2, rng.integers(0, hot_traders, size=n),
+                               rng.integers(0, traders, size=n)),
+            'symbol': rng.integers(0, symbols, size=n),
+            'amount': amount,
+            'entry_price': entry,
+            'exit_price': exit_price,
+            'pnl': np.where(gain, diff * amount // entry, 0).astype(np.uint64),
+            'is_long': is_long,
+            'duration': rng.integers(60, 86_400, size=n, dtype=np.uint64),
+            'timestamp': start_time + produced + np.arange(n, dtype=np.uint64),
+        }
+        produced += n
+
+
+def benchmark(path, rows, traders, symbols, seed):
+    store = TradeStore(path, mode='a')
+    if len(store) < rows:
+        print(f"📝 Writing {rows - len(store):,} synthetic trade records to {path}...")
+        store.register(traders=[f"0x{i:064x}" for i in range(traders)],
+                       symbols=[f"SYM{i}" for i in range(symbols)])
+        started = time.perf_counter()
+        for batch in random_history(rows - len(store), traders, symbols, seed,
+                                    start_time=1_700_000_000 + len(store)):
+            store.append(**batch)
+        store.build_indexes()
+        elapsed = time.perf_counter() - started
+        print(f"   {rows:,} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+    store = TradeStore(path)
+    size_mb = sum(f.stat().st_size for f in Path(path).iterdir()) / 1e6
+    print(f"\n📊 Range scans over {len(store):,} records ({size_mb:,.0f} MB on disk)")
+    start_time = 1_700_000_000
+    span = len(store)
+    busiest = store.traders[int(np.argmax(np.diff(store._index('trader')[2])))]
+    scans = [
+        ("busiest trader, all time", lambda: store.trader_trades(busiest)),
+        ("busiest trader, last 10%", lambda: store.trader_trades(busiest, start_time + span * 9 // 10)),
+        ("one trader, middle 50%", lambda: store.trader_trades(store.traders[len(store.traders) // 2],
+                                                                start_time + span // 4, start_time + span * 3 // 4)),
+        ("symbol, last 1%", lambda: store.symbol_trades(store.symbols[0], start_time + span * 99 // 100)),
+        ("all trades, 1% window", lambda: store.gather(
+            store.window_rows(start_time + span // 2, start_time + span // 2 + span // 100))),
+    ]
+    for label, scan in scans:
+        started = time.perf_counter()
+        result = scan()
+        elapsed = time.perf_counter() - started
+        print(f"   {label:<28} {len(result['timestamp']):>11,} rows  {elapsed * 1000:>8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar off-chain trade history store")
+    parser.add_argument('--path', default=os.environ.get('TRADE_STORE_DIR', str(Path('.indexer') / 'trades')))
+    parser.add_argument('--benchmark', type=int, metavar='ROWS',
+                        help="fill the store with ROWS synthetic records (if needed) and time range scans")
+    parser.add_argument('--traders', type=int, default=100_000)
+    parser.add_argument('--symbols', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--trader', help="print a trader's trades")
+    parser.add_argument('--start', type=int, help="window start (unix seconds, inclusive)")
+    parser.add_argument('--end', type=int, help="window end (unix seconds, exclusive)")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.path, args.benchmark, args.traders, args.symbols, args.seed)
+        return
+
+    store = TradeStore(args.path)
+    print(f"🗄️  {len(store):,} trade records, {len(store.traders):,} traders, {len(store.symbols):,} symbols")
+    if args.trader:
+        trades = store.trader_trades(args.trader, args.start, args.end)
+        for i in range(len(trades['timestamp'])):
+            print("   " + "  ".join(f"{name}={trades[name][i]}" for name in FIELDS if name != 'trader'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Incremental trader performance statistics for trader_registry::update_trader_performance
+Maintains total/winning/losing trades, max drawdown, average return and risk score per trader
+with constant work per closed trade, and batches only the traders whose values changed
+
+Every value is an integer computed the way the contracts would compute it:
+
+    pnl          user_vault::close_position: (exit - entry) * amount / entry for a winning long,
+                 (entry - exit) * amount / entry for a winning short, u64 (aborts on overflow);
+                 an unfavourable or flat close is pnl 0 with no arithmetic, so it never aborts
+    win / loss   a trade wins when that pnl is > 0 and loses when the mirrored loss is > 0
+    return       per-trade return in basis points: |exit - entry| * 10000 / entry, signed; a loss
+                 is capped at the whole position (-10000), which also covers entry_price 0
+    max_drawdown largest fall of the cumulative return (bps) from its running peak, peak >= 0
+    average_ret  sum of returns / total_trades, floored and clamped at 0 (the field is u64)
+    risk_score   1 + max_drawdown / 500 (one point per 5% drawdown), capped at 10
+    win_rate     (winning_trades * 10000) / total_trades, as update_trader_performance stores it
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+U64_MAX = (1 << 64) - 1
+BPS = 10000
+DRAWDOWN_PER_RISK_POINT = 500
+BATCH_FILE = Path('build') / 'trader-performance-batch.json'
+
+
+def trade_outcome(amount, entry_price, exit_price, is_long):
+    """(pnl, loss, return_bps) for one closed trade, with u64 semantics
+
+    Only a winning close does arithmetic on chain, so only it can abort: OverflowError for the
+    u64 intermediate, ZeroDivisionError for an entry_price of 0.
+    """
+    if exit_price == entry_price:
+        return 0, 0, 0
+    favourable = exit_price > entry_price if is_long else entry_price > exit_price
+    move = exit_price - entry_price if exit_price > entry_price else entry_price - exit_price
+    if favourable:
+        if entry_price == 0:
+            raise ZeroDivisionError("entry_price must be positive")
+        product = move * amount
+        if product > U64_MAX:
+            raise OverflowError("pnl intermediate does not fit in u64")
+        return product // entry_price, 0, move * BPS // entry_price
+    if move >= entry_price:
+        return 0, amount, -BPS
+    return 0, move * amount // entry_price, -(move * BPS // entry_price)
+
+
+# (amount, entry_price, exit_price, is_long) -> trade_outcome(), or the error of a close that aborts on chain
+EDGE_CASES = [
+    ((2**40, 2**30, 1, True), (0, 2**40 - 2**10, -(BPS - 1))),     # losing long, huge intermediate
+    ((2**40, 1, 2**30, False), (0, 2**40, -BPS)),                  # losing short past a 100% loss
+    ((5, 0, 0, True), (0, 0, 0)),                                  # flat at entry_price 0
+    ((5, 0, 7, False), (0, 5, -BPS)),                              # losing short from entry_price 0
+    ((10, 100, 100, False), (0, 0, 0)),                            # flat
+    ((10, 100, 150, True), (5, 0, 5000)),                          # winning long
+    ((5, 0, 7, True), ZeroDivisionError),                          # winning long from entry_price 0
+    ((2**40, 1, 2**30, True), OverflowError),                      # winning long, intermediate past u64
+]
+
+
+def edge_case_check():
+    """trade_outcome() on extreme prices: the closes that succeed on chain, and those that abort"""
+    failures = 0
+    for args, expected in EDGE_CASES:
+        try:
+            outcome = trade_outcome(*args)
+        except ArithmeticError as e:
+            outcome = e
+        if (type(outcome) is not expected) if isinstance(expected, type) else outcome != expected:
+            failures += 1
+            print(f"❌ trade_outcome{args} = {outcome!r}, expected {expected}")
+    return failures == 0
+
+
+class TraderStats:
+    """Running statistics for one trader; add() is O(1)"""
+
+    __slots__ = ('total', 'winning', 'losing', 'return_sum', 'cumulative', 'peak', 'max_drawdown')
+
+    def __init__(self):
+        self.total = 0
+        self.winning = 0
+        self.losing = 0
+        self.return_sum = 0
+        self.cumulative = 0
+        self.peak = 0
+        self.max_drawdown = 0
+
+    def add(self, pnl, loss, return_bps):
+        self.total += 1
+        if pnl > 0:
+            self.winning += 1
+        elif loss > 0:
+            self.losing += 1
+        self.return_sum += return_bps
+        self.cumulative += return_bps
+        if self.cumulative > self.peak:
+            self.peak = self.cumulative
+        elif self.peak - self.cumulative > self.max_drawdown:
+            self.max_drawdown = self.peak - self.cumulative
+
+    @property
+    def average_return(self):
+        return max(0, self.return_sum // self.total) if self.total else 0
+
+    @property
+    def risk_score(self):
+        return min(10, 1 + self.max_drawdown // DRAWDOWN_PER_RISK_POINT)
+
+    @property
+    def win_rate(self):
+        return self.winning * BPS // self.total if self.total else 0
+
+    def arguments(self):
+        """update_trader_performance arguments after trader_address"""
+        return (self.total, self.winning, self.losing, min(self.max_drawdown, U64_MAX),
+                min(self.average_return, U64_MAX), self.risk_score)
+
+    def to_json(self):
+        return [getattr(self, name) for name in self.__slots__]
+
+    @classmethod
+    def from_json(cls, values):
+        stats = cls()
+        for name, value in zip(cls.__slots__, values):
+            setattr(stats, name, value)
+        return stats
+
+
+class StatsEngine:
+    """Per-trader TraderStats plus the bookkeeping to submit only what changed"""
+
+    def __init__(self):
+        self.traders = {}
+        self.dirty = set()
+        self.submitted = {}
+        self.store_cursor = 0
+
+    def _apply(self, trader, outcome):
+        stats = self.traders.get(trader)
+        if stats is None:
+            stats = self.traders[trader] = TraderStats()
+        stats.add(*outcome)
+        self.dirty.add(trader)
+
+    def add_trade(self, trader, amount, entry_price, exit_price, is_long):
+        self._apply(trader, trade_outcome(amount, entry_price, exit_price, is_long))
+
+    def add_trades(self, traders, amounts, entry_prices, exit_prices, is_long):
+        """Apply a batch of closed trades in order; if any of them raises, none is applied"""
+        outcomes = [trade_outcome(*trade) for trade in zip(amounts, entry_prices, exit_prices, is_long)]
+        for trader, outcome in zip(traders, outcomes):
+            self._apply(trader, outcome)
+
+    def sync(self, store, chunk=1_000_000):
+        """Apply trade_store rows appended since the last sync
+
+        A chunk is applied and the cursor advanced together, so a row that raises leaves both
+        where they were instead of counting the rows before it again on the next sync.
+        """
+        traders = store.traders
+        while self.store_cursor < len(store):
+            rows = range(self.store_cursor, min(len(store), self.store_cursor + chunk))
+            columns = store.gather(slice(rows.start, rows.stop),
+                                   ['trader', 'amount', 'entry_price', 'exit_price', 'is_long'])
+            self.add_trades([traders[i] for i in columns['trader'].tolist()], columns['amount'].tolist(),
+                            columns['entry_price'].tolist(), columns['exit_price'].tolist(),
+                            columns['is_long'].tolist())
+            self.store_cursor = rows.stop
+
+    def pending(self):
+        """(trader, arguments) for every trader whose on-chain values would change"""
+        changes = []
+        for trader in sorted(self.dirty):
+            arguments = self.traders[trader].arguments()
+            if self.submitted.get(trader) != arguments:
+                changes.append((trader, arguments))
+        return changes
+
+    def flush(self):
+        """Pending changes, marked as submitted"""
+        changes = self.pending()
+        for trader, arguments in changes:
+            self.submitted[trader] = arguments
+        self.dirty.clear()
+        return changes
+
+    def save(self, path):
+        state = {
+            'store_cursor': self.store_cursor,
+            'traders': {trader: stats.to_json() for trader, stats in self.traders.items()},
+            'submitted': {trader: list(arguments) for trader, arguments in self.submitted.items()},
+            'dirty': sorted(self.dirty),
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        engine = cls()
+        try:
+            with open(path, 'r') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return engine
+        engine.store_cursor = state['store_cursor']
+        engine.traders = {trader: TraderStats.from_json(values) for trader, values in state['traders'].items()}
+        engine.submitted = {trader: tuple(arguments) for trader, arguments in state['submitted'].items()}
+        engine.dirty = set(state['dirty'])
+        return engine
+
+
+def write_batch(changes, contract_address, path=BATCH_FILE):
+    """Write a submission batch for an admin entry function that forwards each row
+
+    update_trader_performance is a public (non-entry) function, so it cannot be called by a
+    transaction directly; the batch lists one argument row per changed trader.
+    """
+    batch = {
+        'function': f"{contract_address}::trader_registry::update_trader_performance",
+        'arguments': ['trader_address', 'total_trades', 'winning_trades', 'losing_trades',
+                      'max_drawdown', 'average_return', 'risk_score'],
+        'rows': [[trader, *[str(value) for value in arguments]] for trader, arguments in changes],
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(batch, f, indent=2)
+    return path
+
+
+def recompute(trades):
+    """Reference: statistics for every trader from the full history, as the batch job did"""
+    by_trader = {}
+    for trader, amount, entry_price, exit_price, is_long in trades:
+        by_trader.setdefault(trader, []).append(trade_outcome(amount, entry_price, exit_price, is_long))
+
+    result = {}
+    for trader, outcomes in by_trader.items():
+        total = len(outcomes)
+        winning = sum(1 for pnl, _, _ in outcomes if pnl > 0)
+        losing = sum(1 for pnl, loss, _ in outcomes if pnl == 0 and loss > 0)
+        cumulative = peak = max_drawdown = 0
+        for _, _, return_bps in outcomes:
+            cumulative += return_bps
+            peak = max(peak, cumulative)
+            max_drawdown = max(max_drawdown, peak - cumulative)
+        average_return = max(0, sum(r for _, _, r in outcomes) // total)
+        risk_score = min(10, 1 + max_drawdown // DRAWDOWN_PER_RISK_POINT)
+        result[trader] = (total, winning, losing, max_drawdown, average_return, risk_score)
+    return result
+
+
+def random_trades(count, traders, rng):
+    trades = []
+    for _ in range(count):
+        entry = rng.randint(1_000, 100_000)
+        exit_price = max(1, entry + rng.randint(-entry // 10, entry // 10))
+        trades.append((f"0x{rng.randrange(traders):x}", rng.randint(1, 10**9), entry, exit_price,
+                       rng.random() < 0.6))
+    return trades
+
+
+def benchmark(traders, history, batches, batch_size, seed):
+    """Incremental updates versus recomputing every trader from the full history, per batch"""
+    if not edge_case_check():
+        return False
+    print(f"✅ trade_outcome handles all {len(EDGE_CASES)} edge cases")
+    rng = random.Random(seed)
+    trades = random_trades(history, traders, rng)
+
+    engine = StatsEngine()
+    started = time.perf_counter()
+    for trade in trades:
+        engine.add_trade(*trade)
+    engine.flush()
+    print(f"📚 Loaded {history:,} historical trades for {traders:,} traders in "
+          f"{time.perf_counter() - started:.2f}s")
+
+    incremental_times, full_times, submitted = [], [], 0
+    for _ in range(batches):
+        batch = random_trades(batch_size, traders, rng)
+        trades.extend(batch)
+
+        started = time.perf_counter()
+        for trade in batch:
+            engine.add_trade(*trade)
+        changes = engine.flush()
+        incremental_times.append(time.perf_counter() - started)
+        submitted += len(changes)
+
+        started = time.perf_counter()
+        full = recompute(trades)
+        full_times.append(time.perf_counter() - started)
+
+    mismatched = [t for t, stats in engine.traders.items() if stats.arguments() != full[t]]
+    incremental, full_time = sum(incremental_times) / batches, sum(full_times) / batches
+    print(f"⚡ Per batch of {batch_size:,} trades: incremental {incremental * 1000:.2f} ms, "
+          f"full recompute {full_time * 1000:.0f} ms ({full_time / incremental:,.0f}x)")
+    print(f"   {incremental / batch_size * 1e6:.2f} µs per trade; "
+          f"{submitted / batches:,.0f} of {traders:,} traders submitted per batch")
+    if mismatched:
+        print(f"❌ {len(mismatched)} traders differ from the full recomputation")
+        return False
+    print(f"✅ Incremental statistics match the full recomputation for all {len(engine.traders):,} traders")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental trader performance statistics")
+    parser.add_argument('--store', help="trade_store directory to read closed trades from")
+    parser.add_argument('--state', default=str(Path('.indexer') / 'trader-stats.json'))
+    parser.add_argument('--contract', help="contract address for the submission batch")
+    parser.add_argument('--benchmark', action='store_true')
+    parser.add_argument('--traders', type=int, default=10_000)
+    parser.add_argument('--history', type=int, default=1_000_000)
+    parser.add_argument('--batches', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=1_000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        sys.exit(0 if benchmark(args.traders, args.history, args.batches, args.batch_size, args.seed) else 1)
+
+    if not args.store:
+        parser.error("--store is required unless --benchmark is given")
+    from trade_store import TradeStore
+
+    engine = StatsEngine.load(args.state)
+    before = engine.store_cursor
+    engine.sync(TradeStore(args.store))
+    changes = engine.pending()
+    print(f"📈 Applied {engine.store_cursor - before:,} new trades; {len(changes):,} traders changed")
+    if changes:
+        network = os.environ.get('APTOS_NETWORK', 'testnet')
+        contract = args.contract or os.environ.get(f"COPY_TRADING_CONTRACT_ADDRESS_{network.upper()}", '@copy_trading')
+        path = write_batch(changes, contract)
+        engine.flush()
+        print(f"📝 Wrote submission batch to {path}")
+    engine.save(args.state)
+
+
+if __name__ == "__main__":
+    main()
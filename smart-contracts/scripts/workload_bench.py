@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Synthetic workload benchmark for the OneClick Copy Trading contracts
+Drives N traders with M followers each and K copy trades per second through the real entry
+functions against a local stand-in node, and reports throughput and latency percentiles per
+entry function as JSON that can be compared between commits
+
+    onboard   trader_registry::register_trader, main::register_trader per trader, committed first;
+              then user_vault::initialize_vault, risk_manager::create_risk_profile,
+              main::create_user_vault, main::deposit_funds, main::follow_trader per follower
+    trade     main::execute_copy_trade at K per second spread over the traders,
+              user_vault::deposit top-ups from a rotating tenth of the followers
+    offboard  main::unfollow_trader, main::withdraw_funds per follower
+
+The stand-in node runs no Move code: its gas figure is a synthetic function of the payload, reported
+as synthetic_gas_* for reference only and never compared. Gas regressions from contract changes
+need `aptos move simulate` or a local testnet.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from aptos_client import AptosClient, OCTAS_PER_APT
+from submitter import Submitter, entry_function
+
+RESULTS_DIR = Path('build') / 'bench'
+DEFAULT_CONTRACT = '0x' + 'c0' * 32
+SYMBOLS = ['APT/USDC', 'BTC/USDC', 'ETH/USDC', 'SOL/USDC', 'USDT/USDC']
+ACCOUNT_WORKERS = int(os.environ.get('BENCH_ACCOUNT_WORKERS', 16))
+# Metrics compared by --compare, and whether a higher value is better
+COMPARED = {'tps': True, 'latency_p95_ms': False}
+
+
+class StandInSigner:
+    """The stand-in node does not verify signatures"""
+
+    public_key = '0x' + '11' * 32
+
+    def sign(self, message):
+        return '0x' + '22' * 64
+
+
+class Workload:
+    """Payloads per sender for each phase, deterministic for a given seed"""
+
+    def __init__(self, contract, traders, followers, tps, duration, seed):
+        self.contract = contract
+        self.traders = [f"0x{1:02x}{i:062x}" for i in range(traders)]
+        self.followers = {trader: [f"0x{2:02x}{t:031x}{f:031x}" for f in range(followers)]
+                          for t, trader in enumerate(self.traders)}
+        self.tps = tps
+        self.duration = duration
+        self.rng = random.Random(seed)
+
+    def call(self, function, *arguments):
+        return entry_function(f"{self.contract}::{function}", *arguments)
+
+    def onboarding(self):
+        """Two steps: traders register, then (once those commit) followers follow them"""
+        registrations, batches = {}, {}
+        for i, trader in enumerate(self.traders):
+            fee = self.rng.randint(0, 20)
+            registrations[trader] = [
+                self.call('trader_registry::register_trader', f"trader-{i}".encode().hex(),
+                          'synthetic benchmark trader'.encode().hex(), 'momentum'.encode().hex(), fee),
+                self.call('main::register_trader', fee),
+            ]
+            for follower in self.followers[trader]:
+                deposit = self.rng.randint(1, 100) * OCTAS_PER_APT
+                batches[follower] = [
+                    self.call('user_vault::initialize_vault', deposit, deposit // 10, deposit // 4,
+                              self.rng.randint(1, 10)),
+                    self.call('risk_manager::create_risk_profile', self.rng.randint(1, 10), deposit // 10,
+                              deposit // 4, self.rng.randint(1, 20), self.rng.randint(1, 50),
+                              self.rng.randint(1, 100)),
+                    self.call('main::create_user_vault', deposit),
+                    self.call('main::deposit_funds', deposit // 2),
+                    self.call('main::follow_trader', trader, deposit // 2, deposit // 4,
+                              self.rng.randint(1, 50)),
+                ]
+        return [registrations, batches]
+
+    def trades(self, tick):
+        """One second of load: K copy trades plus follower top-ups"""
+        batches = {}
+        for n in range(self.tps):
+            trader = self.traders[(tick * self.tps + n) % len(self.traders)]
+            batches.setdefault(trader, []).append(
+                self.call('main::execute_copy_trade', self.rng.choice(SYMBOLS).encode().hex(),
+                          self.rng.randint(1, 1000) * OCTAS_PER_APT // 100, self.rng.random() < 0.5))
+        followers = [f for group in self.followers.values() for f in group]
+        for follower in followers[tick % 10::10]:
+            batches[follower] = [self.call('user_vault::deposit', self.rng.randint(1, 10) * OCTAS_PER_APT)]
+        return batches
+
+    def offboarding(self):
+        batches = {}
+        for trader, followers in self.followers.items():
+            for follower in followers:
+                batches[follower] = [self.call('main::unfollow_trader', trader),
+                                     self.call('main::withdraw_funds', OCTAS_PER_APT)]
+        return batches
+
+
+def run_batches(client, batches, window):
+    """Submit every sender's payloads concurrently, one pipelined Submitter per sender"""
+    def submit(sender):
+        submitter = Submitter(client, sender, StandInSigner(), window=window, workers=4)
+        return submitter.submit_all(batches[sender])
+
+    with ThreadPoolExecutor(max_workers=ACCOUNT_WORKERS) as pool:
+        return [result for results in pool.map(submit, batches) for result in results]
+
+
+def ordering_violations(node, results):
+    """follow_trader transactions that committed before the followed trader registered"""
+    committed = [node.transactions[r['hash']] for r in results if r['status'] == 'committed']
+    registered = {tx['sender']: int(tx['version']) for tx in committed
+                  if tx['payload']['function'].endswith('::trader_registry::register_trader')}
+    return sum(1 for tx in committed if tx['payload']['function'].endswith('::main::follow_trader')
+               and int(tx['version']) < registered.get(tx['payload']['arguments'][0], float('inf')))
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))] if values else None
+
+
+def summarize(results, elapsed):
+    """Per entry function: counts, throughput over the phase, latency percentiles and synthetic gas"""
+    by_function = {}
+    for result in results:
+        name = result['function'].split('::', 1)[1]
+        by_function.setdefault(name, []).append(result)
+
+    functions = {}
+    for name, rows in sorted(by_function.items()):
+        committed = [r for r in rows if r['status'] == 'committed']
+        latencies = sorted(r['latency'] * 1000 for r in committed)
+        gas = sorted(r['gas_used'] for r in committed)
+        functions[name] = {
+            'transactions': len(rows),
+            'committed': len(committed),
+            'failed': len(rows) - len(committed),
+            'tps': round(len(committed) / elapsed, 2) if elapsed else 0.0,
+            'latency_p50_ms': round(percentile(latencies, 0.5), 1) if latencies else None,
+            'latency_p95_ms': round(percentile(latencies, 0.95), 1) if latencies else None,
+            'latency_p99_ms': round(percentile(latencies, 0.99), 1) if latencies else None,
+            'synthetic_gas_mean': round(sum(gas) / len(gas), 1) if gas else None,
+            'synthetic_gas_max': gas[-1] if gas else None,
+        }
+    return functions
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(args):
+    from mock_node import MockNode
+
+    workload = Workload(args.contract, args.traders, args.followers, args.tps, args.duration, args.seed)
+    senders = workload.traders + [f for group in workload.followers.values() for f in group]
+    report = {
+        'commit': git_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'workload': {'traders': args.traders, 'followers_per_trader': args.followers, 'tps': args.tps,
+                     'duration_s': args.duration, 'seed': args.seed, 'window': args.window},
+        'node': {'delay_s': args.delay, 'commit_latency_s': args.commit_latency,
+                 'fail_rate': args.fail_rate, 'abort_rate': args.abort_rate},
+        'phases': {},
+        'functions': {},
+    }
+
+    with MockNode(delay=args.delay, fail_rate=args.fail_rate, seed=args.seed,
+                  commit_latency=args.commit_latency, abort_rate=args.abort_rate) as node:
+        for sender in senders:
+            node.credit(sender, 1000 * OCTAS_PER_APT)
+        client = AptosClient(node.url)
+        print(f"🧪 {len(workload.traders):,} traders x {args.followers:,} followers, "
+              f"{args.tps:,} trades/s for {args.duration}s against {node.url}")
+
+        def phase(name, batches_per_tick):
+            started = time.perf_counter()
+            results = []
+            for tick, batches in enumerate(batches_per_tick):
+                tick_started = time.perf_counter()
+                results.extend(run_batches(client, batches, args.window))
+                if name == 'trade':
+                    # Pace to one tick per second; an overrun shows up as achieved < offered TPS
+                    time.sleep(max(0.0, tick_started + 1.0 - time.perf_counter()))
+            elapsed = time.perf_counter() - started
+            committed = sum(1 for r in results if r['status'] == 'committed')
+            report['phases'][name] = {'transactions': len(results), 'committed': committed,
+                                      'elapsed_s': round(elapsed, 3), 'tps': round(committed / elapsed, 2)}
+            for function, stats in summarize(results, elapsed).items():
+                report['functions'][function] = {'phase': name, **stats}
+            print(f"   {name:<9} {len(results):>7,} transactions, {committed:>7,} committed in "
+                  f"{elapsed:6.2f}s ({committed / elapsed:,.1f} TPS)")
+            return results
+
+        violations = ordering_violations(node, phase('onboard', workload.onboarding()))
+        report['phases']['onboard']['ordering_violations'] = violations
+        if violations:
+            print(f"❌ {violations:,} follow_trader transactions committed before their trader registered")
+        phase('trade', (workload.trades(tick) for tick in range(args.duration)))
+        phase('offboard', [workload.offboarding()])
+
+    trade = report['phases']['trade']
+    report['phases']['trade']['offered_tps'] = args.tps
+    print(f"📈 Copy trades: offered {args.tps:,}/s, achieved "
+          f"{report['functions'].get('main::execute_copy_trade', {}).get('tps', 0):,.1f}/s "
+          f"({trade['tps']:,.1f} TPS including top-ups)")
+    return report
+
+
+def print_report(report):
+    print(f"\n{'entry function':<36} {'txns':>7} {'fail':>5} {'tps':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'gas*':>7}")
+    fmt = lambda value, spec: format(value, spec) if value is not None else '-'
+    for name, stats in report['functions'].items():
+        print(f"{name:<36} {stats['transactions']:>7,} {stats['failed']:>5,} {stats['tps']:>8,.1f} "
+              f"{fmt(stats['latency_p50_ms'], '>8.1f')} {fmt(stats['latency_p95_ms'], '>8.1f')} "
+              f"{fmt(stats['latency_p99_ms'], '>8.1f')} {fmt(stats['synthetic_gas_mean'], '>7.0f')}")
+    print("* synthetic: the stand-in node executes no Move code, so gas is not compared between runs")
+
+
+def compare(baseline, report, tolerance):
+    """Print per-function changes against a baseline; returns the regressions"""
+    print(f"\n📊 Compared with {baseline.get('commit', 'baseline')} (tolerance {tolerance:.0%})")
+    if baseline.get('workload') != report['workload'] or baseline.get('node') != report['node']:
+        print("⚠️  Workload or node parameters differ from the baseline; the comparison may not be meaningful")
+    regressions = []
+    for name, stats in report['functions'].items():
+        before = baseline.get('functions', {}).get(name)
+        if before is None:
+            print(f"   {name}: new")
+            continue
+        changes = []
+        for metric, higher_is_better in COMPARED.items():
+            old, new = before.get(metric), stats.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            mark = '❌' if worse > tolerance else '✅'
+            if worse > tolerance:
+                regressions.append((name, metric, old, new))
+            changes.append(f"{mark} {metric} {old:,} → {new:,} ({change:+.1%})")
+        print(f"   {name}: " + ", ".join(changes))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic workload benchmark for the copy-trading contracts")
+    parser.add_argument('--traders', type=int, default=10)
+    parser.add_argument('--followers', type=int, default=10, help="followers per trader")
+    parser.add_argument('--tps', type=int, default=50, help="copy trades per second, spread over traders")
+    parser.add_argument('--duration', type=int, default=10, help="seconds of trading")
+    parser.add_argument('--window', type=int, default=32, help="in-flight transactions per sender")
+    parser.add_argument('--contract', default=DEFAULT_CONTRACT)
+    parser.add_argument('--delay', type=float, default=0.002, help="stand-in node response delay (s)")
+    parser.add_argument('--commit-latency', type=float, default=0.2, help="stand-in node commit latency (s)")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="stand-in node transient error rate")
+    parser.add_argument('--abort-rate', type=float, default=0.0, help="stand-in node Move abort rate")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help=f"results file (default: {RESULTS_DIR}/workload-<commit>.json)")
+    parser.add_argument('--compare', metavar='BASELINE', help="results file to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args()
+
+    if min(args.traders, args.followers, args.tps, args.duration) < 1:
+        parser.error("--traders, --followers, --tps and --duration must be positive")
+
+    report = run(args)
+    print_report(report)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"workload-{report['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📝 Results written to {output}")
+    if report['phases']['onboard']['ordering_violations']:
+        sys.exit(1)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            regressions = compare(json.load(f), report, args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+        print("✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()